@@ -33,10 +33,16 @@ logger = logging.getLogger(__name__)
 @click.option('--output', type=str, help='Output filename (without extension)')
 @click.option('--subtitles/--no-subtitles', default=True, help='Enable subtitles')
 @click.option('--subtitle-style', type=click.Choice(['professional', 'modern', 'cinematic']), default='professional', help='Subtitle style')
+@click.option('--subtitle-mode', type=click.Choice(Config.SUBTITLE_MODES), default=None, help='Subtitle delivery: burned into the picture, soft (selectable track, no re-encode) or both (default: SUBTITLE_MODE env or burned)')
 @click.option('--upload/--no-upload', default=False, help='Upload to YouTube')
 @click.option('--images', type=int, default=0, help='Number of images to include')
 @click.option('--videos', type=int, default=5, help='Number of video clips to include')
 @click.option('--ai-model', type=str, default='llama3.1', help='AI model for content generation')
+@click.option('--render-backend', type=click.Choice(Config.RENDER_BACKENDS), default=None, help='Render backend (default: RENDER_BACKEND env or moviepy)')
+@click.option('--render-workers', type=click.IntRange(min=1), default=None, help='Parallel segment encodes for the segmented backend')
+@click.option('--encoding-profile', type=click.Choice(list(Config.ENCODING_PROFILES)), default=None, help='Encoding profile for the output (default: ENCODING_PROFILE env or balanced)')
+@click.option('--quality', type=click.Choice(Config.RENDER_QUALITIES), default=None, help='Render quality: preview renders a fast low-resolution proxy that "promote" turns into the final video')
+@click.option('--targets', type=str, default=None, help=f"Comma-separated output targets rendered from one decode ({', '.join(Config.OUTPUT_TARGETS)})")
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose logging')
 def generate_video(
     text: Optional[str],
@@ -52,7 +58,13 @@ def generate_video(
     images: int,
     videos: int,
     ai_model: str,
-    verbose: bool
+    verbose: bool,
+    render_backend: Optional[str] = None,
+    render_workers: Optional[int] = None,
+    encoding_profile: Optional[str] = None,
+    quality: Optional[str] = None,
+    targets: Optional[str] = None,
+    subtitle_mode: Optional[str] = None
 ):
     """
     🎬 Unified Video Generator
@@ -74,6 +86,26 @@ def generate_video(
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if render_backend:
+        # One CLI invocation is one job, so the process default is the job setting
+        Config.RENDER_BACKEND = render_backend
+    if render_workers:
+        Config.RENDER_WORKERS = render_workers
+    if encoding_profile:
+        Config.ENCODING_PROFILE = encoding_profile
+    if quality:
+        Config.RENDER_QUALITY = quality
+    if subtitle_mode:
+        Config.SUBTITLE_MODE = subtitle_mode
+    if targets:
+        target_names = [target.strip() for target in targets.split(',') if target.strip()]
+        unknown = [target for target in target_names if target not in Config.OUTPUT_TARGETS]
+        if unknown:
+            raise click.BadParameter(f"unknown targets {', '.join(unknown)}", param_hint='--targets')
+        if Config.RENDER_QUALITY == "preview":
+            raise click.BadParameter("targets are rendered at final quality, not with --quality preview", param_hint='--targets')
+        Config.RENDER_TARGETS = target_names
+    
     try:
         # Initialize the video creation system
         creator = UnifiedVideoCreator(ai_model=ai_model)
@@ -105,7 +137,14 @@ def generate_video(
         click.echo(f"⏱️  Target length: {length}s")
         click.echo(f"🌍 Language: {language}")
         click.echo(f"🎤 Voice: {voice_gender}")
-        click.echo(f"📄 Subtitles: {'✅' if subtitles else '❌'} ({subtitle_style})")
+        click.echo(f"📄 Subtitles: {'✅' if subtitles else '❌'} ({subtitle_style}, {Config.SUBTITLE_MODE})")
+        click.echo(f"🎞️  Render backend: {Config.RENDER_BACKEND}"
+                   + (f" ({Config.RENDER_WORKERS} workers)" if Config.RENDER_BACKEND == "segmented" else ""))
+        click.echo(f"🗜️  Encoding profile: {Config.ENCODING_PROFILE}")
+        if Config.RENDER_QUALITY == "preview":
+            click.echo("👀 Quality: preview (promote it with: python main.py promote <name>.render.json)")
+        if Config.RENDER_TARGETS:
+            click.echo(f"📐 Targets: {', '.join(Config.RENDER_TARGETS)}")
         click.echo(f"📺 Upload: {'✅' if upload else '❌'}")
         
         # Create the video
@@ -524,10 +563,133 @@ def list_languages():
         click.echo(f"  {code}: {info['name']} (default: {default_voice})")
 
 
+@cli.command()
+@click.option('--clips', type=int, default=6, help='Number of synthetic clips in the timeline')
+@click.option('--clip-length', type=float, default=10.0, help='Length of each clip in seconds')
+@click.option('--resolution', type=str, default='1920x1080', help='Output resolution as WIDTHxHEIGHT')
+@click.option('--workers', type=str, default='2,4', help='Comma-separated worker counts for the segmented mode')
+def benchmark_render(clips: int, clip_length: float, resolution: str, workers: str):
+    """Compare the single-encoder and segmented FFmpeg renders."""
+    import tempfile
+    from render_benchmark import make_sample_clips, benchmark_render_modes
+    
+    width, height = (int(value) for value in resolution.lower().split('x'))
+    workers_options = [int(value) for value in workers.split(',') if value.strip()]
+    
+    with tempfile.TemporaryDirectory(prefix="render_benchmark_") as work_dir:
+        click.echo(f"🧪 Generating {clips} x {clip_length:g}s sample clips at {width}x{height}...")
+        segments = make_sample_clips(work_dir, clips, clip_length, (width, height), Config.DEFAULT_FPS)
+        
+        results = benchmark_render_modes(
+            segments,
+            duration=clips * clip_length,
+            resolution=(width, height),
+            workers_options=workers_options,
+            output_dir=work_dir
+        )
+    
+    click.echo("⏱️  Render benchmark:")
+    for result in results:
+        if result['success']:
+            click.echo(f"  {result['mode']:<16} {result['seconds']:>8.2f}s  x{result['speedup']:.2f}")
+        else:
+            click.echo(f"  {result['mode']:<16} failed")
+
+
+@cli.command()
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--render-backend', type=click.Choice(['ffmpeg', 'segmented', 'streaming']), default='ffmpeg', help='Backend for the full-quality render')
+def promote(manifest: str, render_backend: str):
+    """Render the full-quality video of a preview from its .render.json manifest."""
+    from video_assembler import VideoAssembler
+    
+    click.echo(f"🚀 Promoting preview: {manifest}")
+    video_path = VideoAssembler().promote_preview(manifest, render_backend=render_backend)
+    if video_path:
+        click.echo(f"🎉 Final video: {video_path}")
+    else:
+        click.echo("❌ Promotion failed. Check logs for details.")
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('manifest', type=click.Path(exists=True, dir_okay=False))
+@click.option('--text', type=str, required=True, help='Narration script in the new language')
+@click.option('--language', type=click.Choice(list(Config.SUPPORTED_LANGUAGES)), required=True, help='Language of the new narration')
+@click.option('--voice', type=str, default=None, help='Voice to use (default: the language\'s default voice)')
+@click.option('--output', type=str, default=None, help='Output path (default: <name>_<language>.mp4 next to the original)')
+@click.option('--subtitles/--no-subtitles', default=True, help='Enable subtitles')
+@click.option('--subtitle-mode', type=click.Choice(Config.SUBTITLE_MODES), default='soft', help='Subtitle delivery; burned subtitles need one encode of the picture')
+@click.option('--render-backend', type=click.Choice(['ffmpeg', 'segmented', 'streaming']), default='ffmpeg', help='Backend used when the picture has to be cut again')
+def localize(manifest: str, text: str, language: str, voice: Optional[str], output: Optional[str],
+             subtitles: bool, subtitle_mode: str, render_backend: str):
+    """Make another-language version of a rendered video from its .render.json manifest."""
+    click.echo(f"🌍 Localizing {manifest} to {language}")
+    video_path = PipelineRunner().localize_video(
+        manifest,
+        text=text,
+        language=language,
+        voice=voice,
+        output_filename=output,
+        enable_subtitles=subtitles,
+        subtitle_mode=subtitle_mode,
+        render_backend=render_backend
+    )
+    if video_path:
+        click.echo(f"🎉 Localized video: {video_path}")
+    else:
+        click.echo("❌ Localization failed. Check logs for details.")
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--clips', type=int, default=3, help='Number of synthetic clips in the timeline')
+@click.option('--clip-length', type=float, default=10.0, help='Length of each clip in seconds')
+@click.option('--resolution', type=str, default='1920x1080', help='Output resolution as WIDTHxHEIGHT')
+@click.option('--profiles', type=str, default=None, help='Comma-separated profiles to compare (default: all)')
+def benchmark_profiles(clips: int, clip_length: float, resolution: str, profiles: Optional[str]):
+    """Compare encode speed and output size of the encoding profiles."""
+    import tempfile
+    from render_benchmark import make_sample_clips, benchmark_encoding_profiles
+    
+    width, height = (int(value) for value in resolution.lower().split('x'))
+    profile_names = [value.strip() for value in profiles.split(',') if value.strip()] if profiles else None
+    unknown = [name for name in profile_names or [] if name not in Config.ENCODING_PROFILES]
+    if unknown:
+        raise click.BadParameter(
+            f"unknown profiles {', '.join(unknown)} (known: {', '.join(Config.ENCODING_PROFILES)})",
+            param_hint='--profiles'
+        )
+    
+    with tempfile.TemporaryDirectory(prefix="profile_benchmark_") as work_dir:
+        click.echo(f"🧪 Generating {clips} x {clip_length:g}s sample clips at {width}x{height}...")
+        segments = make_sample_clips(work_dir, clips, clip_length, (width, height), Config.DEFAULT_FPS)
+        
+        results = benchmark_encoding_profiles(
+            segments,
+            duration=clips * clip_length,
+            profiles=profile_names,
+            resolution=(width, height),
+            output_dir=work_dir
+        )
+    
+    click.echo("⏱️  Encoding profile benchmark:")
+    for result in results:
+        if result['success']:
+            click.echo(f"  {result['profile']:<10} {result['codec']:<10} {result['seconds']:>8.2f}s"
+                       f"  {result['encode_fps']:>7.1f} fps  {result['bytes']:>12,} bytes")
+        else:
+            click.echo(f"  {result['profile']:<10} {result['codec']:<10} failed (encoder not available?)")
+
+
 # Make generate_video the default command
 cli.add_command(generate_video, name='create')
 cli.add_command(test_systems)
 cli.add_command(list_languages)
+cli.add_command(benchmark_render)
+cli.add_command(promote)
+cli.add_command(localize)
+cli.add_command(benchmark_profiles)
 
 if __name__ == '__main__':
     # If no arguments provided, run the main generate_video command
@@ -0,0 +1,286 @@
+"""
+Resident Whisper model pool shared by every job in the process.
+Single responsibility: Load speech recognition models once, share them safely and evict them when idle.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import whisper
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Approximate fp32 weight sizes, used when a model cannot report its own size
+MODEL_SIZE_ESTIMATES_MB = {
+    "tiny": 150,
+    "base": 290,
+    "small": 970,
+    "medium": 3050,
+    "large": 6200,
+    "turbo": 3200
+}
+
+# Sizes that ship English-only ("<size>.en") weights
+ENGLISH_ONLY_SIZES = ("tiny", "base", "small", "medium")
+
+
+@dataclass
+class ResidentModel:
+    """A loaded model plus the bookkeeping the pool needs to evict it."""
+
+    name: str
+    model: Any
+    size_bytes: int
+    last_used: float = field(default_factory=time.monotonic)
+    in_use: int = 0
+    # Whisper installs per-call hooks on the model, so one transcription at a time
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class ASRModelRegistry:
+    """Keeps Whisper models resident, keyed by model size and language."""
+
+    def __init__(self, idle_timeout: float = None, memory_budget_mb: int = None):
+        """Initialize the model pool.
+
+        Args:
+            idle_timeout: Seconds a model may stay unused before eviction (0 disables)
+            memory_budget_mb: Upper bound for resident model weights in MB (0 disables)
+        """
+        self.idle_timeout = Config.WHISPER_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.memory_budget_mb = Config.WHISPER_MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+
+        self._models: "OrderedDict[Tuple[str, Optional[str]], ResidentModel]" = OrderedDict()
+        # Per-model load locks, kept only while some thread is loading or waiting for that model
+        self._loading_locks: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+        self._loading_waiters: Dict[Tuple[str, Optional[str]], int] = {}
+        self._lock = threading.RLock()
+        self._janitor: Optional[threading.Thread] = None
+
+        self.stats = {
+            "loads": 0,
+            "hits": 0,
+            "load_failures": 0,
+            "idle_evictions": 0,
+            "budget_evictions": 0
+        }
+
+    @staticmethod
+    def model_key(size: str, language: Optional[str] = None) -> Tuple[str, Optional[str]]:
+        """Map a request to the weights that serve it.
+
+        English gets the English-only weights when enabled; every other
+        language shares the multilingual weights of the same size.
+
+        Args:
+            size: Whisper model size (e.g. "base")
+            language: Whisper language code (e.g. "en", "ru")
+
+        Returns:
+            (size, language) key, where language is None for multilingual weights
+        """
+        if language == "en" and Config.WHISPER_ENGLISH_MODELS and size in ENGLISH_ONLY_SIZES:
+            return (size, "en")
+        return (size, None)
+
+    def get_model(self, size: str = None, language: str = None):
+        """Return a resident model, loading it on first use.
+
+        Args:
+            size: Whisper model size (defaults to Config.WHISPER_MODEL_SIZE)
+            language: Whisper language code
+
+        Returns:
+            Loaded Whisper model
+        """
+        return self._acquire(size, language, mark_in_use=False).model
+
+    def transcribe(self, audio_path: str, size: str = None, language: str = None, **options) -> Dict:
+        """Transcribe audio with a resident model.
+
+        Concurrent jobs share the same model; transcriptions on one model
+        are serialized while different models run in parallel.
+
+        Args:
+            audio_path: Path to the audio file
+            size: Whisper model size (defaults to Config.WHISPER_MODEL_SIZE)
+            language: Whisper language code used as a recognition hint
+            **options: Extra options for model.transcribe
+
+        Returns:
+            Whisper transcription result
+        """
+        entry = self._acquire(size, language, mark_in_use=True)
+        try:
+            if language:
+                options["language"] = language
+            with entry.lock:
+                return entry.model.transcribe(audio_path, **options)
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def _acquire(self, size: Optional[str], language: Optional[str], mark_in_use: bool) -> ResidentModel:
+        """Find or load the model for a request."""
+        key = self.model_key(size or Config.WHISPER_MODEL_SIZE, language)
+
+        with self._lock:
+            entry = self._take_resident(key, mark_in_use)
+            if entry:
+                return entry
+            loading_lock = self._loading_locks.setdefault(key, threading.Lock())
+            self._loading_waiters[key] = self._loading_waiters.get(key, 0) + 1
+
+        try:
+            return self._load(key, loading_lock, mark_in_use)
+        finally:
+            with self._lock:
+                self._loading_waiters[key] -= 1
+                if not self._loading_waiters[key]:
+                    del self._loading_waiters[key]
+                    del self._loading_locks[key]
+
+    def _load(self, key: Tuple[str, Optional[str]], loading_lock: threading.Lock, mark_in_use: bool) -> ResidentModel:
+        """Load a model under its load lock, unless a concurrent load got there first."""
+        # Load outside the pool lock so other models stay available meanwhile
+        with loading_lock:
+            with self._lock:
+                entry = self._take_resident(key, mark_in_use)
+                if entry:
+                    return entry
+
+            name = f"{key[0]}.en" if key[1] == "en" else key[0]
+            logger.info(f"Loading Whisper model '{name}'")
+            try:
+                model = whisper.load_model(name)
+            except Exception:
+                with self._lock:
+                    self.stats["load_failures"] += 1
+                raise
+
+            entry = ResidentModel(name=name, model=model, size_bytes=self._measure(model, key[0]))
+            with self._lock:
+                self.stats["loads"] += 1
+                self._make_room(entry.size_bytes)
+                if mark_in_use:
+                    entry.in_use += 1
+                self._models[key] = entry
+                self._ensure_janitor()
+            logger.info(f"Whisper model '{name}' resident ({entry.size_bytes / (1024 * 1024):.0f} MB)")
+            return entry
+
+    def _take_resident(self, key: Tuple[str, Optional[str]], mark_in_use: bool) -> Optional[ResidentModel]:
+        """Return a resident entry and refresh its LRU position (pool lock held)."""
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        self._models.move_to_end(key)
+        entry.last_used = time.monotonic()
+        if mark_in_use:
+            entry.in_use += 1
+        self.stats["hits"] += 1
+        return entry
+
+    @staticmethod
+    def _measure(model, size: str) -> int:
+        """Size of a model's weights in bytes."""
+        try:
+            return int(sum(p.numel() * p.element_size() for p in model.parameters()))
+        except Exception:
+            return MODEL_SIZE_ESTIMATES_MB.get(size, MODEL_SIZE_ESTIMATES_MB["base"]) * 1024 * 1024
+
+    def _make_room(self, needed_bytes: int):
+        """Evict least recently used idle models until the new one fits (pool lock held)."""
+        if not self.memory_budget_mb:
+            return
+        budget = self.memory_budget_mb * 1024 * 1024
+        for key in list(self._models.keys()):
+            if self.resident_bytes() + needed_bytes <= budget:
+                return
+            if self._models[key].in_use == 0:
+                self._evict(key, "budget")
+        if self.resident_bytes() + needed_bytes > budget:
+            logger.warning("Whisper model pool is over its memory budget; all resident models are in use")
+
+    def _evict(self, key: Tuple[str, Optional[str]], reason: str):
+        """Drop a model from the pool (pool lock held)."""
+        entry = self._models.pop(key)
+        self.stats[f"{reason}_evictions"] += 1
+        logger.info(f"Evicted Whisper model '{entry.name}' ({reason})")
+
+    def evict_idle(self) -> int:
+        """Evict models that have not been used within the idle timeout.
+
+        Returns:
+            Number of evicted models
+        """
+        if not self.idle_timeout:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key for key, entry in self._models.items()
+                if entry.in_use == 0 and now - entry.last_used >= self.idle_timeout
+            ]
+            for key in expired:
+                self._evict(key, "idle")
+        return len(expired)
+
+    def _ensure_janitor(self):
+        """Start the background idle sweeper if it is not running (pool lock held)."""
+        if not self.idle_timeout or (self._janitor and self._janitor.is_alive()):
+            return
+        self._janitor = threading.Thread(target=self._janitor_loop, name="asr-model-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        """Sweep idle models until the pool is empty."""
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 1))
+            self.evict_idle()
+            with self._lock:
+                if not self._models:
+                    self._janitor = None
+                    return
+
+    def resident_bytes(self) -> int:
+        """Total size of resident model weights in bytes."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._models.values())
+
+    def clear(self):
+        """Drop every resident model and reset the counters."""
+        with self._lock:
+            self._models.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get load/hit counters and the resident models.
+
+        Returns:
+            Dictionary with counters, resident model names and their total size
+        """
+        with self._lock:
+            return {
+                **self.stats,
+                "resident_models": [entry.name for entry in self._models.values()],
+                "resident_mb": round(self.resident_bytes() / (1024 * 1024), 1)
+            }
+
+
+# Global model pool shared by all jobs in the process
+asr_registry = ASRModelRegistry()
+
+
+def get_asr_registry() -> ASRModelRegistry:
+    """Get the global ASR model pool."""
+    return asr_registry
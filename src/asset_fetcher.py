@@ -4,28 +4,45 @@ Single responsibility: Fetch and organize media assets from external APIs.
 """
 import logging
 import os
-import time
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from urllib.parse import urlparse
 
 import requests
 from PIL import Image
 
+from asset_store import AssetStore, get_asset_store
 from config import Config
+from download_manager import DownloadJob, DownloadManager, get_download_manager
+from rendition_selector import RenditionSelector
+from search_cache import SearchCache, get_search_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Videos are rendered in landscape, so searches only ask for landscape media
+SEARCH_ORIENTATION = "landscape"
+
 
 class AssetFetcher:
     """Handles fetching images and videos from Pexels API."""
     
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        downloads: DownloadManager = None,
+        store: AssetStore = None,
+        search_cache: SearchCache = None,
+        selector: RenditionSelector = None
+    ):
         """Initialize asset fetcher with API key.
         
         Args:
             api_key: Pexels API key. If None, uses Config.PEXELS_API_KEY
+            downloads: Download engine. If None, uses the shared one
+            store: Asset store. If None, uses the shared one when ASSET_STORE_ENABLED
+            search_cache: Search response cache. If None, uses the shared one when SEARCH_CACHE_ENABLED
+            selector: Chooses which video file to download. If None, targets Config.DEFAULT_RESOLUTION
         """
         self.api_key = api_key or Config.get_pexels_api_key()
         if not self.api_key:
@@ -38,76 +55,91 @@ class AssetFetcher:
             "User-Agent": "VideoGenerator/1.0"
         }
         
+        # API calls share the download engine's keep-alive connections
+        self.downloads = downloads or get_download_manager()
+        self.session = self.downloads.session
+        
         # Ensure asset directories exist
         Config.ensure_directories()
+        
+        # Files already in the store are never downloaded again
+        self.store = store or (get_asset_store() if Config.ASSET_STORE_ENABLED else None)
+        
+        # Repeated searches are answered without spending API quota
+        self.search_cache = search_cache or (get_search_cache() if Config.SEARCH_CACHE_ENABLED else None)
+        self.selector = selector or RenditionSelector()
     
-    def search_images(self, query: str, per_page: int = None) -> List[Dict]:
+    def search_images(self, query: str, per_page: int = None, page: int = 1) -> List[Dict]:
         """Search for images on Pexels.
         
         Args:
             query: Search query
             per_page: Number of results per page
+            page: Result page
             
         Returns:
             List of image data dictionaries
         """
         per_page = per_page or Config.ITEMS_PER_PAGE
-        
-        try:
-            url = f"{Config.PEXELS_BASE_URL}/search"
-            params = {
-                "query": query,
-                "per_page": per_page,
-                "orientation": "landscape"
-            }
-            
-            logger.info(f"Searching images for: {query}")
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            images = data.get("photos", [])
-            
-            logger.info(f"Found {len(images)} images for '{query}'")
-            return images
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to search images: {str(e)}")
-            return []
+        return self._search(f"{Config.PEXELS_BASE_URL}/search", "photos", "images", query, per_page, page)
     
-    def search_videos(self, query: str, per_page: int = None) -> List[Dict]:
+    def search_videos(self, query: str, per_page: int = None, page: int = 1) -> List[Dict]:
         """Search for videos on Pexels.
         
         Args:
             query: Search query
             per_page: Number of results per page
+            page: Result page
             
         Returns:
             List of video data dictionaries
         """
         per_page = per_page or Config.ITEMS_PER_PAGE
+        return self._search(f"{Config.PEXELS_VIDEOS_URL}/search", "videos", "videos", query, per_page, page)
+    
+    def _search(self, url: str, results_key: str, label: str, query: str, per_page: int, page: int) -> List[Dict]:
+        """Run one search, answering from the search cache when it can.
         
-        try:
-            url = f"{Config.PEXELS_VIDEOS_URL}/search"
-            params = {
-                "query": query,
-                "per_page": per_page,
-                "orientation": "landscape"
-            }
-            
-            logger.info(f"Searching videos for: {query}")
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            videos = data.get("videos", [])
-            
-            logger.info(f"Found {len(videos)} videos for '{query}'")
-            return videos
+        Args:
+            url: Search endpoint
+            results_key: Key of the result list in the response
+            label: Media kind for log messages
+            query: Search query
+            per_page: Number of results per page
+            page: Result page
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to search videos: {str(e)}")
-            return []
+        Returns:
+            List of result dictionaries (empty if the search failed)
+        """
+        params = {
+            "query": query,
+            "per_page": per_page,
+            "orientation": SEARCH_ORIENTATION,
+            "page": page
+        }
+        
+        def fetch() -> Optional[List[Dict]]:
+            try:
+                logger.info(f"Searching {label} for: {query}")
+                response = self.session.get(url, headers=self.headers, params=params, timeout=self.downloads.timeout)
+                response.raise_for_status()
+                
+                data = response.json()
+                return data.get(results_key, [])
+                
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Failed to search {label}: {str(e)}")
+                return None
+        
+        if self.search_cache is None:
+            results = fetch()
+        else:
+            key = SearchCache.make_key(url, query, per_page, SEARCH_ORIENTATION, page)
+            results = self.search_cache.get(key, fetch)
+        
+        results = results or []
+        logger.info(f"Found {len(results)} {label} for '{query}'")
+        return results
     
     def download_image(self, image_data: Dict, filename: str = None) -> Optional[str]:
         """Download an image from Pexels data.
@@ -120,35 +152,13 @@ class AssetFetcher:
             Path to downloaded image file, or None if failed
         """
         try:
-            # Get the large image URL
-            image_url = image_data["src"]["large"]
-            
-            if filename is None:
-                # Auto-generate filename
-                image_id = image_data["id"]
-                ext = urlparse(image_url).path.split('.')[-1]
-                filename = f"image_{image_id}.{ext}"
-            
-            filepath = os.path.join(Config.IMAGES_DIR, filename)
-            
-            # Download image
-            logger.info(f"Downloading image: {filename}")
-            response = requests.get(image_url, stream=True)
-            response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            # Verify and resize if needed
-            self._optimize_image(filepath)
-            
-            logger.info(f"Image downloaded: {filepath}")
-            return filepath
-            
-        except Exception as e:
+            job = self._image_job(image_data, filename)
+        except (KeyError, IndexError, TypeError) as e:
             logger.error(f"Failed to download image: {str(e)}")
             return None
+        
+        logger.info(f"Downloading image: {os.path.basename(job.path)}")
+        return self._finish("Image", self._export(self._fetch(job, self._optimize_image), job, filename))
     
     def download_video(self, video_data: Dict, filename: str = None) -> Optional[str]:
         """Download a video from Pexels data.
@@ -161,74 +171,160 @@ class AssetFetcher:
             Path to downloaded video file, or None if failed
         """
         try:
-            # Get the HD video URL
-            video_files = video_data["video_files"]
-            # Find HD quality video
-            hd_video = None
-            for video_file in video_files:
-                if video_file["quality"] in ["hd", "sd"]:
-                    hd_video = video_file
-                    break
-            
-            if not hd_video:
-                logger.warning("No HD video found, using first available")
-                hd_video = video_files[0]
-            
-            video_url = hd_video["link"]
-            
-            if filename is None:
-                # Auto-generate filename
-                video_id = video_data["id"]
-                filename = f"video_{video_id}.mp4"
-            
-            filepath = os.path.join(Config.CLIPS_DIR, filename)
-            
-            # Download video
-            logger.info(f"Downloading video: {filename}")
-            response = requests.get(video_url, stream=True)
-            response.raise_for_status()
+            job = self._video_job(video_data, filename)
+        except (KeyError, IndexError, TypeError) as e:
+            logger.error(f"Failed to download video: {str(e)}")
+            return None
+        
+        logger.info(f"Downloading video: {os.path.basename(job.path)}")
+        return self._finish("Video", self._export(self._fetch(job), job, filename))
+    
+    def _image_job(self, image_data: Dict, filename: str = None) -> DownloadJob:
+        """Source URL and destination of an image.
+        
+        Args:
+            image_data: Image data dictionary from Pexels API
+            filename: Optional filename. If None, auto-generates.
             
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+        Returns:
+            DownloadJob for the large rendition
+        """
+        # Get the large image URL
+        image_url = image_data["src"]["large"]
+        
+        if filename is None:
+            # Auto-generate filename
+            image_id = image_data["id"]
+            ext = urlparse(image_url).path.split('.')[-1]
+            filename = f"image_{image_id}.{ext}"
+        
+        key = f"pexels:image:{image_data['id']}:large"
+        return DownloadJob(image_url, os.path.join(Config.IMAGES_DIR, filename), key)
+    
+    def _video_job(self, video_data: Dict, filename: str = None, selector: RenditionSelector = None) -> DownloadJob:
+        """Source URL and destination of a video.
+        
+        Args:
+            video_data: Video data dictionary from Pexels API
+            filename: Optional filename. If None, auto-generates.
+            selector: Rendition selector for this job. If None, uses the fetcher's
             
-            logger.info(f"Video downloaded: {filepath}")
-            return filepath
+        Returns:
+            DownloadJob for the chosen rendition
+        """
+        # The cheapest file that still covers the render's frame size and rate
+        selector = selector or self.selector
+        hd_video = selector.select(video_data["video_files"], video_data.get("duration"))
+        if hd_video is None:
+            raise KeyError("video_files")
+        
+        if filename is None:
+            # Auto-generate filename
+            video_id = video_data["id"]
+            filename = f"video_{video_id}.mp4"
+        
+        key = f"pexels:video:{video_data['id']}:{hd_video.get('id') or hd_video['link']}"
+        return DownloadJob(hd_video["link"], os.path.join(Config.CLIPS_DIR, filename), key)
+    
+    def _fetch(self, job: DownloadJob, prepare: Callable[[str], None] = None) -> Optional[str]:
+        """Fetch one file through the asset store, or straight to its destination without one.
+        
+        Args:
+            job: File to fetch
+            prepare: Post-processes the downloaded file in place before it is stored
             
-        except Exception as e:
-            logger.error(f"Failed to download video: {str(e)}")
-            return None
+        Returns:
+            Path to the file, or None if failed
+        """
+        def download(filepath: str) -> bool:
+            if not self.downloads.download(job.url, filepath):
+                return False
+            if prepare:
+                prepare(filepath)
+            return True
+        
+        if self.store is None or not job.key:
+            return job.path if download(job.path) else None
+        return self.store.fetch(job.key, download, os.path.splitext(job.path)[1])
+    
+    def _fetch_many(self, jobs: List[DownloadJob], prepare: List[Optional[Callable[[str], None]]]) -> List[Optional[str]]:
+        """Fetch a batch of files in parallel, in job order."""
+        # Jobs are unhashable dataclasses, so each one's step is found by identity
+        steps = {id(job): step for job, step in zip(jobs, prepare)}
+        return self.downloads.download_many(jobs, lambda job: self._fetch(job, steps[id(job)]))
+    
+    def _export(self, filepath: Optional[str], job: DownloadJob, filename: Optional[str]) -> Optional[str]:
+        """Place a stored file under an explicitly requested filename."""
+        if filepath and filename and self.store is not None and filepath != job.path:
+            try:
+                return self.store.export(filepath, job.path)
+            except OSError as e:
+                logger.error(f"Failed to place {filename}: {str(e)}")
+                return None
+        return filepath
+    
+    @staticmethod
+    def _finish(kind: str, filepath: Optional[str]) -> Optional[str]:
+        """Log the outcome of a download."""
+        if filepath:
+            logger.info(f"{kind} downloaded: {filepath}")
+        return filepath
     
-    def download_assets_for_query(self, query: str, max_images: int = 3, max_videos: int = 2) -> Dict[str, List[str]]:
+    def download_assets_for_query(
+        self,
+        query: str,
+        max_images: int = 3,
+        max_videos: int = 2,
+        resolutions: List[tuple] = None,
+        fps: int = None
+    ) -> Dict[str, List[str]]:
         """Download both images and videos for a query.
         
         Args:
             query: Search query
             max_images: Maximum number of images to download
             max_videos: Maximum number of videos to download
+            resolutions: Output frame sizes the videos will be rendered at (picks the video files)
+            fps: Render frame rate (picks the video files)
             
         Returns:
             Dictionary with 'images' and 'videos' keys containing file paths
         """
         results = {"images": [], "videos": []}
         
-        # Search and download images
+        # Search first, then fetch every file of the query as one concurrent batch
+        image_jobs = []
         if max_images > 0:
-            images = self.search_images(query, max_images)
-            for image_data in images[:max_images]:
-                filepath = self.download_image(image_data)
-                if filepath:
-                    results["images"].append(filepath)
-                time.sleep(0.1)  # Rate limiting
-        
-        # Search and download videos
+            for image_data in self.search_images(query, max_images)[:max_images]:
+                try:
+                    image_jobs.append(self._image_job(image_data))
+                except (KeyError, IndexError, TypeError) as e:
+                    logger.error(f"Skipping image without a usable source: {str(e)}")
+        
+        video_jobs = []
+        selector = RenditionSelector(resolutions, fps) if resolutions or fps else self.selector
         if max_videos > 0:
-            videos = self.search_videos(query, max_videos)
-            for video_data in videos[:max_videos]:
-                filepath = self.download_video(video_data)
-                if filepath:
-                    results["videos"].append(filepath)
-                time.sleep(0.1)  # Rate limiting
+            for video_data in self.search_videos(query, max_videos)[:max_videos]:
+                try:
+                    video_jobs.append(self._video_job(video_data, selector=selector))
+                except (KeyError, IndexError, TypeError) as e:
+                    logger.error(f"Skipping video without a usable source: {str(e)}")
+        
+        logger.info(f"Fetching {len(image_jobs)} images and {len(video_jobs)} videos for '{query}'")
+        paths = self._fetch_many(
+            image_jobs + video_jobs,
+            [self._optimize_image] * len(image_jobs) + [None] * len(video_jobs)
+        )
+        
+        for filepath in paths[:len(image_jobs)]:
+            filepath = self._finish("Image", filepath)
+            if filepath:
+                results["images"].append(filepath)
+        
+        for filepath in paths[len(image_jobs):]:
+            filepath = self._finish("Video", filepath)
+            if filepath:
+                results["videos"].append(filepath)
         
         logger.info(f"Downloaded {len(results['images'])} images and {len(results['videos'])} videos for '{query}'")
         return results
@@ -0,0 +1,381 @@
+"""
+Content-addressed store of downloaded stock assets.
+Single responsibility: Keep each downloaded file once under its content hash, find it again by provider ID and bound the store's size.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import Config
+from keyed_locks import KeyedLocks
+from media_probe import get_media_probe
+
+try:
+    import fcntl
+except ImportError:  # Windows: downloads are still deduplicated between threads of one process
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a writer waits for another process's transaction before giving up
+DB_TIMEOUT = 30.0
+
+
+@dataclass
+class StoredAsset:
+    """Index record of a stored file."""
+
+    key: str  # Provider ID, e.g. "pexels:video:123:456"
+    sha256: str
+    path: str
+    size: int
+    last_access: float
+    media: Optional[Dict[str, Any]] = None  # Probe metadata (duration, size, fps, codecs) when known
+
+
+class AssetStore:
+    """Downloaded assets stored by content hash and indexed by provider key in SQLite.
+
+    A key seen before is served from disk without touching the network. Files
+    with the same content are stored once, however many keys point at them.
+    The store is bounded by size and evicts least recently used files, but
+    never ones used within min_idle seconds, so a render still reading a file
+    keeps it. Several worker processes may share one store: the index runs in
+    WAL mode, each key is downloaded by one process at a time under a file
+    lock, and files appear in the store by atomic rename only.
+    """
+
+    def __init__(self, store_dir: str = None, max_mb: int = None, min_idle: float = None):
+        """Initialize the asset store.
+
+        Args:
+            store_dir: Directory for stored files and the index
+            max_mb: Size limit for the store in MB (0 disables eviction)
+            min_idle: Seconds since last use before a file may be evicted
+        """
+        self.store_dir = store_dir or Config.ASSET_STORE_DIR
+        self.max_mb = Config.ASSET_STORE_MAX_MB if max_mb is None else max_mb
+        self.min_idle = Config.ASSET_STORE_MIN_IDLE_SECONDS if min_idle is None else min_idle
+        self.lock_dir = os.path.join(self.store_dir, "locks")
+
+        self._key_locks = KeyedLocks()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "failures": 0, "evictions": 0}
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(self.store_dir, "index.sqlite"), timeout=DB_TIMEOUT, check_same_thread=False
+        )
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "sha256 TEXT PRIMARY KEY, path TEXT, size INTEGER, last_access REAL, media TEXT)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY, sha256 TEXT)")
+
+    def blob_path(self, sha256: str, suffix: str = "") -> str:
+        """Path of a stored file by content hash."""
+        return os.path.join(self.store_dir, sha256[:2], f"{sha256}{suffix}")
+
+    def lookup(self, key: str) -> Optional[StoredAsset]:
+        """Index record of a key whose file is still intact, without counting a hit."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT k.sha256, b.path, b.size, b.last_access, b.media "
+                "FROM keys k JOIN blobs b ON b.sha256 = k.sha256 WHERE k.key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        sha256, path, size, last_access, media = row
+        try:
+            intact = os.path.getsize(path) == size
+        except OSError:
+            intact = False
+        if not intact:
+            # Deleted or truncated behind the index's back
+            self._forget(sha256)
+            return None
+        return StoredAsset(key, sha256, path, size, last_access, json.loads(media) if media else None)
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a stored asset, or None if the key is not in the store."""
+        asset = self.lookup(key)
+        if asset is None:
+            return None
+        with self._lock, self._db:
+            self._db.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), asset.sha256))
+        return asset.path
+
+    def fetch(self, key: str, download: Callable[[str], bool], suffix: str = "") -> Optional[str]:
+        """Get a stored asset, downloading it on first use.
+
+        Args:
+            key: Provider ID of the asset
+            download: Writes the file to the given path and returns whether it succeeded
+            suffix: File extension of the stored file, e.g. ".mp4"
+
+        Returns:
+            Path to the stored file, or None if it could not be downloaded
+        """
+        path = self.get(key)
+        if path:
+            with self._lock:
+                self.stats["hits"] += 1
+            return path
+
+        with self._key_lock(key):
+            # Another thread or process may have stored it while this one waited
+            path = self.get(key)
+            if path:
+                with self._lock:
+                    self.stats["hits"] += 1
+                return path
+
+            with self._lock:
+                self.stats["misses"] += 1
+            path = self._download(key, download, suffix)
+            if path is None:
+                with self._lock:
+                    self.stats["failures"] += 1
+                return None
+
+        self.evict()
+        return path
+
+    def _download(self, key: str, download: Callable[[str], bool], suffix: str) -> Optional[str]:
+        """Download into a file private to the key, then move it into the store under its hash."""
+        # Named after the key (which this process holds the lock for), so an interrupted
+        # download's .part file is resumed by the next attempt, in this run or a later one
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        partial = os.path.join(self.store_dir, f"{name}.partial{suffix}")
+        try:
+            if not download(partial) or not os.path.exists(partial):
+                return None
+            sha256 = self._hash(partial)
+            target = self.blob_path(sha256, suffix)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Rename is atomic, so readers never see a partial file; same hash means same bytes
+            os.replace(partial, target)
+        except OSError as e:
+            logger.error(f"Failed to store asset {key}: {str(e)}")
+            return None
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        media = self._probe(target)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO blobs (sha256, path, size, last_access, media) VALUES (?, ?, ?, ?, ?)",
+                (sha256, target, os.path.getsize(target), time.time(), json.dumps(media) if media else None)
+            )
+            self._db.execute("INSERT OR REPLACE INTO keys (key, sha256) VALUES (?, ?)", (key, sha256))
+        logger.info(f"Stored asset {key} as {os.path.basename(target)}")
+        return target
+
+    @staticmethod
+    def _hash(path: str) -> str:
+        """Hex SHA-256 digest of a file's contents."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _probe(path: str) -> Optional[Dict[str, Any]]:
+        """Probe metadata worth keeping in the index."""
+        info = get_media_probe().probe(path)
+        if info is None:
+            return None
+        media = asdict(info)
+        media.pop("path")
+        media.pop("streams")
+        return media
+
+    def export(self, path: str, destination: str) -> str:
+        """Make a stored file available under another name without copying when possible.
+
+        Args:
+            path: Stored file
+            destination: Requested path
+
+        Returns:
+            The destination path
+        """
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(path, destination)
+        except OSError:
+            # Different filesystem or no hard link support
+            shutil.copyfile(path, destination)
+        return destination
+
+    @contextmanager
+    def _key_lock(self, key: str) -> Iterator[None]:
+        """Hold a key against other threads and, where supported, other processes."""
+        with self._key_locks.hold(key):
+            if fcntl is None:
+                yield
+                return
+            with self._file_lock(hashlib.sha1(key.encode('utf-8')).hexdigest()):
+                yield
+
+    @contextmanager
+    def _file_lock(self, name: str, blocking: bool = True) -> Iterator[bool]:
+        """Hold the lock file of a key hash; yields False if non-blocking and another holder has it."""
+        path = os.path.join(self.lock_dir, f"{name}.lock")
+        while True:
+            with open(path, 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    # evict() may have deleted the file while this one waited; lock its replacement instead
+                    try:
+                        current = os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino
+                    except FileNotFoundError:
+                        current = False
+                    if current:
+                        # mtime records the last use, for evict()
+                        os.utime(path)
+                        yield True
+                        return
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def size_bytes(self) -> int:
+        """Total size of stored files in bytes."""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self) -> int:
+        """Delete least recently used files until the store fits its size limit.
+
+        Partial downloads, their resume sidecars and lock files of keys not
+        fetched for min_idle seconds are removed as well.
+
+        Returns:
+            Number of evicted files
+        """
+        cutoff = time.time() - self.min_idle
+        self._remove_stale_downloads(cutoff)
+        if not self.max_mb:
+            return 0
+
+        budget = self.max_mb * 1024 * 1024
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= budget:
+                return 0
+            candidates = self._db.execute(
+                "SELECT sha256, path, size FROM blobs WHERE last_access < ? ORDER BY last_access",
+                (cutoff,)
+            ).fetchall()
+
+        evicted = 0
+        for sha256, path, size in candidates:
+            if total <= budget:
+                break
+            # Forget first: a concurrent lookup then misses instead of returning a file about to vanish
+            self._forget(sha256)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            evicted += 1
+            logger.info(f"Evicted stored asset {os.path.basename(path)}")
+
+        with self._lock:
+            self.stats["evictions"] += evicted
+        return evicted
+
+    def _remove_stale_downloads(self, cutoff: float) -> int:
+        """Delete leftovers of failed or killed downloads, grouped by key hash.
+
+        A key's partial file, .part.json sidecar and lock file go together,
+        and only while no thread or process holds the key's lock.
+        """
+        leftovers: Dict[str, List[str]] = {}
+        for directory, marker in ((self.store_dir, ".partial"), (self.lock_dir, ".lock")):
+            for name in os.listdir(directory):
+                if marker in name:
+                    leftovers.setdefault(name.split('.', 1)[0], []).append(os.path.join(directory, name))
+
+        removed = 0
+        for name, paths in leftovers.items():
+            try:
+                if max(os.path.getmtime(path) for path in paths) >= cutoff:
+                    continue
+            except OSError:
+                continue
+            if fcntl is None:
+                removed += self._remove_files(paths)
+                continue
+            with self._file_lock(name, blocking=False) as locked:
+                if locked:
+                    # Unlinked while held, so a waiter on this file retries on a fresh one
+                    removed += self._remove_files(paths)
+        if removed:
+            logger.info(f"Removed {removed} stale download files from {self.store_dir}")
+        return removed
+
+    @staticmethod
+    def _remove_files(paths: List[str]) -> int:
+        """Delete files, returning how many were deleted."""
+        removed = 0
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _forget(self, sha256: str):
+        """Drop a file and every key pointing at it from the index."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM keys WHERE sha256 = ?", (sha256,))
+            self._db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and the store size.
+
+        Returns:
+            Dictionary with counters and the store size in MB
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats["size_mb"] = round(self.size_bytes() / (1024 * 1024), 1)
+        return stats
+
+
+# Global asset store shared by the pipeline
+_asset_store = None
+_asset_store_lock = threading.Lock()
+
+
+def get_asset_store() -> AssetStore:
+    """Get the global asset store."""
+    global _asset_store
+    with _asset_store_lock:
+        if _asset_store is None:
+            _asset_store = AssetStore()
+        return _asset_store
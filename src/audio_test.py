@@ -5,49 +5,31 @@ Checks if generated videos contain audio streams.
 """
 
 import os
-import subprocess
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from media_probe import get_media_probe
+
 def check_video_audio(video_path):
     """Check if a video file contains audio streams."""
     try:
-        # Use ffprobe to check for audio streams
-        result = subprocess.run([
-            'ffprobe', '-v', 'quiet', '-show_streams', video_path
-        ], capture_output=True, text=True)
+        # Use the shared ffprobe service (JSON output, cached by path/size/mtime)
+        info = get_media_probe().probe(video_path)
         
-        if result.returncode != 0:
-            return False, "Could not analyze video file"
+        if info is None:
+            return False, "Could not analyze video file (is ffprobe installed?)"
         
-        # Check for audio streams
-        has_audio = 'codec_type=audio' in result.stdout
-        
-        if has_audio:
-            # Extract audio info
-            lines = result.stdout.split('\n')
-            audio_info = {}
-            in_audio_stream = False
-            
-            for line in lines:
-                if 'codec_type=audio' in line:
-                    in_audio_stream = True
-                elif line.startswith('[/STREAM]'):
-                    in_audio_stream = False
-                elif in_audio_stream and '=' in line:
-                    key, value = line.split('=', 1)
-                    audio_info[key] = value
-            
+        if info.has_audio:
             return True, {
-                'codec': audio_info.get('codec_name', 'unknown'),
-                'channels': audio_info.get('channels', 'unknown'),
-                'sample_rate': audio_info.get('sample_rate', 'unknown'),
-                'duration': audio_info.get('duration', 'unknown')
+                'codec': info.audio_codec,
+                'channels': info.audio_channels or 'unknown',
+                'sample_rate': info.sample_rate or 'unknown',
+                'duration': info.duration if info.duration is not None else 'unknown'
             }
         else:
             return False, "No audio stream found"
             
-    except FileNotFoundError:
-        return False, "ffprobe not found (install ffmpeg)"
     except Exception as e:
         return False, str(e)
 
@@ -65,6 +47,9 @@ def main():
         print("❌ No video files found in output directory")
         return
     
+    # Probe every file in one parallel batch; the checks below read the cache
+    get_media_probe().probe_many([os.path.join(output_dir, vf) for vf in video_files])
+    
     print("🔊 Audio Verification Report")
     print("=" * 40)
     print()
@@ -80,7 +65,7 @@ def main():
         
         if has_audio:
             print(f"   ✅ Audio: {info['codec']} | {info['channels']} channels | {info['sample_rate']} Hz")
-            if 'duration' in info:
+            if info['duration'] != 'unknown':
                 print(f"   ⏱️  Duration: {float(info['duration']):.1f}s")
         else:
             print(f"   ❌ Audio: {info}")
@@ -0,0 +1,152 @@
+"""
+Normalized clip cache for downloaded stock footage.
+Single responsibility: Transcode each source clip to the render geometry once and reuse it across videos.
+"""
+import logging
+import os
+from dataclasses import replace
+from typing import List, Optional
+
+from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_progress import FFmpegRunner
+from ffmpeg_renderer import FFmpegRenderer
+from file_cache import FileCache
+from media_probe import get_media_probe
+from segment_encoder import ENCODER_CODECS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PIXEL_FORMAT = "yuv420p"
+
+# Near-lossless settings for jobs whose codec the segmented backend cannot stream-copy
+MEZZANINE_PROFILE = EncodingProfile(name="mezzanine", preset="veryfast", crf=18)
+
+
+class ClipCache(FileCache):
+    """Mezzanine cache of clips pre-scaled, pre-cropped and re-timed for a render profile.
+
+    Entries are keyed by (source content hash, resolution, fps, pixel format,
+    encoder settings), so the same footage downloaded under different names
+    is transcoded once. Clips are encoded with the job's encoding profile, so
+    the segmented backend can copy their keyframe-aligned ranges into its
+    output instead of encoding them again.
+    """
+
+    entry_name = "clip"
+
+    def __init__(
+        self,
+        resolution: tuple = None,
+        fps: int = None,
+        cache_dir: str = None,
+        max_mb: int = None,
+        runner: FFmpegRunner = None,
+        min_idle: float = None,
+        profile: EncodingProfile = None
+    ):
+        """Initialize the clip cache.
+
+        Args:
+            resolution: Target (width, height)
+            fps: Target frame rate
+            cache_dir: Directory for cached clips
+            max_mb: Size limit for the cache in MB (0 disables eviction)
+            runner: Runs ffmpeg and reports its progress
+            min_idle: Seconds since last use before a clip may be evicted
+            profile: The job's encoding profile; defaults to Config.ENCODING_PROFILE. Codecs
+                the segmented backend cannot copy use MEZZANINE_PROFILE instead
+        """
+        super().__init__(
+            cache_dir=cache_dir or Config.CLIP_CACHE_DIR,
+            max_mb=Config.CLIP_CACHE_MAX_MB if max_mb is None else max_mb,
+            min_idle=min_idle
+        )
+        self.resolution = tuple(resolution or Config.DEFAULT_RESOLUTION)
+        self.fps = fps or Config.DEFAULT_FPS
+        self.runner = runner or FFmpegRunner()
+        profile = profile or EncodingProfile.from_config()
+        if profile.codec not in ENCODER_CODECS:
+            profile = MEZZANINE_PROFILE
+        self.renderer = FFmpegRenderer(
+            fps=self.fps, resolution=self.resolution,
+            profile=replace(profile, gop_seconds=Config.CLIP_CACHE_GOP_SECONDS), runner=self.runner
+        )
+
+    def cache_path(self, source_path: str) -> str:
+        """Path of the cached clip for a source under this cache's render profile."""
+        width, height = self.resolution
+        profile = self.renderer.profile
+        name = (
+            f"{self.source_hash(source_path)[:16]}_{width}x{height}_{self.fps}fps_{PIXEL_FORMAT}"
+            f"_{profile.name}-{profile.stream_key}.mp4"
+        )
+        return os.path.join(self.cache_dir, name)
+
+    def get(self, source_path: str) -> Optional[str]:
+        """Get the normalized version of a clip, transcoding it on first use.
+
+        Args:
+            source_path: Path to the downloaded clip
+
+        Returns:
+            Path to the cached clip, or None if it could not be produced
+        """
+        target = self._normalize(source_path)
+        if target:
+            self.evict(keep=[target])
+        return target
+
+    def _normalize(self, source_path: str) -> Optional[str]:
+        """Get or transcode the cached clip for a source, without evicting."""
+        try:
+            target = self.cache_path(source_path)
+        except OSError as e:
+            logger.warning(f"Cannot read clip {source_path}: {str(e)}")
+            return None
+
+        return self._get_or_create(target, lambda partial: self._transcode(source_path, partial))
+
+    def normalize_paths(self, video_paths: List[str]) -> List[str]:
+        """Swap each clip for its cached version, keeping the original when caching fails.
+
+        Args:
+            video_paths: Downloaded clip paths
+
+        Returns:
+            Paths to use for rendering, in the same order
+        """
+        cached = [
+            self._normalize(video_path) if os.path.exists(video_path) else None
+            for video_path in video_paths or []
+        ]
+        # Evict once for the whole batch, so no clip of it is removed before the render opens it
+        self.evict(keep=[path for path in cached if path])
+        return [path or video_path for path, video_path in zip(cached, video_paths or [])]
+
+    def _transcode(self, source_path: str, output_path: str) -> bool:
+        """Transcode a source clip with the job's encoder settings and short, fixed GOPs."""
+        gop = max(1, round(self.fps * Config.CLIP_CACHE_GOP_SECONDS))
+        # The GOP length does not change the parameter sets, so ranges stay copyable into the output
+        command = [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-i', source_path,
+            '-vf', self.renderer._normalize_filter(),
+            '-an'
+        ] + self.renderer.encoder_args() + [
+            '-keyint_min', str(gop), '-sc_threshold', '0'
+        ] + self.renderer.profile.container_args() + [output_path]
+
+        logger.info(f"Normalizing clip {os.path.basename(source_path)} to {self.resolution[0]}x{self.resolution[1]}@{self.fps}")
+        try:
+            result = self.runner.run(command, get_media_probe().duration(source_path))
+        except FileNotFoundError:
+            logger.error("Clip normalization failed: ffmpeg executable not found")
+            return False
+
+        if not result.ok:
+            logger.error(f"Clip normalization failed: {result.stderr.strip()[-2000:]}")
+            return False
+        return True
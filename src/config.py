@@ -178,7 +178,57 @@ class Config:
     DEFAULT_FPS = 24
     DEFAULT_DURATION = 5  # seconds per image
     DEFAULT_RESOLUTION = (1920, 1080)
-    
+    BACKGROUND_COLOR = "0x141414"  # Dark gray used for audio-only videos
+
+    # Render backend: "moviepy" (frame-by-frame composition), "ffmpeg" (single-pass filtergraph),
+    # "segmented" (segments encoded in parallel, joined with stream copy) or "streaming"
+    # (clips decoded one after another through a fixed ring of frame buffers into one encoder)
+    RENDER_BACKENDS = ["moviepy", "ffmpeg", "segmented", "streaming"]
+    RENDER_BACKEND = os.getenv('RENDER_BACKEND', 'moviepy')
+    RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+    SEGMENT_MAX_SECONDS = 10  # Longer clips are split so work spreads across workers
+    STREAM_RING_FRAMES = int(os.getenv('STREAM_RING_FRAMES', '8'))  # Preallocated frame buffers
+    STREAM_MAX_READERS = int(os.getenv('STREAM_MAX_READERS', '2'))  # Decoders open at once
+
+    # Encoding profiles for final outputs. Keys: codec, preset, crf, tune, threads (0 = encoder
+    # decides), gop_seconds, audio_bitrate, faststart. "hevc" and "av1" need an ffmpeg built with
+    # libx265 / libsvtav1. Compare them with: python main.py benchmark-profiles
+    ENCODING_PROFILES = {
+        "fast": {"preset": "veryfast", "crf": 23, "gop_seconds": 2, "audio_bitrate": "128k"},
+        "balanced": {"preset": "medium", "crf": 21, "gop_seconds": 2, "audio_bitrate": "160k"},
+        "small": {"preset": "slow", "crf": 25, "gop_seconds": 4, "audio_bitrate": "96k"},
+        "hevc": {"codec": "libx265", "preset": "medium", "crf": 26, "gop_seconds": 2, "audio_bitrate": "128k"},
+        "av1": {"codec": "libsvtav1", "preset": "8", "crf": 35, "gop_seconds": 4, "audio_bitrate": "128k"},
+        "preview": {"preset": "ultrafast", "crf": 32, "audio_bitrate": "64k"}
+    }
+    ENCODING_PROFILE = os.getenv('ENCODING_PROFILE', 'balanced')
+    ENCODE_THREADS = int(os.getenv('ENCODE_THREADS', '0'))  # Overrides every profile's thread count when set
+
+    # Quality tier: "final" renders the full profile; "preview" is a fast low-resolution proxy with
+    # the same cuts and subtitles, which can be promoted to "final" without redoing TTS, fetch or ASR
+    RENDER_QUALITIES = ["final", "preview"]
+    RENDER_QUALITY = os.getenv('RENDER_QUALITY', 'final')
+    PREVIEW_HEIGHT = 360  # Width follows the output aspect ratio
+    PREVIEW_FPS = 12
+    PREVIEW_PROFILE = "preview"
+
+    # Localized versions (python main.py localize): the rendered picture is copied under the new
+    # narration and may play up to this much faster or slower to match its length; beyond that
+    # the picture is cut again from the render manifest's plan
+    LOCALIZE_MAX_STRETCH = float(os.getenv('LOCALIZE_MAX_STRETCH', '0.08'))
+
+    # Platform output targets; several can be rendered from one decode of the timeline.
+    # Targets with the same resolution and quality share one encode.
+    OUTPUT_TARGETS = {
+        "youtube_video": {"resolution": (1920, 1080), "crf": 21},
+        "youtube_short": {"resolution": (1080, 1920), "crf": 23},
+        "instagram_reel": {"resolution": (1080, 1920), "crf": 23},
+        "instagram_post": {"resolution": (1080, 1080), "crf": 23},
+        "tiktok": {"resolution": (1080, 1920), "crf": 23}
+    }
+    # Comma-separated targets rendered by default for every job (empty = one video at DEFAULT_RESOLUTION)
+    RENDER_TARGETS = [target.strip() for target in os.getenv('RENDER_TARGETS', '').split(',') if target.strip()]
+
     # Subtitle Configuration
     SUBTITLE_FONT_SIZE = 24
     SUBTITLE_FONT_COLOR = "white"
@@ -191,7 +241,20 @@ class Config:
     SUBTITLE_STROKE_WIDTH = 3
     SUBTITLE_SHADOW_OFFSET = (2, 2)
     SUBTITLE_SHADOW_COLOR = "rgba(0,0,0,0.8)"
-    
+
+    # Cue limits when subtitles are built from TTS word timings
+    SUBTITLE_MAX_CUE_CHARS = 42
+    SUBTITLE_MAX_CUE_DURATION = 5.0  # seconds
+    SUBTITLE_CUE_PAUSE = 0.5  # seconds of silence that start a new cue
+
+    # libass style used when FFmpeg burns SRT subtitles
+    SUBTITLE_FFMPEG_STYLE = "FontName=Arial,FontSize=18,PrimaryColour=&H00ffffff,OutlineColour=&H00000000,Outline=1,Shadow=1,Alignment=2"
+
+    # Subtitle delivery: "burned" into the picture, "soft" (a text track muxed by stream copy,
+    # selectable in the player) or "both"
+    SUBTITLE_MODES = ["burned", "soft", "both"]
+    SUBTITLE_MODE = os.getenv('SUBTITLE_MODE', 'burned')
+
     # Advanced subtitle styling
     SUBTITLE_STYLES = {
         "professional": {
@@ -226,6 +289,12 @@ class Config:
     # Default subtitle style
     DEFAULT_SUBTITLE_STYLE = "professional"
     
+    # Whisper model pool (models stay resident between videos)
+    WHISPER_MODEL_SIZE = os.getenv('WHISPER_MODEL_SIZE', 'base')
+    WHISPER_ENGLISH_MODELS = True  # Use "<size>.en" weights for English narration
+    WHISPER_IDLE_TIMEOUT = int(os.getenv('WHISPER_IDLE_TIMEOUT', '900'))  # seconds, 0 = never
+    WHISPER_MEMORY_BUDGET_MB = int(os.getenv('WHISPER_MEMORY_BUDGET_MB', '4096'))  # 0 = unlimited
+    
     # Asset Directories
     ASSETS_DIR = "assets"
     IMAGES_DIR = os.path.join(ASSETS_DIR, "images")
@@ -233,6 +302,70 @@ class Config:
     AUDIO_DIR = os.path.join(ASSETS_DIR, "audio")
     OUTPUT_DIR = "output"
     
+    # Normalized clip cache: downloads transcoded once to the render resolution/fps
+    CLIP_CACHE_ENABLED = os.getenv('CLIP_CACHE_ENABLED', 'true').lower() == 'true'
+    CLIP_CACHE_DIR = os.path.join(ASSETS_DIR, "mezzanine")
+    CLIP_CACHE_MAX_MB = int(os.getenv('CLIP_CACHE_MAX_MB', '2048'))
+    CLIP_CACHE_MIN_IDLE_SECONDS = float(os.getenv('CLIP_CACHE_MIN_IDLE_SECONDS', '3600'))  # In-use clips are kept
+    CLIP_CACHE_GOP_SECONDS = 1  # Keyframe interval, keeps seeking and cutting cheap
+    
+    # Still images pre-encoded as short H.264 segments, keyed by image, duration, profile and fades
+    STILL_CACHE_ENABLED = os.getenv('STILL_CACHE_ENABLED', 'true').lower() == 'true'
+    STILL_CACHE_DIR = os.path.join(ASSETS_DIR, "stills")
+    STILL_CACHE_MAX_MB = int(os.getenv('STILL_CACHE_MAX_MB', '512'))
+    
+    # Encoded segments of the segmented backend, keyed by inputs, cues and encoding profile,
+    # so re-renders after small script fixes only encode the segments that changed
+    SEGMENT_STORE_ENABLED = os.getenv('SEGMENT_STORE_ENABLED', 'true').lower() == 'true'
+    SEGMENT_STORE_DIR = os.path.join(ASSETS_DIR, "segments")
+    SEGMENT_STORE_MAX_MB = int(os.getenv('SEGMENT_STORE_MAX_MB', '4096'))
+    
+    # Downloaded stock assets stored by content hash and indexed by provider ID, shared by worker processes
+    ASSET_STORE_ENABLED = os.getenv('ASSET_STORE_ENABLED', 'true').lower() == 'true'
+    ASSET_STORE_DIR = os.path.join(ASSETS_DIR, "store")
+    ASSET_STORE_MAX_MB = int(os.getenv('ASSET_STORE_MAX_MB', '8192'))
+    ASSET_STORE_MIN_IDLE_SECONDS = float(os.getenv('ASSET_STORE_MIN_IDLE_SECONDS', '3600'))  # In-use files are kept
+    
+    # Per-job scratch directories (tmpfs at /dev/shm when it has room)
+    SCRATCH_ROOT = os.getenv('SCRATCH_ROOT', '')
+    SCRATCH_MIN_FREE_MB = int(os.getenv('SCRATCH_MIN_FREE_MB', '2048'))
+    
+    # ffmpeg progress reports: log cadence and how long a render may stop advancing before it is killed
+    FFMPEG_PROGRESS_LOG_SECONDS = float(os.getenv('FFMPEG_PROGRESS_LOG_SECONDS', '10'))
+    FFMPEG_STALL_TIMEOUT = float(os.getenv('FFMPEG_STALL_TIMEOUT', '120'))
+    
+    # ffprobe metadata cache, keyed by (path, size, mtime)
+    PROBE_CACHE_PATH = os.path.join(ASSETS_DIR, "probe_cache.sqlite")
+    PROBE_WORKERS = int(os.getenv('PROBE_WORKERS', '8'))
+    PROBE_TIMEOUT = float(os.getenv('PROBE_TIMEOUT', '30'))  # Seconds per ffprobe run (0 disables)
+    
+    # Keyframe index of video clips, cached next to the probe metadata: cuts snap to keyframes
+    # so the segmented backend can stream-copy whole clip ranges
+    KEYFRAME_INDEX_ENABLED = os.getenv('KEYFRAME_INDEX_ENABLED', 'true').lower() == 'true'
+    KEYFRAME_SNAP_TOLERANCE = float(os.getenv('KEYFRAME_SNAP_TOLERANCE', '0.5'))  # Seconds a cut may move
+    KEYFRAME_SCENE_THRESHOLD = float(os.getenv('KEYFRAME_SCENE_THRESHOLD', '0.3'))  # 0 skips scene detection
+    
+    # Asset downloads: one pooled keep-alive session, parallel transfers capped per host
+    DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '8'))
+    DOWNLOAD_PER_HOST = int(os.getenv('DOWNLOAD_PER_HOST', '4'))
+    DOWNLOAD_CHUNK_BYTES = int(os.getenv('DOWNLOAD_CHUNK_KB', '1024')) * 1024
+    DOWNLOAD_TIMEOUT = float(os.getenv('DOWNLOAD_TIMEOUT', '30'))  # Seconds to connect or between bytes
+    # Transient failures resume from the partial file after a jittered exponential backoff
+    DOWNLOAD_RETRIES = int(os.getenv('DOWNLOAD_RETRIES', '4'))
+    DOWNLOAD_BACKOFF_SECONDS = float(os.getenv('DOWNLOAD_BACKOFF_SECONDS', '0.5'))
+    DOWNLOAD_BACKOFF_MAX_SECONDS = float(os.getenv('DOWNLOAD_BACKOFF_MAX_SECONDS', '30'))
+    
+    # Pexels search responses: fresh for SEARCH_CACHE_TTL_SECONDS, then served for another
+    # SEARCH_CACHE_STALE_SECONDS while a background request refreshes them
+    SEARCH_CACHE_ENABLED = os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+    SEARCH_CACHE_PATH = os.path.join(ASSETS_DIR, "search_cache.sqlite")
+    SEARCH_CACHE_TTL_SECONDS = float(os.getenv('SEARCH_CACHE_TTL_SECONDS', '86400'))
+    SEARCH_CACHE_STALE_SECONDS = float(os.getenv('SEARCH_CACHE_STALE_SECONDS', '604800'))
+    
+    # Stock video files: the cheapest rendition that covers every output size with at most this
+    # much upscaling and has at least the render frame rate
+    RENDITION_MAX_UPSCALE = float(os.getenv('RENDITION_MAX_UPSCALE', '1.0'))
+    
     # Pexels API Configuration
     PEXELS_BASE_URL = "https://api.pexels.com/v1"
     PEXELS_VIDEOS_URL = "https://api.pexels.com/videos"
@@ -246,6 +379,10 @@ class Config:
             cls.IMAGES_DIR,
             cls.CLIPS_DIR,
             cls.AUDIO_DIR,
+            cls.CLIP_CACHE_DIR,
+            cls.STILL_CACHE_DIR,
+            cls.SEGMENT_STORE_DIR,
+            cls.ASSET_STORE_DIR,
             cls.OUTPUT_DIR
         ]
         
@@ -0,0 +1,403 @@
+"""
+Concurrent HTTP download engine.
+Single responsibility: Stream remote files to disk over pooled keep-alive connections, a bounded number per host at a time.
+"""
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "VideoGenerator/1.0"
+
+# Responses worth retrying: timeouts, throttling and server-side failures
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class TransientDownloadError(Exception):
+    """A failure that a later attempt may get past; the partial file is kept for resuming."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CorruptDownloadError(Exception):
+    """The partial file does not match what the server announced and must be restarted."""
+
+
+def parse_content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """First byte and total size from a Content-Range header ("bytes 100-199/1000" or "bytes */1000")."""
+    match = re.match(r"bytes\s+(?:(\d+)-\d+|\*)/(\d+|\*)", value or "")
+    if not match:
+        return None, None
+    start, total = match.groups()
+    return (int(start) if start else None), (int(total) if total != "*" else None)
+
+
+def parse_retry_after(response: requests.Response) -> Optional[float]:
+    """Delay in seconds from a Retry-After header (only the seconds form)."""
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.isdigit() else None
+
+
+def parse_checksum(headers: Mapping[str, str]) -> Optional[Tuple[str, str]]:
+    """Whole-file checksum announced by the server, as (algorithm, hex digest).
+
+    Reads Digest / Repr-Digest (sha-256 or md5) and Content-MD5, all base64 encoded.
+    """
+    candidates = []
+    for header in ("Repr-Digest", "Digest"):
+        for part in (headers.get(header) or "").split(","):
+            name, _, value = part.strip().partition("=")
+            candidates.append((name.lower(), value.strip(":")))
+    candidates.append(("md5", headers.get("Content-MD5") or ""))
+
+    for name, value in candidates:
+        algorithm = {"sha-256": "sha256", "md5": "md5"}.get(name)
+        if not algorithm or not value:
+            continue
+        try:
+            return algorithm, base64.b64decode(value, validate=True).hex()
+        except (binascii.Error, ValueError):
+            continue
+    return None
+
+
+def file_digest(path: str, algorithm: str) -> str:
+    """Hex digest of a file's contents."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class DownloadJob:
+    """One file to fetch."""
+
+    url: str
+    path: str  # Destination file
+    key: Optional[str] = None  # Provider ID of the asset, used by the asset store
+    sha256: Optional[str] = None  # Expected content digest, when known
+
+
+class DownloadManager:
+    """Downloads files in parallel through one pooled HTTP session.
+
+    Connections are kept alive and reused across transfers, so a batch pays
+    for one TLS handshake per connection instead of one per file. Transfers
+    run on a thread pool, at most per_host of them against the same host,
+    and are written to disk in chunk_bytes pieces as they arrive.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        per_host: int = None,
+        chunk_bytes: int = None,
+        timeout: float = None,
+        retries: int = None,
+        backoff: float = None,
+        backoff_max: float = None
+    ):
+        """Initialize the download manager.
+
+        Args:
+            workers: Most transfers running at once
+            per_host: Most transfers running at once against one host
+            chunk_bytes: Read and write buffer size
+            timeout: Seconds to wait for a connection or for the next bytes
+            retries: Further attempts after a transient failure
+            backoff: Base delay in seconds, doubled per attempt
+            backoff_max: Longest delay between attempts in seconds
+        """
+        self.workers = max(1, workers or Config.DOWNLOAD_WORKERS)
+        self.per_host = max(1, per_host or Config.DOWNLOAD_PER_HOST)
+        self.chunk_bytes = chunk_bytes or Config.DOWNLOAD_CHUNK_BYTES
+        self.timeout = timeout or Config.DOWNLOAD_TIMEOUT
+        self.retries = Config.DOWNLOAD_RETRIES if retries is None else retries
+        self.backoff = Config.DOWNLOAD_BACKOFF_SECONDS if backoff is None else backoff
+        self.backoff_max = Config.DOWNLOAD_BACKOFF_MAX_SECONDS if backoff_max is None else backoff_max
+        self.session = self._create_session()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        # Validator, size and checksum of partial files, from the response that started them;
+        # mirrored in <partial>.json so a later process can resume them too
+        self._resume_state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"downloads": 0, "failures": 0, "bytes": 0, "retries": 0, "resumed": 0, "corrupt": 0}
+
+    def _create_session(self) -> requests.Session:
+        """Session whose per-host connection pool holds every parallel transfer."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=max(self.workers, self.per_host))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['User-Agent'] = USER_AGENT
+        return session
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Semaphore limiting parallel transfers against the URL's host."""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def download(self, url: str, path: str, sha256: str = None) -> Optional[str]:
+        """Download one URL to a file, resuming after transient failures.
+
+        Bytes go to <path>.part, which is continued with a Range request after
+        a dropped connection, throttling or a server error, waiting a jittered
+        exponential backoff between attempts. The finished file is checked
+        against the announced length and any checksum before it is renamed
+        into place, so path only ever holds a complete file. A .part left by
+        failed attempts is resumed by the next call for the same path, also
+        from another process, using the validator saved next to it in
+        <path>.part.json; a .part without one is downloaded again from zero.
+
+        Args:
+            url: Remote file
+            path: Destination file
+            sha256: Expected SHA-256 hex digest, when the caller knows it
+
+        Returns:
+            The destination path, or None if the transfer failed
+        """
+        partial = f"{path}.part"
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                with self._host_slot(url):
+                    total, checksum = self._transfer(url, partial)
+                self._verify(partial, total, checksum, sha256)
+                os.replace(partial, path)
+                with self._lock:
+                    self.stats["downloads"] += 1
+                self._forget(partial)
+                return path
+
+            except TransientDownloadError as e:
+                error, retry_after = e, e.retry_after
+            except CorruptDownloadError as e:
+                # Start over: the bytes on disk cannot be trusted
+                error = e
+                self._discard(partial)
+                with self._lock:
+                    self.stats["corrupt"] += 1
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                error = e
+            except (requests.exceptions.RequestException, OSError) as e:
+                logger.error(f"Failed to download {url}: {str(e)}")
+                self._discard(partial)
+                break
+
+            if attempt == self.retries:
+                logger.error(f"Failed to download {url} after {attempt + 1} attempts: {str(error)}")
+                break
+            delay = self._backoff(attempt, retry_after)
+            logger.warning(f"Download of {os.path.basename(path)} failed ({str(error)}), retrying in {delay:.1f}s")
+            with self._lock:
+                self.stats["retries"] += 1
+            time.sleep(delay)
+
+        with self._lock:
+            self.stats["failures"] += 1
+        return None
+
+    def _transfer(self, url: str, partial: str) -> Tuple[Optional[int], Optional[Tuple[str, str]]]:
+        """Fetch the rest of a file into its partial file.
+
+        Returns:
+            Announced total size (None if unknown) and an announced (algorithm, hex digest) checksum
+
+        Raises:
+            TransientDownloadError: On throttling or server errors worth retrying
+            CorruptDownloadError: If the server answers a resume with the wrong range
+        """
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        state = self._load_state(partial)
+        if offset and not state.get("validator"):
+            # Without a validator the bytes on disk may belong to an older version of the file
+            logger.info(f"No validator for {os.path.basename(partial)}, downloading it again")
+            offset = 0
+        # Compressed transfers would break both byte ranges and the length check
+        headers = {"Accept-Encoding": "identity"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # Full body instead of a range if the file changed since the first attempt
+            headers["If-Range"] = state["validator"]
+
+        with self.session.get(url, stream=True, timeout=self.timeout, headers=headers) as response:
+            if response.status_code == 416 and offset:
+                total = parse_content_range(response.headers.get("Content-Range"))[1]
+                if total == offset:
+                    # Everything arrived before the last attempt failed
+                    return total, state.get("checksum")
+                raise CorruptDownloadError(f"cannot resume at byte {offset} of {total}")
+            if response.status_code in RETRY_STATUS:
+                raise TransientDownloadError(f"HTTP {response.status_code}", parse_retry_after(response))
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                start, total = parse_content_range(response.headers.get("Content-Range"))
+                if start != offset:
+                    raise CorruptDownloadError(f"server resumed at byte {start} instead of {offset}")
+                mode = 'ab'
+                with self._lock:
+                    self.stats["resumed"] += 1
+            else:
+                length = response.headers.get("Content-Length")
+                total = int(length) if length and length.isdigit() else None
+                state = {
+                    "validator": response.headers.get("ETag") or response.headers.get("Last-Modified"),
+                    "checksum": parse_checksum(response.headers)
+                }
+                mode = 'wb'
+            state["total"] = total or state.get("total")
+            # Saved before the body, so a transfer cut off by a crash can still be resumed
+            self._save_state(partial, state)
+
+            with open(partial, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_bytes):
+                    f.write(chunk)
+                    with self._lock:
+                        self.stats["bytes"] += len(chunk)
+
+        return state["total"], state.get("checksum")
+
+    def _verify(self, partial: str, total: Optional[int], checksum: Optional[Tuple[str, str]], sha256: str = None):
+        """Check a finished partial file against its announced length and checksums.
+
+        Raises:
+            TransientDownloadError: If bytes are missing (the connection closed early)
+            CorruptDownloadError: If there are too many bytes or a checksum does not match
+        """
+        size = os.path.getsize(partial)
+        if total is not None and size < total:
+            raise TransientDownloadError(f"connection closed at byte {size} of {total}")
+        if total is not None and size > total:
+            raise CorruptDownloadError(f"received {size} bytes, expected {total}")
+
+        expected = [checksum] if checksum else []
+        if sha256:
+            expected.append(("sha256", sha256))
+        for algorithm, digest in expected:
+            actual = file_digest(partial, algorithm)
+            if actual != digest.lower():
+                raise CorruptDownloadError(f"{algorithm} mismatch: {actual} != {digest.lower()}")
+
+    def _backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Seconds to wait before the next attempt: the server's Retry-After, else full-jitter exponential."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _state_path(partial: str) -> str:
+        """File next to a partial file holding its resume state."""
+        return f"{partial}.json"
+
+    def _load_state(self, partial: str) -> Dict[str, Any]:
+        """Resume state of a partial file, from memory or from the file an earlier process saved."""
+        with self._lock:
+            if partial in self._resume_state:
+                return dict(self._resume_state[partial])
+        try:
+            with open(self._state_path(partial), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            state = {
+                "validator": data.get("validator"),
+                "total": data.get("total"),
+                "checksum": tuple(data["checksum"]) if data.get("checksum") else None
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            state = {}
+        with self._lock:
+            return dict(self._resume_state.setdefault(partial, state))
+
+    def _save_state(self, partial: str, state: Dict[str, Any]):
+        """Record the resume state of a partial file in memory and next to it."""
+        with self._lock:
+            self._resume_state[partial] = dict(state)
+        path = self._state_path(partial)
+        temporary = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({**state, "checksum": list(state["checksum"]) if state.get("checksum") else None}, f)
+            os.replace(temporary, path)
+        except OSError as e:
+            # Resuming in this process still works from memory
+            logger.warning(f"Cannot save resume state {path}: {str(e)}")
+
+    def _forget(self, partial: str):
+        """Drop the resume state of a partial file."""
+        with self._lock:
+            self._resume_state.pop(partial, None)
+        try:
+            os.remove(self._state_path(partial))
+        except OSError:
+            pass
+
+    def _discard(self, partial: str):
+        """Remove a partial file and forget how to resume it."""
+        self._forget(partial)
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+
+    def download_many(
+        self,
+        jobs: List[DownloadJob],
+        fetch: Callable[[DownloadJob], Optional[str]] = None
+    ) -> List[Optional[str]]:
+        """Run a batch of downloads in parallel.
+
+        Args:
+            jobs: Files to fetch
+            fetch: Runs one job in place of a plain download (e.g. through the asset store);
+                it should download through this manager, so the per-host limit still applies
+
+        Returns:
+            Destination path or None for each job, in job order
+        """
+        if not jobs:
+            return []
+        fetch = fetch or (lambda job: self.download(job.url, job.path, job.sha256))
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+            return list(pool.map(fetch, jobs))
+
+
+# Global download manager shared by the pipeline, so connections stay warm across queries
+_download_manager = None
+_download_manager_lock = threading.Lock()
+
+
+def get_download_manager() -> DownloadManager:
+    """Get the global download manager."""
+    global _download_manager
+    with _download_manager_lock:
+        if _download_manager is None:
+            _download_manager = DownloadManager()
+        return _download_manager
@@ -0,0 +1,130 @@
+"""
+Named encoding profiles.
+Single responsibility: Turn a profile from Config.ENCODING_PROFILES into encoder options for ffmpeg and MoviePy.
+"""
+import hashlib
+import json
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional
+
+from config import Config
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    """Encoder settings for final outputs: codec, speed/size tradeoff, GOP and container flags."""
+
+    name: str
+    codec: str = "libx264"
+    preset: Optional[str] = None  # Encoder default when None
+    crf: Optional[int] = None
+    tune: Optional[str] = None
+    threads: int = 0  # 0 lets the encoder decide
+    gop_seconds: Optional[float] = None  # Keyframe interval; encoder default when None
+    audio_bitrate: Optional[str] = None
+    faststart: bool = True  # Move the index to the front so players can start before the download ends
+
+    @classmethod
+    def from_config(cls, name: str = None) -> "EncodingProfile":
+        """Look up a profile in Config.ENCODING_PROFILES.
+
+        Args:
+            name: Profile name; defaults to Config.ENCODING_PROFILE
+
+        Raises:
+            ValueError: If the profile is unknown
+        """
+        name = name or Config.ENCODING_PROFILE
+        settings = Config.ENCODING_PROFILES.get(name)
+        if settings is None:
+            raise ValueError(f"Unknown encoding profile '{name}' (known: {', '.join(Config.ENCODING_PROFILES)})")
+        settings = dict(settings)
+        if Config.ENCODE_THREADS:
+            settings["threads"] = Config.ENCODE_THREADS
+        return cls(name=name, **settings)
+
+    def with_crf(self, crf: Optional[int]) -> "EncodingProfile":
+        """The same profile with another CRF (unchanged when crf is None)."""
+        return self if crf is None else replace(self, crf=crf)
+
+    @property
+    def stream_key(self) -> str:
+        """Short hash of the settings that shape the encoded stream, for cache file names."""
+        settings = asdict(self)
+        # Thread count changes encode speed, not the stream
+        settings.pop("threads")
+        return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+    def for_stills(self) -> "EncodingProfile":
+        """The same profile tuned for still pictures, where the encoder supports it."""
+        return replace(self, tune="stillimage") if self.codec == "libx264" else self
+
+    def output_options(self, fps: int = None, threads: int = None) -> Dict[str, str]:
+        """Video encoder options as ffmpeg option names and values.
+
+        Args:
+            fps: Output frame rate, needed to express the GOP length in frames
+            threads: Encoder threads, overriding the profile's
+
+        Returns:
+            Options in the order they are passed to ffmpeg
+        """
+        options = {"c:v": self.codec, "pix_fmt": "yuv420p"}
+        if self.preset:
+            options["preset"] = self.preset
+        if self.crf is not None:
+            options["crf"] = str(self.crf)
+        if self.tune:
+            options["tune"] = self.tune
+        if fps and self.gop_seconds:
+            options["g"] = str(max(1, round(fps * self.gop_seconds)))
+        threads = self.threads if threads is None else threads
+        if threads:
+            options["threads"] = str(threads)
+        if self.codec == "libx265":
+            # Tag HEVC as hvc1 so Apple players accept the MP4
+            options["tag:v"] = "hvc1"
+        return options
+
+    def video_args(self, fps: int = None, threads: int = None) -> List[str]:
+        """Video encoder options as ffmpeg arguments (see output_options)."""
+        args = []
+        for option, value in self.output_options(fps, threads).items():
+            args += [f"-{option}", value]
+        return args
+
+    def audio_args(self) -> List[str]:
+        """AAC encoder arguments for the narration track."""
+        args = ['-c:a', 'aac']
+        if self.audio_bitrate:
+            args += ['-b:a', self.audio_bitrate]
+        return args
+
+    def container_args(self) -> List[str]:
+        """MP4 muxer arguments."""
+        return ['-movflags', '+faststart'] if self.faststart else []
+
+    def moviepy_params(self, fps: int) -> Dict[str, object]:
+        """Keyword arguments for MoviePy's write_videofile.
+
+        Args:
+            fps: Output frame rate
+
+        Returns:
+            codec, preset, threads, audio bitrate and the remaining options as ffmpeg_params
+        """
+        options = self.output_options(fps)
+        # MoviePy sets the pixel format itself
+        options.pop("pix_fmt")
+        params = {"codec": options.pop("c:v"), "audio_codec": "aac"}
+        if "preset" in options:
+            params["preset"] = options.pop("preset")
+        if "threads" in options:
+            params["threads"] = int(options.pop("threads"))
+        if self.audio_bitrate:
+            params["audio_bitrate"] = self.audio_bitrate
+        ffmpeg_params = []
+        for option, value in options.items():
+            ffmpeg_params += [f"-{option}", value]
+        params["ffmpeg_params"] = ffmpeg_params + self.container_args()
+        return params
@@ -0,0 +1,259 @@
+"""
+FFmpeg process runner with machine-readable progress.
+Single responsibility: Run one ffmpeg command, publish its -progress reports and kill it when it stops advancing.
+"""
+import io
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Key=value progress blocks on stdout instead of the human-readable stats line on stderr
+PROGRESS_ARGS = ['-progress', 'pipe:1', '-nostats']
+
+# How often the stall clock is checked
+POLL_SECONDS = 1.0
+
+# Lines of ffmpeg's error output kept for the failure message
+STDERR_LINES = 200
+
+
+def parse_out_time(values: Dict[str, str]) -> float:
+    """Output position in seconds from a progress block.
+
+    out_time_ms holds microseconds too; ffmpeg kept the name for compatibility.
+    """
+    for key in ('out_time_us', 'out_time_ms'):
+        try:
+            return max(0.0, int(values[key]) / 1_000_000)
+        except (KeyError, ValueError):
+            continue
+    try:
+        hours, minutes, seconds = values.get('out_time', '').split(':')
+        return max(0.0, int(hours) * 3600 + int(minutes) * 60 + float(seconds))
+    except ValueError:
+        return 0.0
+
+
+def parse_speed(value: Optional[str]) -> Optional[float]:
+    """Parse a speed such as "1.85x" (None for "N/A")."""
+    try:
+        speed = float((value or "").strip().rstrip('x'))
+        return speed if speed > 0 else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProgressEvent:
+    """One progress report of a running ffmpeg process."""
+
+    label: str  # Output file name
+    frame: int = 0
+    fps: float = 0.0  # Frames encoded per wall-clock second
+    speed: Optional[float] = None  # Output seconds written per wall-clock second
+    out_time: float = 0.0  # Output seconds written so far
+    duration: Optional[float] = None  # Expected output duration, when known
+    eta: Optional[float] = None  # Seconds until done, when duration and speed are known
+    done: bool = False
+
+    @classmethod
+    def from_progress(
+        cls,
+        label: str,
+        values: Dict[str, str],
+        duration: Optional[float] = None,
+        done: bool = False
+    ) -> "ProgressEvent":
+        """Build from one -progress block (key=value pairs up to the progress= line)."""
+        try:
+            frame = int(values.get('frame', 0))
+        except ValueError:
+            frame = 0
+        try:
+            fps = float(values.get('fps', 0))
+        except ValueError:
+            fps = 0.0
+        out_time = parse_out_time(values)
+        speed = parse_speed(values.get('speed'))
+
+        eta = None
+        if done:
+            eta = 0.0
+        elif duration and speed:
+            eta = max(0.0, duration - out_time) / speed
+        return cls(label, frame, fps, speed, out_time, duration, eta, done)
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Share of the expected duration written, in percent."""
+        if self.done:
+            return 100.0
+        if not self.duration:
+            return None
+        return min(100.0, 100.0 * self.out_time / self.duration)
+
+
+@dataclass
+class FFmpegResult:
+    """Outcome of one ffmpeg run."""
+
+    returncode: int
+    stderr: str = ""
+    stalled: bool = False  # Killed after making no progress for the stall timeout
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.stalled
+
+
+class FFmpegRunner:
+    """Runs ffmpeg commands with -progress output.
+
+    Every progress block becomes a ProgressEvent passed to on_progress (pass
+    queue.put to feed a queue). A process whose frame count and output
+    position stop advancing for stall_timeout seconds is killed, so a stuck
+    render fails instead of hanging the job.
+    """
+
+    def __init__(
+        self,
+        on_progress: Callable[[ProgressEvent], None] = None,
+        stall_timeout: float = None,
+        log_interval: float = None
+    ):
+        """Initialize the runner.
+
+        Args:
+            on_progress: Called with every progress event, from a reader thread
+            stall_timeout: Seconds without progress before the process is killed (0 disables)
+            log_interval: Seconds between progress log lines per process (0 disables)
+        """
+        self.on_progress = on_progress
+        self.stall_timeout = Config.FFMPEG_STALL_TIMEOUT if stall_timeout is None else stall_timeout
+        self.log_interval = Config.FFMPEG_PROGRESS_LOG_SECONDS if log_interval is None else log_interval
+
+    @staticmethod
+    def build_command(command: List[str]) -> List[str]:
+        """The command with progress reporting switched on."""
+        return command[:1] + PROGRESS_ARGS + command[1:]
+
+    def run(
+        self,
+        command: List[str],
+        duration: float = None,
+        feed: Callable[[BinaryIO], None] = None,
+        on_exit: Callable[[], None] = None
+    ) -> FFmpegResult:
+        """Run one ffmpeg command to completion.
+
+        Args:
+            command: ffmpeg argument list ending with the output path
+            duration: Expected output duration in seconds, used for the ETA
+            feed: Writes the process's standard input (for pipe:0 inputs), from a writer thread
+            on_exit: Called as soon as the process has exited or was killed, before the
+                threads are joined, so a feed waiting on its own input can be stopped
+
+        Returns:
+            FFmpegResult with the exit code and the tail of the error output
+
+        Raises:
+            FileNotFoundError: If the ffmpeg executable is missing
+        """
+        label = os.path.basename(command[-1])
+        process = subprocess.Popen(
+            self.build_command(command),
+            stdin=subprocess.PIPE if feed else subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        last_advance = [time.monotonic()]
+        stderr_tail = deque(maxlen=STDERR_LINES)
+
+        def read_progress():
+            values = {}
+            position = None
+            last_log = time.monotonic()
+            for line in io.TextIOWrapper(process.stdout, encoding='utf-8', errors='replace'):
+                key, _, value = line.strip().partition('=')
+                if key != 'progress':
+                    values[key] = value
+                    continue
+                event = ProgressEvent.from_progress(label, values, duration, done=value == 'end')
+                values = {}
+                if (event.frame, event.out_time) != position:
+                    position = (event.frame, event.out_time)
+                    last_advance[0] = time.monotonic()
+                if self.log_interval and (event.done or time.monotonic() - last_log >= self.log_interval):
+                    last_log = time.monotonic()
+                    self._log(event)
+                self._publish(event)
+
+        def read_errors():
+            for line in io.TextIOWrapper(process.stderr, encoding='utf-8', errors='replace'):
+                stderr_tail.append(line)
+
+        def write_input():
+            try:
+                feed(process.stdin)
+            except OSError as e:
+                # The process exited early; its exit code tells why
+                logger.debug(f"ffmpeg stopped reading its input: {str(e)}")
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+
+        readers = [threading.Thread(target=read_progress, daemon=True), threading.Thread(target=read_errors, daemon=True)]
+        if feed:
+            readers.append(threading.Thread(target=write_input, daemon=True))
+        for reader in readers:
+            reader.start()
+
+        stalled = False
+        while True:
+            try:
+                process.wait(timeout=POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                if self.stall_timeout and time.monotonic() - last_advance[0] > self.stall_timeout:
+                    logger.error(f"ffmpeg made no progress for {self.stall_timeout:.0f}s, killing it: {label}")
+                    process.kill()
+                    process.wait()
+                    stalled = True
+                    break
+
+        if on_exit:
+            on_exit()
+        for reader in readers:
+            reader.join()
+        return FFmpegResult(process.returncode, "".join(stderr_tail), stalled)
+
+    def _publish(self, event: ProgressEvent):
+        """Hand an event to the listener; a failing listener never breaks the render."""
+        if not self.on_progress:
+            return
+        try:
+            self.on_progress(event)
+        except Exception as e:
+            logger.debug(f"Progress listener failed: {str(e)}")
+
+    @staticmethod
+    def _log(event: ProgressEvent):
+        """Log one progress line."""
+        parts = [f"{event.percent:.0f}%" if event.percent is not None else f"{event.out_time:.1f}s"]
+        parts.append(f"frame={event.frame} fps={event.fps:.1f}")
+        if event.speed:
+            parts.append(f"speed={event.speed:.2f}x")
+        if event.eta is not None:
+            parts.append(f"eta={event.eta:.0f}s")
+        logger.info(f"{event.label}: {' '.join(parts)}")
@@ -0,0 +1,609 @@
+"""
+Single-pass FFmpeg render backend.
+Single responsibility: Turn a clip list, narration and subtitles into one filter_complex graph and encode it once.
+"""
+import logging
+import os
+import re
+import shutil
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_progress import FFmpegRunner
+from media_probe import get_media_probe
+from subtitle_tracks import burned_srt, track_args, track_srt
+from timeline import TimelineEntry, TimelinePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A timeline segment: (kind, path, duration) where kind is "image" or "video"
+Segment = Tuple[str, str, float]
+
+
+def escape_filter_value(value: str) -> str:
+    """Escape a filter option value for use inside a filter_complex graph.
+
+    The value is parsed twice by ffmpeg: once as a filter option and once as
+    part of the graph description, so it is escaped for both levels.
+
+    Args:
+        value: Raw option value (e.g. a subtitle file path)
+
+    Returns:
+        Escaped option value
+    """
+    option_level = re.sub(r"([\\':])", r"\\\1", value)
+    return re.sub(r"([\\'\[\],;])", r"\\\1", option_level)
+
+
+def normalize_filter(resolution: tuple, fps: int) -> str:
+    """Filter chain that brings any input to the given geometry and frame rate.
+
+    The picture is scaled to cover the frame and center-cropped, so clips of
+    any aspect ratio fill the output without letterboxing.
+
+    Args:
+        resolution: Target (width, height)
+        fps: Target frame rate
+
+    Returns:
+        Comma-separated filter chain
+    """
+    width, height = resolution
+    return (
+        f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+        f"crop={width}:{height},setsar=1,fps={fps},format=yuv420p"
+    )
+
+
+@dataclass(frozen=True)
+class OutputTarget:
+    """One platform variant of a render: its frame geometry and encoder quality."""
+
+    name: str
+    resolution: Tuple[int, int]
+    crf: Optional[int] = None  # Overrides the encoding profile's CRF
+
+    @classmethod
+    def from_config(cls, name: str) -> "OutputTarget":
+        """Look up a target in Config.OUTPUT_TARGETS.
+
+        Raises:
+            ValueError: If the target is unknown
+        """
+        settings = Config.OUTPUT_TARGETS.get(name)
+        if settings is None:
+            raise ValueError(f"Unknown output target '{name}' (known: {', '.join(Config.OUTPUT_TARGETS)})")
+        return cls(name=name, resolution=tuple(settings["resolution"]), crf=settings.get("crf"))
+
+    @property
+    def encode_key(self) -> Tuple[Tuple[int, int], Optional[int]]:
+        """Targets with equal keys produce identical files."""
+        return self.resolution, self.crf
+
+
+class FFmpegRenderer:
+    """Renders a video timeline with a single ffmpeg encode."""
+
+    def __init__(
+        self,
+        fps: int = None,
+        resolution: tuple = None,
+        profile: EncodingProfile = None,
+        runner: FFmpegRunner = None
+    ):
+        """Initialize renderer with output settings.
+
+        Args:
+            fps: Frames per second for output video
+            resolution: Video resolution as (width, height)
+            profile: Encoding profile; defaults to Config.ENCODING_PROFILE
+            runner: Runs ffmpeg and reports its progress
+        """
+        self.fps = fps or Config.DEFAULT_FPS
+        self.resolution = resolution or Config.DEFAULT_RESOLUTION
+        self.profile = profile or EncodingProfile.from_config()
+        self.runner = runner or FFmpegRunner()
+
+    def get_duration(self, media_path: str) -> Optional[float]:
+        """Read the container duration of a media file.
+
+        Args:
+            media_path: Path to audio or video file
+
+        Returns:
+            Duration in seconds, or None if it could not be read
+        """
+        duration = get_media_probe().duration(media_path)
+        if duration is None:
+            logger.warning(f"Failed to read duration of {media_path}")
+        return duration
+
+    def plan_segments(
+        self,
+        image_paths: List[str] = None,
+        video_paths: List[str] = None,
+        image_duration: float = None
+    ) -> List[Segment]:
+        """Collect the timeline segments in the same order as the MoviePy path.
+
+        Args:
+            image_paths: List of image file paths
+            video_paths: List of video file paths
+            image_duration: Duration for each image in seconds
+
+        Returns:
+            List of (kind, path, duration) segments
+        """
+        image_duration = image_duration or Config.DEFAULT_DURATION
+        segments = []
+
+        # Probe every clip in one parallel batch; get_duration below reads the cache
+        get_media_probe().probe_many([path for path in video_paths or [] if os.path.exists(path)])
+
+        for image_path in image_paths or []:
+            if os.path.exists(image_path):
+                segments.append(("image", image_path, float(image_duration)))
+            else:
+                logger.warning(f"Image not found: {image_path}")
+
+        for video_path in video_paths or []:
+            if not os.path.exists(video_path):
+                logger.warning(f"Video not found: {video_path}")
+                continue
+            duration = self.get_duration(video_path)
+            if duration:
+                segments.append(("video", video_path, duration))
+            else:
+                logger.error(f"Failed to load video {video_path}: unknown duration")
+
+        return segments
+
+    def plan_timeline(self, segments: List[Segment], duration: float = None) -> TimelinePlan:
+        """Decide which range of which segment plays when, before anything is decoded.
+
+        Args:
+            segments: Segments with their natural durations
+            duration: Required timeline duration; defaults to the segments' total
+
+        Returns:
+            Timeline plan covering exactly the duration
+        """
+        timeline_duration = sum(segment[2] for segment in segments)
+        if duration is None:
+            duration = timeline_duration
+        elif duration > timeline_duration:
+            logger.info(f"Extending timeline from {timeline_duration:.2f}s to {duration:.2f}s")
+        elif duration < timeline_duration:
+            logger.info(f"Trimming timeline from {timeline_duration:.2f}s to {duration:.2f}s")
+        return TimelinePlan.fill(segments, duration)
+
+    def _normalize_filter(self) -> str:
+        """Filter chain that brings any input to the output geometry and frame rate."""
+        return normalize_filter(self.resolution, self.fps)
+
+    def encoder_args(self, threads: int = None, profile: EncodingProfile = None) -> List[str]:
+        """Video encoder settings shared by every encode of this renderer.
+
+        Segments encoded separately must use identical settings so they can be
+        joined with stream copy.
+
+        Args:
+            threads: Encoder threads, overriding the profile's
+            profile: Profile to use instead of the renderer's (e.g. a per-target CRF)
+        """
+        profile = profile or self.profile
+        args = profile.video_args(self.fps, threads=0) + ['-r', str(self.fps)]
+        # Threads last: they change how fast the stream is encoded, not the stream itself
+        threads = profile.threads if threads is None else threads
+        if threads:
+            args += ['-threads', str(threads)]
+        return args
+
+    def _subtitle_filter(self, srt_path: str) -> str:
+        """Filter that burns an SRT file with the configured libass style."""
+        return (
+            f"subtitles=filename={escape_filter_value(os.path.abspath(srt_path))}"
+            f":force_style={escape_filter_value(Config.SUBTITLE_FFMPEG_STYLE)}"
+        )
+
+    def input_args(self, entry: TimelineEntry, loop: bool = False) -> List[str]:
+        """Input options that open only the planned range of a source.
+
+        Args:
+            entry: Timeline entry to open
+            loop: Loop the source at the input (for a single clip repeated)
+
+        Returns:
+            ffmpeg input options ending with -i <source>
+        """
+        args = []
+        if entry.kind == "image":
+            args += ['-loop', '1', '-framerate', str(self.fps)]
+        elif loop:
+            args += ['-stream_loop', '-1']
+        elif entry.in_point > 0:
+            # Input-side seek: the demuxer jumps to the nearest keyframe instead of decoding up to it
+            args += ['-ss', f"{entry.in_point:.3f}"]
+        # Input-side duration limit: the decoder stops once the range is covered
+        args += ['-t', f"{entry.duration:.3f}", '-i', entry.source]
+        return args
+
+    @staticmethod
+    def _input_entries(plan: TimelinePlan) -> Tuple[List[TimelineEntry], bool]:
+        """Entries to open as inputs, and whether the single one is looped at the input."""
+        entries = plan.entries
+        loop_single_clip = (
+            len(entries) > 1
+            and len(plan.sources) == 1
+            and all(entry.in_point == 0 for entry in entries)
+        )
+        if loop_single_clip:
+            # One clip repeated: loop it at the input instead of opening it once per pass
+            entries = [replace(entries[0], out_point=plan.duration)]
+        return entries, loop_single_clip
+
+    def build_command(
+        self,
+        plan: TimelinePlan,
+        output_path: str,
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command line for a timeline plan.
+
+        Args:
+            plan: Timeline plan; its duration is the output duration
+            output_path: Output video path
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+        filters = []
+        duration = plan.duration
+        entries, loop_single_clip = self._input_entries(plan)
+
+        for index, entry in enumerate(entries):
+            args += self.input_args(entry, loop=loop_single_clip)
+            filters.append(f"[{index}:v]{self._normalize_filter()}[v{index}]")
+
+        if audio_path:
+            args += ['-i', audio_path]
+        track = track_srt(srt_path, subtitle_mode)
+        if track:
+            args += ['-i', track]
+
+        labels = "".join(f"[v{index}]" for index in range(len(entries)))
+        filters.append(f"{labels}concat=n={len(entries)}:v=1:a=0[vcat]")
+
+        final_chain = f"trim=duration={duration:.3f},setpts=PTS-STARTPTS"
+        if burned_srt(srt_path, subtitle_mode):
+            final_chain += f",{self._subtitle_filter(srt_path)}"
+        filters.append(f"[vcat]{final_chain}[vout]")
+
+        args += ['-filter_complex', ";".join(filters), '-map', '[vout]']
+
+        if audio_path:
+            # Inputs are numbered in order, so the narration comes right after the video inputs
+            args += ['-map', f"{len(entries)}:a"] + self.profile.audio_args()
+        if track:
+            args += track_args(len(entries) + (1 if audio_path else 0), output_path, language)
+
+        args += self.encoder_args() + self.profile.container_args() + ['-t', f"{duration:.3f}", output_path]
+        return args
+
+    def build_targets_command(
+        self,
+        plan: TimelinePlan,
+        outputs: List[Tuple[OutputTarget, str]],
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> List[str]:
+        """Build one ffmpeg command that writes several output targets.
+
+        Every input is decoded once and split inside the graph; each branch is
+        scaled and cropped to its target, concatenated, subtitled and encoded
+        with the target's own settings.
+
+        Args:
+            plan: Timeline plan; its duration is the output duration
+            outputs: (target, output path) pairs
+            audio_path: Optional narration track
+            srt_path: Optional SRT file for every output
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+        filters = []
+        duration = plan.duration
+        entries, loop_single_clip = self._input_entries(plan)
+
+        for index, entry in enumerate(entries):
+            args += self.input_args(entry, loop=loop_single_clip)
+            if len(outputs) == 1:
+                branches = [f"[{index}:v]"]
+            else:
+                branches = [f"[s{index}_{target_index}]" for target_index in range(len(outputs))]
+                filters.append(f"[{index}:v]split={len(outputs)}{''.join(branches)}")
+            for target_index, ((target, _), branch) in enumerate(zip(outputs, branches)):
+                filters.append(f"{branch}{normalize_filter(target.resolution, self.fps)}[v{target_index}_{index}]")
+
+        if audio_path:
+            args += ['-i', audio_path]
+        track = track_srt(srt_path, subtitle_mode)
+        if track:
+            args += ['-i', track]
+
+        final_chain = f"trim=duration={duration:.3f},setpts=PTS-STARTPTS"
+        if burned_srt(srt_path, subtitle_mode):
+            # libass lays subtitles out per frame size, so each target burns its own
+            final_chain += f",{self._subtitle_filter(srt_path)}"
+
+        for target_index, (target, output_path) in enumerate(outputs):
+            labels = "".join(f"[v{target_index}_{index}]" for index in range(len(entries)))
+            filters.append(f"{labels}concat=n={len(entries)}:v=1:a=0[vcat{target_index}]")
+            filters.append(f"[vcat{target_index}]{final_chain}[vout{target_index}]")
+
+        args += ['-filter_complex', ";".join(filters)]
+
+        for target_index, (target, output_path) in enumerate(outputs):
+            args += ['-map', f"[vout{target_index}]"]
+            if audio_path:
+                args += ['-map', f"{len(entries)}:a"] + self.profile.audio_args()
+            if track:
+                args += track_args(len(entries) + (1 if audio_path else 0), output_path, language)
+            args += self.encoder_args(profile=self.profile.with_crf(target.crf)) + self.profile.container_args()
+            args += ['-t', f"{duration:.3f}", output_path]
+        return args
+
+    def build_color_command(
+        self,
+        output_path: str,
+        duration: float = None,
+        audio_path: str = None,
+        srt_path: str = None,
+        color: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command for a solid background generated by lavfi.
+
+        Subtitles are burned in the same pass. The picture only changes when a
+        cue does, so repeated frames are dropped before the encoder (keeping at
+        least one per second) and the rest is written as variable frame rate
+        with still-image tuning: a few hundred frames are encoded instead of
+        fps x duration. The source stops one frame early and tpad clones the
+        last kept frame into that slot, so the video track still ends exactly
+        at the duration, however long the final still stretch is.
+
+        Args:
+            output_path: Output video path
+            duration: Output duration; when unknown the render stops with the audio
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            color: Background color (ffmpeg color syntax)
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        width, height = self.resolution
+        source = f"color=c={color or Config.BACKGROUND_COLOR}:s={width}x{height}:r={self.fps}"
+        frames = max(1, round(duration * self.fps)) if duration else 0
+        if duration:
+            # End between the last two frames: the source's end-of-stream then lands on the last frame's slot
+            source += f":d={(frames - 1.5) / self.fps:.6f}" if frames > 1 else f":d={duration:.3f}"
+
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-f', 'lavfi', '-i', source]
+        if audio_path:
+            args += ['-i', audio_path]
+        track = track_srt(srt_path, subtitle_mode)
+        if track:
+            args += ['-i', track]
+
+        video_filter = "format=yuv420p"
+        if burned_srt(srt_path, subtitle_mode):
+            video_filter += f",{self._subtitle_filter(srt_path)}"
+        video_filter += f",mpdecimate=max={self.fps}:hi=1:lo=1:frac=0"
+        if frames > 1:
+            # Decimation drops the trailing duplicates, which would end the video before the narration
+            video_filter += ",tpad=stop_mode=clone:stop=1"
+        args += ['-vf', video_filter, '-map', '0:v']
+
+        if audio_path:
+            args += ['-map', '1:a'] + self.profile.audio_args()
+        if track:
+            args += track_args(2 if audio_path else 1, output_path, language)
+
+        # No -r or GOP here: a constant output rate would duplicate the dropped frames again.
+        # No B-frames either: their reordering delay would make the MP4 track end early
+        args += replace(self.profile.for_stills(), gop_seconds=None).video_args() + ['-bf', '0', '-fps_mode', 'vfr']
+        if duration:
+            args += ['-t', f"{duration:.3f}"]
+        elif audio_path:
+            args += ['-shortest']
+        args += self.profile.container_args() + [output_path]
+        return args
+
+    def render_color(
+        self,
+        output_path: str,
+        duration: float = None,
+        audio_path: str = None,
+        srt_path: str = None,
+        color: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> Optional[str]:
+        """Render a solid background with optional narration and subtitles.
+
+        Args:
+            output_path: Output video path
+            duration: Output duration; when unknown the render stops with the audio
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            color: Background color (ffmpeg color syntax)
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        if not duration and not audio_path:
+            logger.error("Background render needs a duration or an audio track")
+            return None
+        # A known length keeps the video as long as the narration; -shortest is the fallback
+        duration = duration or get_media_probe().duration(audio_path)
+
+        command = self.build_color_command(output_path, duration, audio_path, srt_path, color, subtitle_mode, language)
+        logger.info(f"Rendering background video with FFmpeg: {output_path}")
+        return output_path if self._run(command, duration) else None
+
+    def render(
+        self,
+        plan: TimelinePlan,
+        output_path: str,
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> Optional[str]:
+        """Render a timeline plan to a file with one encode.
+
+        Args:
+            plan: Timeline plan from plan_timeline
+            output_path: Output video path
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        try:
+            if not plan.entries:
+                logger.error("No valid clips found to render")
+                return None
+
+            command = self.build_command(plan, output_path, audio_path, srt_path, subtitle_mode, language)
+            logger.info(f"Rendering {len(plan)} timeline entries with FFmpeg: {output_path}")
+            return output_path if self._run(command, plan.duration) else None
+
+        except Exception as e:
+            logger.error(f"FFmpeg render failed: {str(e)}")
+            return None
+
+    def render_targets(
+        self,
+        plan: TimelinePlan,
+        outputs: Dict[str, str],
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> Dict[str, str]:
+        """Render a timeline plan to several output targets with one decode.
+
+        Targets that would produce identical files are encoded once and the
+        result is copied to the other paths.
+
+        Args:
+            plan: Timeline plan from plan_timeline
+            outputs: Output path by target name (see Config.OUTPUT_TARGETS)
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            Output path by target name; empty if the render failed
+        """
+        try:
+            if not plan.entries:
+                logger.error("No valid clips found to render")
+                return {}
+
+            encodes = {}
+            for name, output_path in outputs.items():
+                target = OutputTarget.from_config(name)
+                encodes.setdefault(target.encode_key, []).append((target, output_path))
+
+            command = self.build_targets_command(
+                plan, [group[0] for group in encodes.values()], audio_path, srt_path, subtitle_mode, language
+            )
+            logger.info(f"Rendering {len(outputs)} targets ({len(encodes)} encodes) with FFmpeg")
+            if not self._run(command, plan.duration):
+                return {}
+
+            for (_, encoded_path), *copies in encodes.values():
+                for _, output_path in copies:
+                    shutil.copyfile(encoded_path, output_path)
+            return dict(outputs)
+
+        except Exception as e:
+            logger.error(f"FFmpeg multi-target render failed: {str(e)}")
+            return {}
+
+    def build_mux_command(self, video_path: str, srt_path: str, output_path: str, language: str = None) -> List[str]:
+        """Build the ffmpeg command that adds an SRT as a text track by stream copy.
+
+        Args:
+            video_path: Rendered video; picture and audio are copied
+            srt_path: SRT file to mux
+            output_path: Output video path
+            language: Language code used to tag the track
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-i', video_path, '-i', srt_path]
+        args += ['-map', '0:v', '-map', '0:a?', '-c:v', 'copy', '-c:a', 'copy']
+        args += track_args(1, output_path, language) + self.profile.container_args() + [output_path]
+        return args
+
+    def mux_subtitles(self, video_path: str, srt_path: str, output_path: str, language: str = None) -> Optional[str]:
+        """Add an SRT as a text track without re-encoding (see build_mux_command).
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        logger.info(f"Muxing subtitle track: {os.path.basename(srt_path)}")
+        command = self.build_mux_command(video_path, srt_path, output_path, language)
+        return output_path if self._run(command) else None
+
+    def _run(self, command: List[str], duration: float = None) -> bool:
+        """Run one ffmpeg command, logging its error output on failure.
+
+        Args:
+            command: ffmpeg argument list
+            duration: Expected output duration in seconds, for progress reports
+        """
+        logger.debug(f"FFmpeg command: {' '.join(command)}")
+        try:
+            result = self.runner.run(command, duration)
+        except FileNotFoundError:
+            logger.error("FFmpeg render failed: ffmpeg executable not found")
+            return False
+        if not result.ok:
+            logger.error(f"FFmpeg render failed: {result.stderr.strip()[-2000:]}")
+            return False
+        logger.info(f"FFmpeg render complete: {command[-1]}")
+        return True
@@ -0,0 +1,214 @@
+"""
+Size-bounded directory of generated media files.
+Single responsibility: Produce each cache entry once, atomically, and evict least recently used entries.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+from keyed_locks import KeyedLocks
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """Directory of .mp4 entries shared by the clip, still and segment caches.
+
+    Each entry is produced once even when several jobs ask for it at the
+    same time, written under a private partial name and renamed into place,
+    so readers never see a partial file. The directory is bounded by size
+    and evicts least recently used entries, but never ones used within
+    min_idle seconds or ones the caller is about to use.
+    """
+
+    entry_name = "entry"  # Noun used in log messages
+
+    def __init__(self, cache_dir: str, max_mb: float, min_idle: float = None):
+        """Initialize the cache directory.
+
+        Args:
+            cache_dir: Directory for cache entries
+            max_mb: Size limit in MB (0 disables eviction)
+            min_idle: Seconds since last use before an entry may be evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_mb = max_mb
+        self.min_idle = Config.CLIP_CACHE_MIN_IDLE_SECONDS if min_idle is None else min_idle
+
+        self._source_hashes: Dict[Tuple[str, int, int], str] = {}
+        self._key_locks = KeyedLocks()
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "failures": 0, "evictions": 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def source_hash(self, source_path: str) -> str:
+        """Content hash of a source file, memoized by path, size and mtime.
+
+        Args:
+            source_path: Path to the source file
+
+        Returns:
+            Hex SHA-256 digest of the file contents
+        """
+        info = os.stat(source_path)
+        memo_key = (os.path.abspath(source_path), info.st_size, info.st_mtime_ns)
+        with self._lock:
+            if memo_key in self._source_hashes:
+                return self._source_hashes[memo_key]
+
+        digest = hashlib.sha256()
+        with open(source_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        with self._lock:
+            self._source_hashes[memo_key] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def _get_or_create(self, target: str, write: Callable[[str], bool]) -> Optional[str]:
+        """Return a cache entry, producing it on a miss.
+
+        Does not evict: callers run evict() once the entries they are about
+        to use are known, keeping those.
+
+        Args:
+            target: Path of the cache entry
+            write: Writes the entry to the given partial path and returns whether it succeeded
+
+        Returns:
+            Path to the entry, or None if it could not be produced
+        """
+        # One encode per entry, even when several jobs ask for it at once
+        with self._key_locks.hold(target):
+            if os.path.exists(target):
+                with self._lock:
+                    self.stats["hits"] += 1
+                # mtime doubles as the LRU timestamp
+                os.utime(target)
+                return target
+
+            with self._lock:
+                self.stats["misses"] += 1
+            if not self._write_atomically(target, write):
+                with self._lock:
+                    self.stats["failures"] += 1
+                return None
+
+        return target
+
+    def _write_atomically(self, target: str, write: Callable[[str], bool]) -> bool:
+        """Write an entry next to its target and rename it into place on success."""
+        partial = self._partial_path(target)
+        ok = False
+        try:
+            ok = bool(write(partial)) and os.path.exists(partial)
+            if ok:
+                os.replace(partial, target)
+        finally:
+            if not ok and os.path.exists(partial):
+                os.remove(partial)
+        return ok
+
+    @staticmethod
+    def _partial_path(target: str) -> str:
+        """Temporary file for producing an entry, private to this process and call."""
+        # Unique per writer, so two workers producing the same entry never share a partial file
+        return f"{os.path.splitext(target)[0]}.{os.getpid()}-{uuid.uuid4().hex[:8]}.partial.mp4"
+
+    def size_bytes(self) -> int:
+        """Total size of cache entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """Delete least recently used entries until the cache fits its size limit.
+
+        Entries used within min_idle seconds and the ones in keep are never
+        deleted, so the cache may stay over its limit while they are in use.
+        Partial files untouched for min_idle seconds are removed as well.
+
+        Args:
+            keep: Entries the caller is about to use
+
+        Returns:
+            Number of evicted entries
+        """
+        cutoff = time.time() - self.min_idle
+        self._remove_stale_partials(cutoff)
+        if not self.max_mb:
+            return 0
+
+        budget = self.max_mb * 1024 * 1024
+        keep = {os.path.abspath(path) for path in keep}
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+
+        for path, size, last_used in entries:
+            if total <= budget:
+                break
+            if last_used >= cutoff or os.path.abspath(path) in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+            logger.info(f"Evicted cached {self.entry_name} {os.path.basename(path)}")
+
+        with self._lock:
+            self.stats["evictions"] += evicted
+        return evicted
+
+    def _remove_stale_partials(self, cutoff: float) -> int:
+        """Delete partial files left by writers that were killed mid-encode."""
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.partial.mp4'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                # A live writer keeps touching its partial file
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+        if removed:
+            logger.info(f"Removed {removed} stale partial {self.entry_name} files from {self.cache_dir}")
+        return removed
+
+    def _entries(self) -> List[Tuple[str, int, float]]:
+        """Cache entries as (path, size, last used) tuples."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.mp4') or name.endswith('.partial.mp4'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                info = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, info.st_size, info.st_mtime))
+        return entries
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters and the cache size.
+
+        Returns:
+            Dictionary with counters and the cache size in MB
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats["size_mb"] = round(self.size_bytes() / (1024 * 1024), 1)
+        return stats
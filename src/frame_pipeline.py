@@ -0,0 +1,324 @@
+"""
+Streaming frame pipeline render backend.
+Single responsibility: Decode a timeline clip by clip into a fixed ring of frame buffers and pipe them into one encoder.
+"""
+import logging
+import queue
+import subprocess
+import threading
+from collections import deque
+from dataclasses import replace
+from typing import BinaryIO, Deque, List, Optional
+
+import numpy as np
+
+from config import Config
+from ffmpeg_renderer import FFmpegRenderer
+from subtitle_tracks import burned_srt, track_args, track_srt
+from timeline import TimelineEntry, TimelinePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Raw frames travel in the output's pixel format, so neither side converts them
+RAW_PIXEL_FORMAT = "yuv420p"
+
+# How often the producer and the feed, waiting for a buffer, check whether the render was stopped
+WAIT_SECONDS = 0.1
+
+
+def frame_counts(plan: TimelinePlan, fps: int) -> List[int]:
+    """Output frames of each plan entry, rounding cumulative positions so rounding never drifts."""
+    counts = []
+    position = 0.0
+    for entry in plan.entries:
+        start_frame = round(position * fps)
+        position += entry.duration
+        counts.append(round(position * fps) - start_frame)
+    return counts
+
+
+class FrameReader:
+    """One decoder process writing the raw frames of a timeline entry to a pipe."""
+
+    def __init__(self, command: List[str], frame_count: int):
+        """Start the decoder.
+
+        Args:
+            command: ffmpeg command writing raw frames to pipe:1
+            frame_count: Frames the decoder delivers
+        """
+        self.frame_count = frame_count
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+        )
+
+    def read_into(self, buffer: np.ndarray) -> bool:
+        """Fill a frame buffer in place with the next frame.
+
+        Returns:
+            True if a whole frame was read
+        """
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view):
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def close(self) -> str:
+        """Stop the decoder and release its pipes.
+
+        Returns:
+            The decoder's error output
+        """
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.stdout.close()
+        errors = self.process.stderr.read().decode('utf-8', errors='replace')
+        self.process.stderr.close()
+        self.process.wait()
+        return errors.strip()
+
+
+class FramePipeline:
+    """Renders a timeline plan through a bounded ring of frame buffers.
+
+    The filter graph backends open every source at once; here at most
+    max_readers decoders run, one entry after another, and frames move
+    through ring_size preallocated buffers that are reused in place. Peak
+    memory depends on the frame size only, not on the timeline length or
+    the number of clips.
+    """
+
+    def __init__(self, renderer: FFmpegRenderer = None, ring_size: int = None, max_readers: int = None):
+        """Initialize the frame pipeline.
+
+        Args:
+            renderer: Renderer providing geometry, filters, encoder settings and the ffmpeg runner
+            ring_size: Number of preallocated frame buffers
+            max_readers: Most decoder processes open at once (the current entry plus prefetched ones)
+        """
+        self.renderer = renderer or FFmpegRenderer()
+        self.ring_size = max(2, ring_size or Config.STREAM_RING_FRAMES)
+        self.max_readers = max(1, max_readers or Config.STREAM_MAX_READERS)
+
+    @property
+    def frame_bytes(self) -> int:
+        """Size of one raw frame in bytes (4:2:0 chroma)."""
+        width, height = self.renderer.resolution
+        return width * height * 3 // 2
+
+    def build_reader_command(self, entry: TimelineEntry, frame_count: int) -> List[str]:
+        """Build the ffmpeg command that decodes one entry to raw frames on stdout.
+
+        Args:
+            entry: Timeline entry to decode
+            frame_count: Exact number of frames to deliver
+
+        Returns:
+            ffmpeg argument list
+        """
+        fps = self.renderer.fps
+        # One spare frame of input; the exact length is set by -frames:v
+        entry = replace(entry, out_point=entry.in_point + (frame_count + 1) / fps)
+        args = ['ffmpeg', '-hide_banner', '-loglevel', 'error'] + self.renderer.input_args(entry)
+        args += [
+            '-vf', f"{self.renderer._normalize_filter()},tpad=stop=-1:stop_mode=clone",
+            '-frames:v', str(frame_count), '-an',
+            '-f', 'rawvideo', '-pix_fmt', RAW_PIXEL_FORMAT, 'pipe:1'
+        ]
+        return args
+
+    def build_encoder_command(
+        self,
+        output_path: str,
+        duration: float,
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command that encodes raw frames from stdin.
+
+        Args:
+            output_path: Output video path
+            duration: Output duration in seconds
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        width, height = self.renderer.resolution
+        args = [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', RAW_PIXEL_FORMAT, '-s', f"{width}x{height}",
+            '-r', str(self.renderer.fps), '-i', 'pipe:0'
+        ]
+        if audio_path:
+            args += ['-i', audio_path]
+        track = track_srt(srt_path, subtitle_mode)
+        if track:
+            args += ['-i', track]
+
+        burned = burned_srt(srt_path, subtitle_mode)
+        if burned:
+            args += ['-vf', self.renderer._subtitle_filter(burned)]
+        args += ['-map', '0:v']
+        if audio_path:
+            args += ['-map', '1:a'] + self.renderer.profile.audio_args()
+        if track:
+            args += track_args(2 if audio_path else 1, output_path, language)
+        args += self.renderer.encoder_args() + self.renderer.profile.container_args()
+        args += ['-t', f"{duration:.3f}", output_path]
+        return args
+
+    def render(
+        self,
+        plan: TimelinePlan,
+        output_path: str,
+        audio_path: str = None,
+        srt_path: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> Optional[str]:
+        """Render a timeline plan with streaming decode and one encode.
+
+        Args:
+            plan: Timeline plan; its duration is the output duration
+            output_path: Output video path
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        if not plan.entries:
+            logger.error("No valid clips found to render")
+            return None
+
+        free = queue.Queue()
+        filled = queue.Queue()
+        for _ in range(self.ring_size):
+            free.put(np.empty(self.frame_bytes, dtype=np.uint8))
+        stop = threading.Event()
+        readers: Deque[FrameReader] = deque()
+        failures = []
+
+        producer = threading.Thread(
+            target=self._produce, args=(plan, free, filled, stop, readers, failures), daemon=True
+        )
+        command = self.build_encoder_command(output_path, plan.duration, audio_path, srt_path, subtitle_mode, language)
+        logger.info(
+            f"Streaming {len(plan)} timeline entries through {self.ring_size} frame buffers "
+            f"({self.ring_size * self.frame_bytes / (1024 * 1024):.0f} MB): {output_path}"
+        )
+
+        def stop_readers():
+            # Killing the decoders unblocks a producer waiting on one that never writes
+            stop.set()
+            for reader in list(readers):
+                reader.process.kill()
+
+        producer.start()
+        try:
+            result = self.renderer.runner.run(
+                command, plan.duration, feed=lambda pipe: self._feed(pipe, free, filled, stop), on_exit=stop_readers
+            )
+        except FileNotFoundError:
+            logger.error("Streaming render failed: ffmpeg executable not found")
+            return None
+        finally:
+            stop_readers()
+            producer.join()
+
+        if failures:
+            logger.error(f"Streaming render failed: {failures[0]}")
+            return None
+        if result.stalled:
+            logger.error(f"Streaming render stalled: no frames reached the encoder, decoders stopped: {output_path}")
+            return None
+        if not result.ok:
+            logger.error(f"Streaming render failed: {result.stderr.strip()[-2000:]}")
+            return None
+        logger.info(f"Streaming render complete: {output_path}")
+        return output_path
+
+    def _produce(
+        self,
+        plan: TimelinePlan,
+        free: queue.Queue,
+        filled: queue.Queue,
+        stop: threading.Event,
+        readers: Deque[FrameReader],
+        failures: List[str]
+    ):
+        """Decode the plan's entries in order into free buffers, keeping at most max_readers decoders open.
+
+        Puts None on the filled queue when the last frame is queued or the render fails.
+        """
+        pending = iter([
+            (entry, count) for entry, count in zip(plan.entries, frame_counts(plan, self.renderer.fps)) if count > 0
+        ])
+
+        def open_next():
+            entry, count = next(pending, (None, 0))
+            if entry is not None:
+                readers.append(FrameReader(self.build_reader_command(entry, count), count))
+
+        try:
+            for _ in range(self.max_readers):
+                open_next()
+
+            while readers and not stop.is_set():
+                reader = readers[0]
+                for _ in range(reader.frame_count):
+                    buffer = self._take(free, stop)
+                    if buffer is None:
+                        return
+                    if not reader.read_into(buffer):
+                        errors = readers.popleft().close()
+                        if not stop.is_set():
+                            failures.append(f"decoder ended early: {errors[-2000:]}")
+                        return
+                    filled.put(buffer)
+                readers.popleft().close()
+                open_next()
+
+        except OSError as e:
+            failures.append(str(e))
+        finally:
+            while readers:
+                readers.popleft().close()
+            filled.put(None)
+
+    @staticmethod
+    def _take(free: queue.Queue, stop: threading.Event) -> Optional[np.ndarray]:
+        """Wait for a free buffer, giving up when the render is stopped."""
+        while not stop.is_set():
+            try:
+                return free.get(timeout=WAIT_SECONDS)
+            except queue.Empty:
+                continue
+        return None
+
+    @staticmethod
+    def _feed(pipe: BinaryIO, free: queue.Queue, filled: queue.Queue, stop: threading.Event):
+        """Write filled buffers to the encoder and hand them back to the producer, until the last one or a stop."""
+        while not stop.is_set():
+            try:
+                buffer = filled.get(timeout=WAIT_SECONDS)
+            except queue.Empty:
+                continue
+            if buffer is None:
+                return
+            pipe.write(memoryview(buffer))
+            free.put(buffer)
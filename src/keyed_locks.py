@@ -0,0 +1,42 @@
+"""
+Per-key locks for caches.
+Single responsibility: Serialize work on one key without keeping a lock for every key ever seen.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator
+
+
+class KeyedLocks:
+    """One lock per key, kept only while some thread holds it or waits for it.
+
+    A long-running process touches an unbounded number of keys (clips,
+    assets, search queries); dropping each lock when its last waiter leaves
+    keeps the table as small as the work in flight.
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """Hold the lock of a key for the duration of the block."""
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    del self._waiters[key]
+                    del self._locks[key]
+
+    def __len__(self) -> int:
+        """Number of keys currently held or waited for."""
+        with self._lock:
+            return len(self._locks)
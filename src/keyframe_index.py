@@ -0,0 +1,312 @@
+"""
+Keyframe index of video clips.
+Single responsibility: Record where each clip can be cut without re-encoding, and move timeline cuts there.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from config import Config
+from media_probe import get_media_probe
+from timeline import MIN_SEGMENT_DURATION, TimelinePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A keyframe this close to a scene change starts the new shot
+SCENE_SLACK = 0.1
+
+SHOWINFO_TIME = re.compile(r"pts_time:\s*([0-9.]+)")
+
+
+@dataclass
+class ClipKeyframes:
+    """Keyframe and scene change timestamps of one clip, in seconds from its start."""
+
+    path: str
+    keyframes: List[float] = field(default_factory=list)
+    scenes: List[float] = field(default_factory=list)
+
+    def is_keyframe(self, position: float, slack: float = 0.001) -> bool:
+        """Whether a keyframe sits at this position."""
+        return any(abs(keyframe - position) <= slack for keyframe in self.keyframes)
+
+    def snap(self, position: float, tolerance: float, lower: float = 0.0, upper: float = None) -> float:
+        """Nearest keyframe within tolerance, preferring keyframes that start a new shot.
+
+        Args:
+            position: Cut position in seconds
+            tolerance: Largest allowed move in seconds
+            lower: Earliest allowed result
+            upper: Latest allowed result
+
+        Returns:
+            The keyframe position, or the position unchanged when no keyframe qualifies
+        """
+        candidates = [
+            keyframe for keyframe in self.keyframes
+            if abs(keyframe - position) <= tolerance and keyframe >= lower and (upper is None or keyframe <= upper)
+        ]
+        at_scene = [
+            keyframe for keyframe in candidates
+            if any(abs(keyframe - scene) <= SCENE_SLACK for scene in self.scenes)
+        ]
+        return min(at_scene or candidates, key=lambda keyframe: abs(keyframe - position), default=position)
+
+
+class KeyframeIndex:
+    """Indexes keyframes and scene changes once per clip, cached by (path, size, mtime) next to the probe metadata.
+
+    Keyframes come from packet flags, so listing them reads the file without
+    decoding. Scene detection decodes the clip once; its result is cached
+    with the threshold it was computed for.
+    """
+
+    def __init__(self, cache_path: str = None, workers: int = None, scene_threshold: float = None):
+        """Initialize the keyframe index.
+
+        Args:
+            cache_path: SQLite file shared with the probe cache (":memory:" keeps it per process)
+            workers: Number of clips indexed concurrently
+            scene_threshold: Scene score above which a frame starts a new shot (0 skips detection)
+        """
+        self.cache_path = cache_path or Config.PROBE_CACHE_PATH
+        self.workers = max(1, workers or Config.PROBE_WORKERS)
+        self.scene_threshold = Config.KEYFRAME_SCENE_THRESHOLD if scene_threshold is None else scene_threshold
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "failures": 0}
+
+        if self.cache_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS keyframes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, scene_threshold REAL, "
+                "keyframes TEXT, scenes TEXT, indexed_at REAL)"
+            )
+
+    def index(self, path: str) -> Optional[ClipKeyframes]:
+        """Index one clip.
+
+        Args:
+            path: Video file path
+
+        Returns:
+            ClipKeyframes, or None if the file is missing or unreadable
+        """
+        return self.index_many([path]).get(path)
+
+    def index_many(self, paths: List[str]) -> Dict[str, ClipKeyframes]:
+        """Index a batch of clips, serving cached entries and scanning the rest in parallel.
+
+        Args:
+            paths: Video file paths
+
+        Returns:
+            ClipKeyframes by path for every clip that could be indexed
+        """
+        stamps = {}
+        for path in dict.fromkeys(paths):
+            try:
+                info = os.stat(path)
+                stamps[path] = (info.st_size, info.st_mtime_ns)
+            except OSError:
+                continue
+
+        results = self._lookup(stamps)
+        missing = [path for path in stamps if path not in results]
+
+        with self._lock:
+            self.stats["hits"] += len(results)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                scanned = dict(zip(missing, pool.map(self._scan, missing)))
+
+            rows = []
+            for path, clip in scanned.items():
+                if clip is None:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    continue
+                results[path] = clip
+                rows.append((
+                    os.path.abspath(path), *stamps[path], self.scene_threshold,
+                    json.dumps(clip.keyframes), json.dumps(clip.scenes), time.time()
+                ))
+            self._store(rows)
+
+        return results
+
+    def snap(self, plan: TimelinePlan, tolerance: float = None) -> TimelinePlan:
+        """Move the cuts of a plan onto keyframes, keeping its duration.
+
+        In-points move with their out-points, so each range keeps its length.
+        Out-points then move to the nearest keyframe (or the clip's end), and
+        the next entry absorbs the difference; the last entry lands exactly on
+        the plan's duration.
+
+        Args:
+            plan: Timeline plan
+            tolerance: Largest move of a cut in seconds; defaults to Config.KEYFRAME_SNAP_TOLERANCE
+
+        Returns:
+            New plan with the same duration, or the plan unchanged if it cannot be snapped
+        """
+        tolerance = Config.KEYFRAME_SNAP_TOLERANCE if tolerance is None else tolerance
+        videos = [entry.source for entry in plan.entries if entry.kind == "video"]
+        if not tolerance or not videos:
+            return plan
+
+        clips = self.index_many(videos)
+        probes = get_media_probe().probe_many(list(clips))
+        entries = []
+        drift = 0.0  # Snapped timeline position minus the original one
+        last = len(plan.entries) - 1
+
+        for position, entry in enumerate(plan.entries):
+            length = entry.duration - drift
+            if length <= MIN_SEGMENT_DURATION:
+                # An earlier cut already covers this range
+                drift -= entry.duration
+                continue
+
+            clip = clips.get(entry.source) if entry.kind == "video" else None
+            info = probes.get(entry.source)
+            end = info.duration if info else None
+            if clip is None:
+                entries.append(replace(entry, out_point=entry.in_point + length))
+                drift = 0.0
+                continue
+
+            in_point = clip.snap(entry.in_point, tolerance, upper=end - length if end else None)
+            out_point = in_point + length
+            if position != last:
+                if end and abs(end - out_point) <= tolerance:
+                    out_point = end
+                else:
+                    out_point = clip.snap(out_point, tolerance, lower=in_point + MIN_SEGMENT_DURATION, upper=end)
+            entries.append(replace(entry, in_point=in_point, out_point=out_point))
+            drift = out_point - in_point - length
+
+        snapped = TimelinePlan(entries)
+        tail = probes.get(entries[-1].source) if entries and entries[-1].kind == "video" else None
+        overrun = bool(tail and tail.duration and entries[-1].out_point > tail.duration + MIN_SEGMENT_DURATION)
+        if overrun or abs(snapped.duration - plan.duration) > MIN_SEGMENT_DURATION:
+            logger.debug("Keyframe snapping cannot keep the plan's length, keeping the planned cuts")
+            return plan
+        return snapped
+
+    def _lookup(self, stamps: Dict[str, tuple]) -> Dict[str, ClipKeyframes]:
+        """Read cache entries whose size, mtime and scene threshold still match."""
+        if not stamps:
+            return {}
+        by_key = {os.path.abspath(path): path for path in stamps}
+        placeholders = ",".join("?" * len(by_key))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT path, size, mtime_ns, scene_threshold, keyframes, scenes FROM keyframes "
+                f"WHERE path IN ({placeholders})",
+                list(by_key)
+            ).fetchall()
+
+        results = {}
+        for key, size, mtime_ns, scene_threshold, keyframes, scenes in rows:
+            path = by_key[key]
+            if stamps[path] == (size, mtime_ns) and scene_threshold == self.scene_threshold:
+                results[path] = ClipKeyframes(path, json.loads(keyframes), json.loads(scenes))
+        return results
+
+    def _store(self, rows: List[tuple]):
+        """Write index entries in one transaction."""
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO keyframes "
+                "(path, size, mtime_ns, scene_threshold, keyframes, scenes, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def _scan(self, path: str) -> Optional[ClipKeyframes]:
+        """List the keyframes and scene changes of one clip."""
+        keyframes = self._run_keyframes(path)
+        if keyframes is None:
+            return None
+        scenes = self._run_scenes(path) if self.scene_threshold > 0 else []
+        return ClipKeyframes(path, keyframes, scenes if scenes is not None else [])
+
+    @staticmethod
+    def _run_keyframes(path: str) -> Optional[List[float]]:
+        """Keyframe timestamps from the packet flags of the first video stream."""
+        command = [
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except FileNotFoundError:
+            logger.warning("ffprobe not found (install ffmpeg)")
+            return None
+        if result.returncode != 0:
+            logger.warning(f"Keyframe scan failed for {path}: {result.stderr.strip()[-500:]}")
+            return None
+
+        times = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(',')
+            if flags.startswith('K'):
+                try:
+                    times.append(float(pts_time))
+                except ValueError:
+                    continue
+        if not times:
+            return []
+        # Relative to the first keyframe, the position input seeking counts from
+        times.sort()
+        return [round(t - times[0], 6) for t in times]
+
+    def _run_scenes(self, path: str) -> Optional[List[float]]:
+        """Timestamps of frames whose scene score exceeds the threshold."""
+        command = [
+            'ffmpeg', '-hide_banner', '-nostats', '-i', path, '-an',
+            '-vf', f"select='gt(scene,{self.scene_threshold})',showinfo", '-f', 'null', '-'
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True)
+        except FileNotFoundError:
+            return None
+        if result.returncode != 0:
+            logger.warning(f"Scene detection failed for {path}: {result.stderr.strip()[-500:]}")
+            return None
+        return [float(match) for match in SHOWINFO_TIME.findall(result.stderr)]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters."""
+        with self._lock:
+            return dict(self.stats)
+
+
+# Global keyframe index shared by the pipeline
+_keyframe_index = None
+_keyframe_index_lock = threading.Lock()
+
+
+def get_keyframe_index() -> KeyframeIndex:
+    """Get the global keyframe index."""
+    global _keyframe_index
+    with _keyframe_index_lock:
+        if _keyframe_index is None:
+            _keyframe_index = KeyframeIndex()
+        return _keyframe_index
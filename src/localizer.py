@@ -0,0 +1,172 @@
+"""
+Localized versions of rendered videos.
+Single responsibility: Put a new narration and subtitles on an already rendered picture without decoding the clips again.
+"""
+import logging
+import os
+from typing import List, Optional
+
+from config import Config
+from ffmpeg_renderer import FFmpegRenderer
+from subtitle_tracks import track_args
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def localized_path(output_path: str, language: str) -> str:
+    """Path of a localized version next to the original: <name>_<language>.mp4."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_{language}{ext or '.mp4'}"
+
+
+class Localizer:
+    """Swaps the narration of a rendered picture, retiming it by stream copy when the lengths are close.
+
+    Changing the timestamp scale of the input (-itsscale) plays the same
+    frames slightly faster or slower without touching them, so the picture
+    is copied as is. Burned subtitles need one decode and encode of the
+    rendered picture, which is still far cheaper than cutting the clips again.
+    """
+
+    def __init__(self, renderer: FFmpegRenderer = None, max_stretch: float = None):
+        """Initialize the localizer.
+
+        Args:
+            renderer: Renderer providing encoder settings and the subtitle style
+            max_stretch: Largest relative speed change of the picture (0.08 = 8%)
+        """
+        self.renderer = renderer or FFmpegRenderer()
+        self.max_stretch = Config.LOCALIZE_MAX_STRETCH if max_stretch is None else max_stretch
+
+    def stretch(self, picture_duration: Optional[float], narration_duration: Optional[float]) -> Optional[float]:
+        """Timestamp scale that makes the picture last as long as the narration.
+
+        Args:
+            picture_duration: Duration of the rendered picture in seconds
+            narration_duration: Duration of the new narration in seconds
+
+        Returns:
+            Scale factor, or None if the picture would have to change speed by more than max_stretch
+        """
+        if not picture_duration or not narration_duration:
+            return None
+        scale = narration_duration / picture_duration
+        return scale if abs(scale - 1.0) <= self.max_stretch else None
+
+    def build_remux_command(
+        self,
+        picture_path: str,
+        audio_path: str,
+        output_path: str,
+        scale: float = 1.0,
+        srt_path: str = None,
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command that copies the picture under a new narration.
+
+        Args:
+            picture_path: Rendered video whose picture is kept
+            audio_path: New narration
+            output_path: Output video path
+            scale: Timestamp scale of the picture (see stretch)
+            srt_path: Optional SRT file muxed as a soft subtitle track
+            language: Language code used to tag the subtitle track
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+        if scale != 1.0:
+            args += ['-itsscale', f"{scale:.6f}"]
+        args += ['-i', picture_path, '-i', audio_path]
+        if srt_path:
+            args += ['-i', srt_path]
+
+        args += ['-map', '0:v', '-map', '1:a', '-c:v', 'copy'] + self.renderer.profile.audio_args()
+        if srt_path:
+            args += track_args(2, output_path, language)
+        args += self.renderer.profile.container_args() + [output_path]
+        return args
+
+    def build_overlay_command(
+        self,
+        picture_path: str,
+        audio_path: str,
+        output_path: str,
+        srt_path: str,
+        duration: float,
+        scale: float = 1.0,
+        with_track: bool = False,
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command that burns subtitles onto the rendered picture.
+
+        Args:
+            picture_path: Rendered video whose picture is kept
+            audio_path: New narration
+            output_path: Output video path
+            srt_path: SRT file to burn, timed against the new narration
+            duration: Output duration in seconds
+            scale: Timestamp scale of the picture (see stretch)
+            with_track: Also mux the SRT as a text track
+            language: Language code used to tag the text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        filters = []
+        if scale != 1.0:
+            filters.append(f"setpts=PTS*{scale:.6f}")
+        filters.append(self.renderer._subtitle_filter(srt_path))
+
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-i', picture_path, '-i', audio_path]
+        if with_track:
+            args += ['-i', srt_path]
+        args += ['-vf', ",".join(filters), '-map', '0:v', '-map', '1:a']
+        if with_track:
+            args += track_args(2, output_path, language)
+        args += self.renderer.encoder_args() + self.renderer.profile.audio_args()
+        args += self.renderer.profile.container_args() + ['-t', f"{duration:.3f}", output_path]
+        return args
+
+    def remux(
+        self,
+        picture_path: str,
+        audio_path: str,
+        output_path: str,
+        scale: float = 1.0,
+        srt_path: str = None,
+        language: str = None
+    ) -> Optional[str]:
+        """Copy the picture under a new narration (see build_remux_command).
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        command = self.build_remux_command(picture_path, audio_path, output_path, scale, srt_path, language)
+        logger.info(f"Remuxing picture with new narration (x{scale:.3f} timing): {output_path}")
+        return output_path if self.renderer._run(command) else None
+
+    def burn(
+        self,
+        picture_path: str,
+        audio_path: str,
+        output_path: str,
+        srt_path: str,
+        duration: float,
+        scale: float = 1.0,
+        with_track: bool = False,
+        language: str = None
+    ) -> Optional[str]:
+        """Burn subtitles onto the picture under a new narration (see build_overlay_command).
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        command = self.build_overlay_command(
+            picture_path, audio_path, output_path, srt_path, duration, scale, with_track, language
+        )
+        logger.info(f"Burning subtitles onto the rendered picture (x{scale:.3f} timing): {output_path}")
+        return output_path if self.renderer._run(command, duration) else None
@@ -0,0 +1,251 @@
+"""
+Media probe service backed by ffprobe.
+Single responsibility: Read container and stream metadata without decoding, and remember it across runs.
+"""
+import json
+import logging
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Parse an ffprobe frame rate such as "30000/1001"."""
+    try:
+        numerator, _, denominator = (rate or "").partition('/')
+        value = float(numerator) / float(denominator or 1)
+        return value if value > 0 else None
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+@dataclass
+class MediaInfo:
+    """Header metadata of a media file."""
+
+    path: str
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    video_codec: Optional[str] = None
+    video_profile: Optional[str] = None
+    video_level: Optional[int] = None
+    video_extradata: Optional[str] = None  # Hash of the decoder setup (H.264/HEVC parameter sets)
+    pix_fmt: Optional[str] = None
+    audio_codec: Optional[str] = None
+    audio_channels: Optional[int] = None
+    sample_rate: Optional[int] = None
+    streams: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+    @property
+    def size(self) -> Optional[tuple]:
+        """Picture size as (width, height)."""
+        return (self.width, self.height) if self.width and self.height else None
+
+    @classmethod
+    def from_ffprobe(cls, path: str, data: Dict[str, Any]) -> "MediaInfo":
+        """Build from ffprobe JSON (-show_format -show_streams -show_data_hash)."""
+        streams = data.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+        duration = data.get("format", {}).get("duration")
+        if duration is None:
+            stream_durations = [float(s["duration"]) for s in streams if s.get("duration")]
+            duration = max(stream_durations) if stream_durations else None
+
+        return cls(
+            path=path,
+            duration=float(duration) if duration is not None else None,
+            width=video.get("width"),
+            height=video.get("height"),
+            fps=parse_rate(video.get("avg_frame_rate")) or parse_rate(video.get("r_frame_rate")),
+            video_codec=video.get("codec_name"),
+            video_profile=video.get("profile"),
+            video_level=video.get("level"),
+            video_extradata=video.get("extradata_hash"),
+            pix_fmt=video.get("pix_fmt"),
+            audio_codec=audio.get("codec_name"),
+            audio_channels=audio.get("channels"),
+            sample_rate=int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+            streams=streams
+        )
+
+
+class MediaProbe:
+    """Runs ffprobe in parallel and caches results by (path, size, mtime) in SQLite."""
+
+    def __init__(self, cache_path: str = None, workers: int = None):
+        """Initialize the probe service.
+
+        Args:
+            cache_path: SQLite file for the metadata cache (":memory:" keeps it per process)
+            workers: Number of concurrent ffprobe processes
+        """
+        self.cache_path = cache_path or Config.PROBE_CACHE_PATH
+        self.workers = max(1, workers or Config.PROBE_WORKERS)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "failures": 0}
+
+        if self.cache_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS probes ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, data TEXT, probed_at REAL)"
+            )
+
+    def probe(self, path: str) -> Optional[MediaInfo]:
+        """Probe one file.
+
+        Args:
+            path: Media file path
+
+        Returns:
+            MediaInfo, or None if the file is missing or unreadable
+        """
+        return self.probe_many([path]).get(path)
+
+    def probe_many(self, paths: List[str]) -> Dict[str, MediaInfo]:
+        """Probe a batch of files, serving cached entries and probing the rest in parallel.
+
+        Args:
+            paths: Media file paths
+
+        Returns:
+            MediaInfo by path for every file that could be probed
+        """
+        stamps = {}
+        for path in dict.fromkeys(paths):
+            try:
+                info = os.stat(path)
+                stamps[path] = (info.st_size, info.st_mtime_ns)
+            except OSError:
+                continue
+
+        results = self._lookup(stamps)
+        missing = [path for path in stamps if path not in results]
+
+        with self._lock:
+            self.stats["hits"] += len(results)
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                probed = dict(zip(missing, pool.map(self._run_ffprobe, missing)))
+
+            rows = []
+            for path, data in probed.items():
+                if data is None:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    continue
+                results[path] = MediaInfo.from_ffprobe(path, data)
+                rows.append((os.path.abspath(path), *stamps[path], json.dumps(data), time.time()))
+            self._store(rows)
+
+        return results
+
+    @classmethod
+    def probe_uncached(cls, path: str) -> Optional[MediaInfo]:
+        """Probe a temporary file without recording it in the cache."""
+        data = cls._run_ffprobe(path)
+        return MediaInfo.from_ffprobe(path, data) if data is not None else None
+
+    def duration(self, path: str) -> Optional[float]:
+        """Duration of a media file in seconds, or None if unknown."""
+        info = self.probe(path)
+        return info.duration if info else None
+
+    def _lookup(self, stamps: Dict[str, tuple]) -> Dict[str, MediaInfo]:
+        """Read cache entries whose size and mtime still match the file."""
+        if not stamps:
+            return {}
+        by_key = {os.path.abspath(path): path for path in stamps}
+        placeholders = ",".join("?" * len(by_key))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT path, size, mtime_ns, data FROM probes WHERE path IN ({placeholders})",
+                list(by_key)
+            ).fetchall()
+
+        results = {}
+        for key, size, mtime_ns, data in rows:
+            path = by_key[key]
+            if stamps[path] == (size, mtime_ns):
+                results[path] = MediaInfo.from_ffprobe(path, json.loads(data))
+        return results
+
+    def _store(self, rows: List[tuple]):
+        """Write probe results in one transaction."""
+        if not rows:
+            return
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO probes (path, size, mtime_ns, data, probed_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    @staticmethod
+    def _run_ffprobe(path: str) -> Optional[Dict[str, Any]]:
+        """Run ffprobe with JSON output on one file."""
+        command = [
+            'ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams',
+            '-show_data_hash', 'sha256', path
+        ]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=Config.PROBE_TIMEOUT or None)
+        except FileNotFoundError:
+            logger.warning("ffprobe not found (install ffmpeg)")
+            return None
+        except subprocess.TimeoutExpired:
+            logger.warning(f"ffprobe timed out after {Config.PROBE_TIMEOUT:.0f}s for {path}")
+            return None
+        if result.returncode != 0:
+            logger.warning(f"ffprobe failed for {path}: {result.stderr.strip()[-500:]}")
+            return None
+        try:
+            return json.loads(result.stdout)
+        except ValueError:
+            logger.warning(f"ffprobe returned invalid JSON for {path}")
+            return None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss counters."""
+        with self._lock:
+            return dict(self.stats)
+
+
+# Global probe service shared by the pipeline
+_media_probe = None
+_media_probe_lock = threading.Lock()
+
+
+def get_media_probe() -> MediaProbe:
+    """Get the global media probe service."""
+    global _media_probe
+    with _media_probe_lock:
+        if _media_probe is None:
+            _media_probe = MediaProbe()
+        return _media_probe
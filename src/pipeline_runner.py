@@ -5,11 +5,13 @@ Single responsibility: Coordinate voice generation, asset fetching, and video as
 import logging
 import os
 import time
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 
 from voice_generator import VoiceGenerator
 from asset_fetcher import AssetFetcher
 from video_assembler import VideoAssembler
+from ffmpeg_progress import ProgressEvent
+from scratch_space import cleanup_stale_scratch
 from config import Config
 
 # Configure logging
@@ -20,11 +22,18 @@ logger = logging.getLogger(__name__)
 class PipelineRunner:
     """Orchestrates the complete video generation pipeline."""
     
-    def __init__(self):
-        """Initialize pipeline components."""
+    def __init__(self, on_progress: Callable[[ProgressEvent], None] = None):
+        """Initialize pipeline components.
+        
+        Args:
+            on_progress: Receives progress events (frame, fps, speed, ETA) of every ffmpeg render
+        """
         self.voice_generator = VoiceGenerator()
         self.asset_fetcher = AssetFetcher()
-        self.video_assembler = VideoAssembler()
+        self.video_assembler = VideoAssembler(on_progress=on_progress)
+        
+        # Scratch directories of crashed or killed earlier runs
+        cleanup_stale_scratch()
         
         # Validate configuration
         try:
@@ -46,7 +55,10 @@ class PipelineRunner:
         enable_subtitles: bool = False,
         subtitle_text: str = None,
         subtitle_style: str = "professional",
-        language: str = "en-US"
+        language: str = "en-US",
+        render_backend: str = None,
+        targets: List[str] = None,
+        quality: str = None
     ) -> Optional[str]:
         """Run the complete video generation pipeline.
         
@@ -61,13 +73,23 @@ class PipelineRunner:
             output_filename: Output video filename
             enable_subtitles: Whether to add subtitles
             subtitle_text: Text to display as subtitles (defaults to spoken text)
+            render_backend: Render backend for this job ("moviepy", "ffmpeg", "segmented" or "streaming")
+            targets: Output targets rendered from one decode (see Config.OUTPUT_TARGETS);
+                defaults to Config.RENDER_TARGETS. Each is written as <name>_<target>.mp4
+                with its own manifest
+            quality: "final" or "preview" (see VideoAssembler.promote_preview); targets need "final"
             
         Returns:
-            Path to generated video file, or None if failed
+            Path to generated video file (the first target's when targets are set), or None if failed
         """
         try:
             start_time = time.time()
             
+            targets = targets if targets is not None else Config.RENDER_TARGETS
+            if targets and (quality or self.video_assembler.quality) == "preview":
+                logger.error("Output targets are rendered at final quality; render the preview without targets")
+                return None
+            
             # Initialize pipeline
             logger.info("Pipeline components initialized successfully")
             
@@ -94,7 +116,9 @@ class PipelineRunner:
             assets = self.asset_fetcher.download_assets_for_query(
                 query=search_terms,
                 max_images=num_images,
-                max_videos=num_videos
+                max_videos=num_videos,
+                resolutions=self._fetch_resolutions(targets),
+                fps=self.video_assembler.fps
             )
             images = assets.get('images', [])
             videos = assets.get('videos', [])
@@ -107,7 +131,24 @@ class PipelineRunner:
             # Use subtitle text if provided, otherwise use spoken text
             final_subtitle_text = subtitle_text or text if enable_subtitles else None
             
-            if images or videos:
+            if (images or videos) and targets:
+                # Every platform variant from the same decode, narration and subtitles
+                variants = self.video_assembler.create_video_variants(
+                    targets=targets,
+                    image_paths=images,
+                    video_paths=videos,
+                    audio_path=audio_path,
+                    output_path=output_filename,
+                    subtitle_text=final_subtitle_text,
+                    enable_subtitles=enable_subtitles,
+                    language=language,
+                    render_backend=render_backend,
+                    quality=quality
+                )
+                for target, variant_path in variants.items():
+                    logger.info(f"Generated {target} variant: {variant_path}")
+                video_path = variants.get(targets[0])
+            elif images or videos:
                 # Create video from assets
                 video_path = self.video_assembler.create_video_from_assets(
                     image_paths=images,
@@ -116,7 +157,10 @@ class PipelineRunner:
                     output_path=output_filename,
                     subtitle_text=final_subtitle_text,
                     enable_subtitles=enable_subtitles,
-                    subtitle_style=subtitle_style
+                    subtitle_style=subtitle_style,
+                    render_backend=render_backend,
+                    language=language,
+                    quality=quality
                 )
             else:
                 logger.warning("No assets downloaded, creating audio-only video")
@@ -126,7 +170,8 @@ class PipelineRunner:
                     output_path=output_filename,
                     subtitle_text=final_subtitle_text,
                     enable_subtitles=enable_subtitles,
-                    subtitle_style=subtitle_style
+                    subtitle_style=subtitle_style,
+                    language=language
                 )
             
             if not video_path:
@@ -147,6 +192,83 @@ class PipelineRunner:
             logger.error(f"Pipeline execution failed: {str(e)}")
             return None
     
+    def localize_video(
+        self,
+        manifest_file: str,
+        text: str,
+        language: str,
+        voice: str = None,
+        voice_gender: str = None,
+        output_filename: str = None,
+        enable_subtitles: bool = False,
+        subtitle_text: str = None,
+        subtitle_mode: str = "soft",
+        render_backend: str = None
+    ) -> Optional[str]:
+        """Make another-language version of a rendered video.
+        
+        Only the narration and subtitles are produced again; the picture comes
+        from the earlier render (see VideoAssembler.localize_video).
+        
+        Args:
+            manifest_file: Manifest of the original render (<name>.render.json)
+            text: Narration text in the new language
+            language: Language code (e.g. 'es-ES')
+            voice: Specific voice to use (optional); defaults to the language's voice
+            voice_gender: Preferred voice gender ("male" or "female")
+            output_filename: Output video path; defaults to <name>_<language>.mp4
+            enable_subtitles: Whether to add subtitles
+            subtitle_text: Text to display as subtitles (defaults to the narration text)
+            subtitle_mode: "soft" text track, "burned" into the picture or "both"
+            render_backend: Backend used if the picture has to be cut again
+        
+        Returns:
+            Path to the localized video, or None if failed
+        """
+        try:
+            start_time = time.time()
+            
+            if language not in Config.SUPPORTED_LANGUAGES:
+                logger.error(f"Unsupported language: {language}")
+                return None
+            
+            if voice_gender:
+                selected_voice = voice or Config.get_voice_by_gender(voice_gender, language)
+            else:
+                selected_voice = voice or Config.get_default_voice_for_language(language)
+            logger.info(f"Generating {language} narration with voice: {selected_voice}")
+            self.voice_generator.voice = selected_voice
+            audio_path = self.voice_generator.generate_voice_sync(text=text)
+            if not audio_path:
+                logger.error("Voice generation failed")
+                return None
+            
+            video_path = self.video_assembler.localize_video(
+                manifest_file,
+                audio_path=audio_path,
+                language=language,
+                output_path=output_filename,
+                subtitle_text=subtitle_text or text,
+                enable_subtitles=enable_subtitles,
+                subtitle_mode=subtitle_mode,
+                render_backend=render_backend
+            )
+            if video_path:
+                logger.info(f"Localization completed in {time.time() - start_time:.2f} seconds: {video_path}")
+            return video_path
+        
+        except Exception as e:
+            logger.error(f"Localization failed: {str(e)}")
+            return None
+    
+    def _fetch_resolutions(self, targets: List[str]) -> List[tuple]:
+        """Output frame sizes the downloaded footage must cover.
+        
+        Previews are promoted to full quality later, so they fetch for the final resolution too.
+        """
+        resolutions = [Config.OUTPUT_TARGETS[target]["resolution"] for target in targets if target in Config.OUTPUT_TARGETS]
+        return resolutions or [self.video_assembler.resolution]
+    
     def _select_voice(self, voice: str = None, randomize_voice: bool = False, voice_gender: str = None) -> str:
         """Select appropriate voice based on parameters.
         
@@ -190,74 +312,32 @@ class PipelineRunner:
         output_path: str = None,
         subtitle_text: str = None,
         enable_subtitles: bool = False,
-        subtitle_style: str = "professional"
+        subtitle_style: str = "professional",
+        language: str = None
     ) -> Optional[str]:
         """Create a simple audio-only video with optional subtitles.
         
+        The background is rendered by FFmpeg; subtitles use the FFmpeg burn
+        style, so subtitle_style is not applied here.
+        
         Args:
             audio_path: Path to audio file
             output_path: Output video path
             subtitle_text: Text to display as subtitles
             enable_subtitles: Whether to enable subtitles
+            language: Narration language used as a Whisper hint
             
         Returns:
             Path to generated video file, or None if failed
         """
-        try:
-            logger.info("Creating audio-only video with placeholder visuals")
-            
-            # Create a simple colored background
-            from moviepy import ColorClip, AudioFileClip
-            
-            # Get audio duration
-            audio_clip = AudioFileClip(audio_path)
-            duration = audio_clip.duration
-            
-            # Create colored background
-            background = ColorClip(
-                size=self.video_assembler.resolution,
-                color=(20, 20, 20),  # Dark gray background
-                duration=duration
-            )
-            
-            # Set audio with compatibility handling
-            try:
-                background = background.with_audio(audio_clip)
-            except AttributeError:
-                try:
-                    background = background.set_audio(audio_clip)
-                except AttributeError:
-                    background.audio = audio_clip
-            
-            # Add subtitles if requested
-            if enable_subtitles and subtitle_text:
-                logger.info("Adding subtitles to audio-only video")
-                background = self.video_assembler.add_subtitles(background, subtitle_text, enable_subtitles, subtitle_style)
-            
-            # Generate output path
-            if output_path is None:
-                output_path = os.path.join(Config.OUTPUT_DIR, "audio_only_video.mp4")
-            
-            # Write video
-            logger.info(f"Writing audio-only video: {output_path}")
-            background.write_videofile(
-                output_path,
-                fps=self.video_assembler.fps,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
-            
-            # Clean up
-            audio_clip.close()
-            background.close()
-            
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"Audio-only video creation failed: {str(e)}")
-            return None
+        logger.info("Creating audio-only video with placeholder visuals")
+        return self.video_assembler.create_audio_only_video(
+            audio_path=audio_path,
+            output_path=output_path,
+            subtitle_text=subtitle_text,
+            enable_subtitles=enable_subtitles,
+            language=language
+        )
     
     def get_pipeline_info(self) -> Dict[str, Any]:
         """Get information about the pipeline configuration.
@@ -0,0 +1,139 @@
+"""
+Render backend benchmark.
+Single responsibility: Time render modes and encoding profiles on the same timeline.
+"""
+import logging
+import os
+import subprocess
+import tempfile
+import time
+from typing import Dict, List
+
+from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_renderer import FFmpegRenderer, Segment
+from segment_encoder import SegmentEncoder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_sample_clips(work_dir: str, count: int, seconds: float, resolution: tuple, fps: int) -> List[Segment]:
+    """Generate synthetic source clips that are expensive enough to encode.
+
+    Args:
+        work_dir: Directory for the generated clips
+        count: Number of clips
+        seconds: Length of each clip
+        resolution: Clip (width, height)
+        fps: Clip frame rate
+
+    Returns:
+        Timeline segments for the generated clips
+    """
+    width, height = resolution
+    segments = []
+    for index in range(count):
+        path = os.path.join(work_dir, f"sample_{index}.mp4")
+        subprocess.run(
+            [
+                'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+                '-vf', f"noise=alls={10 + index}:allf=t",
+                '-c:v', 'libx264', '-preset', 'ultrafast', path
+            ],
+            check=True,
+            capture_output=True
+        )
+        segments.append(("video", path, float(seconds)))
+    return segments
+
+
+def benchmark_render_modes(
+    segments: List[Segment],
+    duration: float,
+    resolution: tuple = None,
+    fps: int = None,
+    workers_options: List[int] = None,
+    output_dir: str = None
+) -> List[Dict]:
+    """Render the same timeline with every mode and time each run.
+
+    Args:
+        segments: Timeline segments to render
+        duration: Output duration in seconds
+        resolution: Output (width, height)
+        fps: Output frame rate
+        workers_options: Worker counts to try for the segmented mode
+        output_dir: Directory for the rendered files
+
+    Returns:
+        One result per mode with its wall-clock time and speedup over the single encoder
+    """
+    renderer = FFmpegRenderer(fps=fps, resolution=resolution)
+    output_dir = output_dir or tempfile.mkdtemp(prefix="render_benchmark_")
+    modes = [("ffmpeg", renderer)] + [
+        (f"segmented x{workers}", SegmentEncoder(renderer=renderer, workers=workers))
+        for workers in workers_options or [Config.RENDER_WORKERS]
+    ]
+
+    plan = renderer.plan_timeline(segments, duration)
+    results = []
+    for name, backend in modes:
+        output_path = os.path.join(output_dir, f"{name.replace(' ', '_')}.mp4")
+        start = time.time()
+        success = backend.render(plan, output_path) is not None
+        elapsed = time.time() - start
+        results.append({"mode": name, "seconds": round(elapsed, 2), "success": success, "output": output_path})
+        logger.info(f"{name}: {elapsed:.2f}s")
+
+    baseline = results[0]["seconds"]
+    for result in results:
+        result["speedup"] = round(baseline / result["seconds"], 2) if result["success"] and result["seconds"] else None
+    return results
+
+
+def benchmark_encoding_profiles(
+    segments: List[Segment],
+    duration: float,
+    profiles: List[str] = None,
+    resolution: tuple = None,
+    fps: int = None,
+    output_dir: str = None
+) -> List[Dict]:
+    """Render the same timeline with every encoding profile and measure speed and size.
+
+    Args:
+        segments: Timeline segments to render
+        duration: Output duration in seconds
+        profiles: Profile names to compare; defaults to every profile in Config.ENCODING_PROFILES
+        resolution: Output (width, height)
+        fps: Output frame rate
+        output_dir: Directory for the rendered files
+
+    Returns:
+        One result per profile with wall-clock time, encode fps and output bytes
+    """
+    output_dir = output_dir or tempfile.mkdtemp(prefix="profile_benchmark_")
+    results = []
+    for name in profiles or list(Config.ENCODING_PROFILES):
+        renderer = FFmpegRenderer(fps=fps, resolution=resolution, profile=EncodingProfile.from_config(name))
+        plan = renderer.plan_timeline(segments, duration)
+        output_path = os.path.join(output_dir, f"{name}.mp4")
+        start = time.time()
+        # Encoders missing from this ffmpeg build (e.g. libsvtav1) fail here and are reported as such
+        success = renderer.render(plan, output_path) is not None
+        elapsed = time.time() - start
+        frames = round(plan.duration * renderer.fps)
+        results.append({
+            "profile": name,
+            "codec": renderer.profile.codec,
+            "seconds": round(elapsed, 2),
+            "encode_fps": round(frames / elapsed, 1) if success and elapsed else None,
+            "bytes": os.path.getsize(output_path) if success else None,
+            "success": success,
+            "output": output_path
+        })
+        logger.info(f"{name}: {elapsed:.2f}s")
+    return results
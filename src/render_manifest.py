@@ -0,0 +1,107 @@
+"""
+Render manifests written next to every render.
+Single responsibility: Record the decisions of a render so it can be repeated at full quality or in another language.
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+from subtitle_tracks import burned_srt
+from timeline import TimelinePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def preview_path(output_path: str) -> str:
+    """Path of the preview render for a final output path: <name>_preview.mp4."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}_preview{ext or '.mp4'}"
+
+
+def manifest_path(output_path: str) -> str:
+    """Path of the manifest written next to a render: <name>.render.json."""
+    return f"{os.path.splitext(output_path)[0]}.render.json"
+
+
+@dataclass
+class RenderManifest:
+    """Everything a final render needs that a preview already produced.
+
+    The timeline plan fixes clip selection and trims, the narration and the
+    SRT fix audio and subtitle cues, so promoting a preview skips TTS, asset
+    fetching and ASR. A localized version reuses the plan with a new narration.
+    """
+
+    plan: TimelinePlan
+    output_path: str  # Where the full-quality render goes
+    audio_path: Optional[str] = None
+    srt_path: Optional[str] = None
+    subtitle_mode: str = "burned"
+    language: Optional[str] = None
+    resolution: Optional[Tuple[int, int]] = None  # Geometry of an output target; the assembler's when None
+    crf: Optional[int] = None  # CRF of an output target; the encoding profile's when None
+
+    @property
+    def burned_subtitles(self) -> bool:
+        """Whether the rendered picture has the subtitles burned in."""
+        return burned_srt(self.srt_path, self.subtitle_mode) is not None
+
+    def save(self, path: str = None) -> str:
+        """Write the manifest as JSON.
+
+        Args:
+            path: Manifest path; defaults to <output>.render.json
+
+        Returns:
+            Path of the written manifest
+        """
+        path = path or manifest_path(self.output_path)
+        # Absolute paths, so the manifest can be promoted from any working directory
+        plan = TimelinePlan([replace(entry, source=os.path.abspath(entry.source)) for entry in self.plan])
+        data = {
+            "plan": plan.to_dict(),
+            "output_path": os.path.abspath(self.output_path),
+            "audio_path": os.path.abspath(self.audio_path) if self.audio_path else None,
+            "srt_path": os.path.abspath(self.srt_path) if self.srt_path else None,
+            "subtitle_mode": self.subtitle_mode,
+            "language": self.language,
+            "resolution": list(self.resolution) if self.resolution else None,
+            "crf": self.crf
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"Saved render manifest: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RenderManifest"]:
+        """Read a manifest written by save.
+
+        Returns:
+            The manifest, or None if it is missing or unreadable
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(
+                plan=TimelinePlan.from_dict(data["plan"]),
+                output_path=data["output_path"],
+                audio_path=data.get("audio_path"),
+                srt_path=data.get("srt_path"),
+                subtitle_mode=data.get("subtitle_mode", "burned"),
+                language=data.get("language"),
+                resolution=tuple(data["resolution"]) if data.get("resolution") else None,
+                crf=data.get("crf")
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Cannot read render manifest {path}: {str(e)}")
+            return None
+
+    def missing_files(self) -> List[str]:
+        """Inputs of the manifest that no longer exist (e.g. evicted from a cache)."""
+        paths = self.plan.sources + [path for path in (self.audio_path, self.srt_path) if path]
+        return [path for path in paths if not os.path.exists(path)]
@@ -0,0 +1,167 @@
+"""
+Rendition selection for stock videos.
+Single responsibility: Pick the cheapest file of a stock video that still covers the render's frame sizes and frame rate.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bits per pixel per frame of typical stock H.264, used when the API gives no file size
+ESTIMATED_BITS_PER_PIXEL = 0.1
+
+# Assumed clip length when the API gives no duration; only the ranking matters then
+DEFAULT_DURATION = 10.0
+
+# Source rates this close below the target still count as the target rate (29.97 for 30)
+FPS_TOLERANCE = 0.01
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """One downloadable file of a stock video."""
+
+    link: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    size: Optional[int] = None  # Bytes, when the API reports it
+    file_type: Optional[str] = None
+    quality: Optional[str] = None  # Provider label: "uhd", "hd" or "sd"
+
+    @classmethod
+    def from_pexels(cls, data: Dict[str, Any]) -> "Rendition":
+        """Build from one entry of a Pexels video's video_files."""
+        def number(key, kind):
+            try:
+                value = kind(data.get(key) or 0)
+                return value if value > 0 else None
+            except (TypeError, ValueError):
+                return None
+
+        return cls(
+            link=data["link"],
+            width=number("width", int),
+            height=number("height", int),
+            fps=number("fps", float),
+            size=number("size", int),
+            file_type=data.get("file_type"),
+            quality=data.get("quality")
+        )
+
+    @property
+    def has_size(self) -> bool:
+        return self.width is not None and self.height is not None
+
+
+class RenditionSelector:
+    """Chooses which file of a stock video to download.
+
+    A rendition meets quality when scaling it to cover every output frame
+    needs at most max_upscale and its frame rate is not below the render
+    rate. Among those, the one with the fewest estimated bytes wins (fewer
+    pixels and frames also mean less decoding), ties going to an mp4 whose
+    rate divides evenly into the render rate and whose shape is closest to
+    the output. When none meets quality, the one needing the least upscaling
+    is used, so a video is never skipped for lack of a perfect file.
+    """
+
+    def __init__(self, resolutions: Sequence[Tuple[int, int]] = None, fps: int = None, max_upscale: float = None):
+        """Initialize the selector.
+
+        Args:
+            resolutions: Output frame sizes the clips are rendered at
+            fps: Render frame rate
+            max_upscale: Largest acceptable scale factor up to an output size (1.0 = never upscale)
+        """
+        self.resolutions = [tuple(resolution) for resolution in resolutions or [Config.DEFAULT_RESOLUTION]]
+        self.fps = fps or Config.DEFAULT_FPS
+        self.max_upscale = Config.RENDITION_MAX_UPSCALE if max_upscale is None else max_upscale
+
+    def upscale(self, rendition: Rendition) -> float:
+        """Scale factor needed to cover the largest output frame (scale to cover, then crop)."""
+        return max(
+            max(width / rendition.width, height / rendition.height) for width, height in self.resolutions
+        )
+
+    def fps_ok(self, rendition: Rendition) -> bool:
+        """Whether the rendition has enough frames for the render rate (unknown rates pass)."""
+        return rendition.fps is None or rendition.fps >= self.fps * (1 - FPS_TOLERANCE)
+
+    def meets_quality(self, rendition: Rendition) -> bool:
+        return rendition.has_size and self.upscale(rendition) <= self.max_upscale + 1e-6 and self.fps_ok(rendition)
+
+    def estimated_bytes(self, rendition: Rendition, duration: float = None) -> float:
+        """Reported file size, or an estimate from pixels, frame rate and duration."""
+        if rendition.size:
+            return rendition.size
+        return (
+            rendition.width * rendition.height * (rendition.fps or self.fps)
+            * (duration or DEFAULT_DURATION) * ESTIMATED_BITS_PER_PIXEL / 8
+        )
+
+    def _tie_break(self, rendition: Rendition) -> Tuple[int, int, float]:
+        """Prefer mp4, an even frame-rate cadence and the output's shape."""
+        not_mp4 = 0 if (rendition.file_type or "video/mp4") == "video/mp4" else 1
+        ratio = (rendition.fps or self.fps) / self.fps
+        uneven = 0 if abs(ratio - round(ratio)) < FPS_TOLERANCE else 1
+        width, height = self.resolutions[0]
+        aspect = abs(rendition.width / rendition.height - width / height)
+        return not_mp4, uneven, aspect
+
+    def select(self, video_files: List[Dict[str, Any]], duration: float = None) -> Optional[Dict[str, Any]]:
+        """Pick the video file to download.
+
+        Args:
+            video_files: The video's video_files from the Pexels API
+            duration: Clip duration in seconds, for size estimates
+
+        Returns:
+            The chosen entry of video_files, or None if there is none
+        """
+        candidates = []
+        for data in video_files or []:
+            try:
+                candidates.append((Rendition.from_pexels(data), data))
+            except (KeyError, TypeError):
+                continue
+        if not candidates:
+            return None
+
+        sized = [(rendition, data) for rendition, data in candidates if rendition.has_size]
+        if not sized:
+            # No dimensions to compare: keep the provider's quality labels
+            labeled = [data for rendition, data in candidates if rendition.quality in ("hd", "sd")]
+            return (labeled or [candidates[0][1]])[0]
+
+        eligible = [(rendition, data) for rendition, data in sized if self.meets_quality(rendition)]
+        if eligible:
+            rendition, data = min(
+                eligible,
+                key=lambda item: (self.estimated_bytes(item[0], duration),) + self._tie_break(item[0])
+            )
+        else:
+            # Every file that covers the output ties on size, so a low frame rate never buys extra
+            # pixels that the render throws away; then the smallest file wins
+            rendition, data = min(
+                sized,
+                key=lambda item: (
+                    round(max(self.upscale(item[0]), self.max_upscale), 3), not self.fps_ok(item[0]),
+                    self.estimated_bytes(item[0], duration)
+                ) + self._tie_break(item[0])
+            )
+            logger.warning(
+                f"No rendition covers {self.resolutions[0][0]}x{self.resolutions[0][1]}@{self.fps}; "
+                f"using {rendition.width}x{rendition.height}"
+            )
+
+        logger.debug(
+            f"Selected {rendition.width}x{rendition.height}@{rendition.fps or '?'} "
+            f"(~{self.estimated_bytes(rendition, duration) / (1024 * 1024):.1f} MB) of {len(candidates)} renditions"
+        )
+        return data
@@ -0,0 +1,150 @@
+"""
+Per-job scratch directories for render intermediates.
+Single responsibility: Give every job its own temporary directory, on tmpfs when there is room, and always clean it up.
+"""
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRATCH_PREFIX = "videogen-"
+
+# Directories of live jobs, removed at interpreter exit if a job never got to clean up
+_live_dirs = set()
+_live_lock = threading.Lock()
+
+
+def _remove_live_dirs():
+    with _live_lock:
+        for path in list(_live_dirs):
+            shutil.rmtree(path, ignore_errors=True)
+        _live_dirs.clear()
+
+
+atexit.register(_remove_live_dirs)
+
+
+def _free_mb(path: str) -> float:
+    """Free space of the filesystem holding path, in MB."""
+    usage = shutil.disk_usage(path)
+    return usage.free / (1024 * 1024)
+
+
+def choose_scratch_root(min_free_mb: int = None) -> str:
+    """Pick the directory that job scratch spaces are created in.
+
+    SCRATCH_ROOT wins when set; otherwise /dev/shm is used when it is writable
+    and has at least min_free_mb free, and the system temp directory when not.
+
+    Args:
+        min_free_mb: Free space tmpfs must have to be used
+
+    Returns:
+        Scratch root directory
+    """
+    if Config.SCRATCH_ROOT:
+        os.makedirs(Config.SCRATCH_ROOT, exist_ok=True)
+        return Config.SCRATCH_ROOT
+
+    min_free_mb = Config.SCRATCH_MIN_FREE_MB if min_free_mb is None else min_free_mb
+    shm = "/dev/shm"
+    try:
+        if os.path.isdir(shm) and os.access(shm, os.W_OK) and _free_mb(shm) >= min_free_mb:
+            return shm
+    except OSError:
+        pass
+    return tempfile.gettempdir()
+
+
+def cleanup_stale_scratch(root: str = None) -> int:
+    """Remove scratch directories left behind by processes that no longer exist.
+
+    Args:
+        root: Scratch root to sweep (defaults to the current scratch root)
+
+    Returns:
+        Number of removed directories
+    """
+    root = root or choose_scratch_root()
+    removed = 0
+    for name in os.listdir(root):
+        if not name.startswith(SCRATCH_PREFIX):
+            continue
+        pid = name[len(SCRATCH_PREFIX):].split('-', 1)[0]
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            os.kill(int(pid), 0)
+            continue  # Owner still running
+        except ProcessLookupError:
+            pass
+        except PermissionError:
+            continue  # Owned by another user's live process
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        removed += 1
+    if removed:
+        logger.info(f"Removed {removed} stale scratch directories from {root}")
+    return removed
+
+
+class ScratchSpace:
+    """Isolated temporary directory for one job.
+
+    Use as a context manager, or call cleanup() in a finally block; the
+    directory is removed whether the job succeeds, fails or is interrupted.
+    """
+
+    def __init__(self, job_name: str = "job", root: str = None):
+        """Create the scratch directory.
+
+        Args:
+            job_name: Short label included in the directory name
+            root: Parent directory (defaults to choose_scratch_root())
+        """
+        self.root = root or choose_scratch_root()
+        self.path_root: Optional[str] = tempfile.mkdtemp(
+            prefix=f"{SCRATCH_PREFIX}{os.getpid()}-{job_name}-",
+            dir=self.root
+        )
+        with _live_lock:
+            _live_dirs.add(self.path_root)
+        logger.debug(f"Scratch space for {job_name}: {self.path_root}")
+
+    def path(self, name: str) -> str:
+        """Path of a file inside the scratch directory.
+
+        Args:
+            name: File name
+
+        Returns:
+            Absolute path inside this job's directory
+        """
+        if self.path_root is None:
+            raise RuntimeError("Scratch space has already been cleaned up")
+        return os.path.join(self.path_root, name)
+
+    def cleanup(self):
+        """Delete the scratch directory and everything in it."""
+        if self.path_root is None:
+            return
+        shutil.rmtree(self.path_root, ignore_errors=True)
+        with _live_lock:
+            _live_dirs.discard(self.path_root)
+        self.path_root = None
+
+    def __enter__(self) -> "ScratchSpace":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Runs for exceptions and KeyboardInterrupt alike
+        self.cleanup()
+        return False
@@ -0,0 +1,190 @@
+"""
+Cache of stock media search responses.
+Single responsibility: Answer repeated searches from memory or disk, refreshing stale answers in the background.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set
+
+from config import Config
+from keyed_locks import KeyedLocks
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds a writer waits for another process's transaction before giving up
+DB_TIMEOUT = 30.0
+
+# Fetches one search response; returns None when the request failed
+Fetch = Callable[[], Optional[List[Dict]]]
+
+
+@dataclass
+class CachedSearch:
+    """One stored search response."""
+
+    results: List[Dict]
+    fetched_at: float
+
+
+class SearchCache:
+    """Search responses keyed by (endpoint, query, per_page, orientation, page).
+
+    Answers younger than ttl are served as they are. Older answers stay
+    usable for another stale_ttl seconds: they are returned at once while one
+    background request refreshes them. Only missing or expired answers wait
+    for the API, and a failed request falls back to an expired answer when
+    there is one. Answers live in memory and in SQLite, so later runs and
+    other worker processes share them.
+    """
+
+    def __init__(self, cache_path: str = None, ttl: float = None, stale_ttl: float = None):
+        """Initialize the search cache.
+
+        Args:
+            cache_path: SQLite file for stored answers (":memory:" keeps them per process)
+            ttl: Seconds an answer is fresh
+            stale_ttl: Seconds after ttl during which an answer is served while it is refreshed
+        """
+        self.cache_path = cache_path or Config.SEARCH_CACHE_PATH
+        self.ttl = Config.SEARCH_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.stale_ttl = Config.SEARCH_CACHE_STALE_SECONDS if stale_ttl is None else stale_ttl
+
+        self._entries: Dict[str, CachedSearch] = {}
+        self._key_locks = KeyedLocks()
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+        if self.cache_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        self._db = sqlite3.connect(self.cache_path, timeout=DB_TIMEOUT, check_same_thread=False)
+        with self._lock, self._db:
+            if self.cache_path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, results TEXT, fetched_at REAL)"
+            )
+
+    @staticmethod
+    def make_key(endpoint: str, query: str, per_page: int, orientation: str, page: int = 1) -> str:
+        """Cache key of a search; queries differing only in case or spacing share it."""
+        return json.dumps([endpoint, " ".join(query.lower().split()), per_page, orientation, page])
+
+    def get(self, key: str, fetch: Fetch) -> Optional[List[Dict]]:
+        """Get a search response, fetching it when there is no usable answer.
+
+        Args:
+            key: Cache key (see make_key)
+            fetch: Requests the response from the API
+
+        Returns:
+            Search results, or None if the request failed and nothing was cached
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                return list(entry.results)
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._refresh_in_background(key, fetch)
+                return list(entry.results)
+
+        # One request per key, even when several jobs search at once
+        with self._key_locks.hold(key):
+            entry = self._lookup(key)
+            if entry is not None and time.time() - entry.fetched_at < self.ttl:
+                self._count("hits")
+                return list(entry.results)
+
+            self._count("misses")
+            results = fetch()
+            if results is None:
+                self._count("errors")
+                # An expired answer beats no answer
+                return list(entry.results) if entry else None
+            self._store(key, results)
+            return list(results)
+
+    def _refresh_in_background(self, key: str, fetch: Fetch):
+        """Start one refresh of a stale answer unless one is already running."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                results = fetch()
+                if results is None:
+                    self._count("errors")
+                    return
+                self._store(key, results)
+                self._count("refreshes")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _lookup(self, key: str) -> Optional[CachedSearch]:
+        """Answer for a key from memory, then from disk."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry
+            row = self._db.execute("SELECT results, fetched_at FROM searches WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            entry = CachedSearch(json.loads(row[0]), row[1])
+            self._entries[key] = entry
+            return entry
+
+    def _store(self, key: str, results: List[Dict]):
+        """Keep a fresh answer in memory and on disk."""
+        entry = CachedSearch(list(results), time.time())
+        with self._lock, self._db:
+            self._entries[key] = entry
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches (key, results, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(entry.results), entry.fetched_at)
+            )
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get hit/miss counters.
+
+        Returns:
+            Dictionary with counters and the share of searches answered without waiting for the API
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats["hits"] + stats["stale_hits"]
+        total = served + stats["misses"]
+        stats["hit_rate"] = round(served / total, 3) if total else 0.0
+        return stats
+
+
+# Global search cache shared by the pipeline
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get the global search cache."""
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+        return _search_cache
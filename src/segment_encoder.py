@@ -0,0 +1,474 @@
+"""
+Segmented render backend.
+Single responsibility: Encode timeline segments in parallel and join them with a stream-copy concat.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import List, Optional, Set
+
+import srt
+
+from config import Config
+from ffmpeg_renderer import FFmpegRenderer
+from keyframe_index import KeyframeIndex
+from media_probe import MediaInfo, MediaProbe, get_media_probe
+from scratch_space import ScratchSpace
+from segment_store import Cue, SegmentStore, cues_in_range
+from subtitle_tracks import burned_srt, track_args, track_srt
+from timeline import TimelineEntry, TimelinePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stream names of the encoders whose output a copied clip range can stand in for
+ENCODER_CODECS = {"libx264": "h264", "libx265": "hevc"}
+
+
+def write_concat_list(list_path: str, paths: List[str]):
+    """Write a concat demuxer list of segment files.
+
+    Args:
+        list_path: List file to write
+        paths: Segment paths in playback order
+    """
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def load_cues(srt_path: str) -> List[Cue]:
+    """Read the cues of an SRT file as (start, end, text) in seconds."""
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        return [
+            (subtitle.start.total_seconds(), subtitle.end.total_seconds(), subtitle.content)
+            for subtitle in srt.parse(f.read())
+        ]
+
+
+@dataclass
+class SegmentJob:
+    """One independently encoded piece of the output timeline."""
+
+    entry: TimelineEntry
+    start_frame: int  # First output frame covered by this piece
+    frame_count: int
+    copy: bool = False  # The range can be stream-copied from its source unless burned subtitles cover it
+
+
+class SegmentEncoder:
+    """Renders a timeline as parallel segment encodes joined without re-encoding."""
+
+    def __init__(
+        self,
+        renderer: FFmpegRenderer = None,
+        workers: int = None,
+        store: SegmentStore = None,
+        keyframes: KeyframeIndex = None
+    ):
+        """Initialize the segment encoder.
+
+        Args:
+            renderer: Renderer providing geometry, filters and encoder settings
+            workers: Number of concurrent segment encodes
+            store: Segment store; when set, segments already encoded by an
+                earlier render with the same inputs are reused
+            keyframes: Keyframe index; when set, clip ranges cut on keyframes
+                from sources already in the output format are copied, not encoded
+        """
+        self.renderer = renderer or FFmpegRenderer()
+        self.workers = max(1, workers or Config.RENDER_WORKERS)
+        self.store = store
+        self.keyframes = keyframes
+        self._reference: Optional[MediaInfo] = None
+        self._reference_done = False
+        self._reference_lock = threading.Lock()
+
+    def plan_jobs(
+        self,
+        plan: TimelinePlan,
+        max_seconds: float = None,
+        copyable: Set[TimelineEntry] = frozenset()
+    ) -> List[SegmentJob]:
+        """Split a timeline plan into encode jobs on frame boundaries.
+
+        Every plan entry starts a new job, and entries longer than max_seconds
+        are cut into several jobs so that the workers stay busy. Copyable
+        entries stay whole, since a copy starts only on a keyframe.
+
+        Args:
+            plan: Timeline plan in playback order
+            max_seconds: Longest job in seconds
+            copyable: Entries that can be stream-copied (see copyable_entries)
+
+        Returns:
+            Encode jobs in playback order
+        """
+        fps = self.renderer.fps
+        jobs = []
+        position = 0.0
+
+        for entry in plan.split(max_seconds or Config.SEGMENT_MAX_SECONDS, keep=copyable):
+            # Round cumulative positions, not durations, so rounding never drifts
+            start_frame = round(position * fps)
+            position += entry.duration
+            end_frame = round(position * fps)
+            if end_frame > start_frame:
+                jobs.append(SegmentJob(entry, start_frame, end_frame - start_frame, copy=entry in copyable))
+
+        return jobs
+
+    def copyable_entries(self, plan: TimelinePlan) -> Set[TimelineEntry]:
+        """Entries whose source range can be copied into the output without encoding.
+
+        The range must start on a keyframe and end on one (or at the end of
+        the clip), and the source must already have the output's codec,
+        geometry, frame rate and pixel format, and the same codec profile,
+        level and parameter sets as this renderer's encodes. The concat
+        demuxer keeps only the first segment's parameter sets, so a copied
+        range encoded with other settings (e.g. another CRF) would decode
+        with the wrong ones.
+
+        Args:
+            plan: Timeline plan
+
+        Returns:
+            Copyable entries
+        """
+        videos = [entry.source for entry in plan.entries if entry.kind == "video"]
+        if not self.keyframes or not videos:
+            return set()
+
+        clips = self.keyframes.index_many(videos)
+        probes = get_media_probe().probe_many(list(clips))
+        # The reference encode is only worth running when some source could match it
+        if not any(self._matches_format(info) for info in probes.values()):
+            return set()
+        reference = self.output_stream()
+        copyable = set()
+        for entry in plan.entries:
+            clip, info = clips.get(entry.source), probes.get(entry.source)
+            if entry.kind != "video" or clip is None or not self._matches_output(info, reference):
+                continue
+            clean_end = clip.is_keyframe(entry.out_point) or (
+                info.duration is not None and entry.out_point >= info.duration - 0.5 / self.renderer.fps
+            )
+            if clip.is_keyframe(entry.in_point) and clean_end:
+                copyable.add(entry)
+        return copyable
+
+    def _matches_format(self, info: Optional[MediaInfo]) -> bool:
+        """Whether a source has the output's codec, geometry, frame rate and pixel format."""
+        return bool(
+            info
+            and info.video_codec == ENCODER_CODECS.get(self.renderer.profile.codec)
+            and info.size == tuple(self.renderer.resolution)
+            and info.fps and abs(info.fps - self.renderer.fps) < 0.01
+            and info.pix_fmt == "yuv420p"
+        )
+
+    def _matches_output(self, info: Optional[MediaInfo], reference: Optional[MediaInfo]) -> bool:
+        """Whether a source's video stream can be joined with this renderer's segments.
+
+        Args:
+            info: Source stream
+            reference: Stream of this renderer's encodes (see output_stream); nothing matches without one
+        """
+        return bool(
+            reference
+            and self._matches_format(info)
+            and info.video_extradata
+            and info.video_extradata == reference.video_extradata
+            and info.video_profile == reference.video_profile
+            and info.video_level == reference.video_level
+        )
+
+    def output_stream(self) -> Optional[MediaInfo]:
+        """Stream of a reference encode with this renderer's settings, encoded once per encoder.
+
+        Returns:
+            MediaInfo of the reference, or None if it could not be encoded
+            (then no range is copied)
+        """
+        with self._reference_lock:
+            if not self._reference_done:
+                self._reference = self._encode_reference()
+                self._reference_done = True
+            return self._reference
+
+    def _encode_reference(self) -> Optional[MediaInfo]:
+        """Encode two black frames exactly like a segment and probe the result."""
+        width, height = self.renderer.resolution
+        with ScratchSpace("reference") as scratch:
+            path = scratch.path("reference.mp4")
+            command = [
+                'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+                '-f', 'lavfi', '-i', f"color=c=black:s={width}x{height}:r={self.renderer.fps}",
+                '-frames:v', '2', '-an'
+            ] + self.renderer.encoder_args(threads=self._segment_threads()) + [path]
+            if not self._run(command):
+                logger.warning("Reference encode failed, encoding every segment")
+                return None
+            return MediaProbe.probe_uncached(path)
+
+    def _segment_threads(self) -> int:
+        """Encoder threads per segment, so the workers share the CPU."""
+        return max(1, (os.cpu_count() or 1) // self.workers)
+
+    def build_segment_command(self, job: SegmentJob, output_path: str, srt_path: str = None) -> List[str]:
+        """Build the ffmpeg command that encodes one job.
+
+        Args:
+            job: Segment to encode
+            output_path: Segment file path
+            srt_path: Optional SRT file to burn, timed against the whole timeline
+
+        Returns:
+            ffmpeg argument list
+        """
+        fps = self.renderer.fps
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+
+        # One spare frame of input; the exact length is set by -frames:v
+        entry = replace(job.entry, out_point=job.entry.in_point + (job.frame_count + 1) / fps)
+        args += self.renderer.input_args(entry)
+
+        filters = [self.renderer._normalize_filter(), "tpad=stop=-1:stop_mode=clone"]
+        if srt_path:
+            # Shift to timeline time so the subtitles line up, then back to zero
+            filters += [
+                f"setpts=PTS-STARTPTS+{job.start_frame}/({fps}*TB)",
+                self.renderer._subtitle_filter(srt_path),
+                "setpts=PTS-STARTPTS"
+            ]
+
+        args += ['-vf', ",".join(filters), '-frames:v', str(job.frame_count), '-an']
+        args += self.renderer.encoder_args(threads=self._segment_threads()) + [output_path]
+        return args
+
+    def build_copy_command(self, job: SegmentJob, output_path: str) -> List[str]:
+        """Build the ffmpeg command that copies one job's range from its source.
+
+        Args:
+            job: Copyable segment, starting on a keyframe of its source
+            output_path: Segment file path
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error']
+        if job.entry.in_point > 0:
+            # Full precision: rounding could land just before the keyframe and pull in the previous GOP
+            args += ['-ss', f"{job.entry.in_point:.6f}"]
+        args += [
+            '-i', job.entry.source, '-map', '0:v:0', '-frames:v', str(job.frame_count), '-an',
+            '-c:v', 'copy', '-avoid_negative_ts', 'make_zero', output_path
+        ]
+        return args
+
+    def build_concat_command(
+        self,
+        list_path: str,
+        output_path: str,
+        duration: float,
+        audio_path: str = None,
+        srt_path: str = None,
+        language: str = None
+    ) -> List[str]:
+        """Build the ffmpeg command that joins segments and muxes the narration once.
+
+        Args:
+            list_path: concat demuxer list file
+            output_path: Output video path
+            duration: Exact output duration in seconds
+            audio_path: Optional narration track
+            srt_path: Optional SRT file muxed as a text track
+            language: Language code used to tag the text track
+
+        Returns:
+            ffmpeg argument list
+        """
+        args = ['ffmpeg', '-y', '-hide_banner', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path:
+            args += ['-i', audio_path]
+        if srt_path:
+            args += ['-i', srt_path]
+        args += ['-map', '0:v']
+        if audio_path:
+            args += ['-map', '1:a'] + self.renderer.profile.audio_args()
+        if srt_path:
+            args += track_args(2 if audio_path else 1, output_path, language)
+        args += ['-c:v', 'copy', '-t', f"{duration:.3f}"] + self.renderer.profile.container_args() + [output_path]
+        return args
+
+    def render(
+        self,
+        plan: TimelinePlan,
+        output_path: str,
+        audio_path: str = None,
+        srt_path: str = None,
+        work_dir: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None
+    ) -> Optional[str]:
+        """Render a timeline plan with parallel segment encodes.
+
+        Burned subtitles go into each segment; a text track is added by the join.
+
+        Args:
+            plan: Timeline plan; its duration is the output duration
+            output_path: Output video path
+            audio_path: Optional narration track
+            srt_path: Optional SRT file
+            work_dir: Directory for segment files (defaults to a fresh scratch space)
+            subtitle_mode: "burned" into the picture, "soft" text track or "both"
+            language: Language code used to tag a text track
+
+        Returns:
+            Path to output video file, or None if failed
+        """
+        if not plan.entries:
+            logger.error("No valid clips found to render")
+            return None
+
+        duration = plan.duration
+        jobs = self.plan_jobs(plan, copyable=self.copyable_entries(plan))
+        scratch = None
+        created_dir = False
+        if work_dir:
+            created_dir = not os.path.isdir(work_dir)
+            os.makedirs(work_dir, exist_ok=True)
+        else:
+            scratch = ScratchSpace("segments")
+            work_dir = scratch.path_root
+        scratch_paths = [os.path.join(work_dir, f"segment_{index:04d}.mp4") for index in range(len(jobs))]
+        list_path = os.path.join(work_dir, "segments.txt")
+
+        try:
+            burned = burned_srt(srt_path, subtitle_mode)
+            cues = load_cues(burned) if burned and (self.store or self.keyframes) else []
+            hits = self.store.get_stats()["hits"] if self.store else 0
+
+            logger.info(f"Encoding {len(jobs)} segments with {self.workers} workers: {output_path}")
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                segment_paths = list(pool.map(
+                    lambda args: self._encode_job(*args, srt_path=burned, cues=cues), zip(jobs, scratch_paths)
+                ))
+            if not all(segment_paths):
+                return None
+            if self.store:
+                reused = self.store.get_stats()["hits"] - hits
+                logger.info(f"Reused {reused} of {len(jobs)} segments from the segment store")
+            copied = sum(1 for job in jobs if job.copy and not self._burned_cues(job, cues))
+            if copied:
+                logger.info(f"Copied {copied} of {len(jobs)} segments from their clips without encoding")
+
+            write_concat_list(list_path, segment_paths)
+
+            track = track_srt(srt_path, subtitle_mode)
+            if not self.join(list_path, output_path, duration, audio_path, srt_path=track, language=language):
+                return None
+
+            logger.info(f"Segmented render complete: {output_path}")
+            return output_path
+
+        finally:
+            if scratch:
+                scratch.cleanup()
+            else:
+                # The caller owns work_dir: remove only the files this render wrote there
+                self._remove_files(scratch_paths + [list_path], work_dir if created_dir else None)
+
+    @staticmethod
+    def _remove_files(paths: List[str], directory: str = None):
+        """Delete files that may not exist, then the directory if it is left empty."""
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if directory:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+    def _encode_job(self, job: SegmentJob, output_path: str, srt_path: str = None, cues: List[Cue] = None) -> Optional[str]:
+        """Encode one job, copy it from its clip, or take it from the segment store when its inputs are unchanged.
+
+        Args:
+            job: Segment to encode
+            output_path: Segment path for encodes outside the store and for copies
+            srt_path: Optional SRT file to burn
+            cues: Cues of the SRT file, used to fingerprint the job
+
+        Returns:
+            Path to the encoded segment, or None if the encode failed
+        """
+        duration = job.frame_count / self.renderer.fps
+        visible = self._burned_cues(job, cues)
+        if job.copy and not visible:
+            return output_path if self._run(self.build_copy_command(job, output_path), duration) else None
+        if not self.store:
+            return output_path if self._run(self.build_segment_command(job, output_path, srt_path), duration) else None
+
+        try:
+            fingerprint = self.store.fingerprint(job.entry, job.frame_count, self.renderer, visible)
+        except OSError as e:
+            logger.error(f"Segment encode failed: cannot read {job.entry.source}: {str(e)}")
+            return None
+        return self.store.get(
+            fingerprint, lambda path: self._run(self.build_segment_command(job, path, srt_path), duration)
+        )
+
+    def _burned_cues(self, job: SegmentJob, cues: List[Cue] = None) -> List[Cue]:
+        """Cues visible during a job, which must be burned into its frames."""
+        fps = self.renderer.fps
+        start = job.start_frame / fps
+        return cues_in_range(cues or [], start, start + job.frame_count / fps)
+
+    def join(
+        self,
+        list_path: str,
+        output_path: str,
+        duration: float,
+        audio_path: str = None,
+        srt_path: str = None,
+        language: str = None
+    ) -> bool:
+        """Join the segments of a concat list with stream copy.
+
+        Args:
+            list_path: concat demuxer list file (see write_concat_list)
+            output_path: Output video path
+            duration: Exact output duration in seconds
+            audio_path: Optional narration track
+            srt_path: Optional SRT file muxed as a text track
+            language: Language code used to tag the text track
+
+        Returns:
+            True if the join succeeded
+        """
+        command = self.build_concat_command(list_path, output_path, duration, audio_path, srt_path, language)
+        return self._run(command, duration)
+
+    def _run(self, command: List[str], duration: float = None) -> bool:
+        """Run one ffmpeg process, logging its error output on failure.
+
+        Args:
+            command: ffmpeg argument list
+            duration: Expected output duration in seconds, for progress reports
+        """
+        try:
+            result = self.renderer.runner.run(command, duration)
+        except FileNotFoundError:
+            logger.error("Segmented render failed: ffmpeg executable not found")
+            return False
+        if not result.ok:
+            logger.error(f"Segment encode failed: {result.stderr.strip()[-2000:]}")
+            return False
+        return True
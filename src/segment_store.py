@@ -0,0 +1,115 @@
+"""
+Store of encoded timeline segments for incremental re-renders.
+Single responsibility: Keep every encoded segment under a fingerprint of its inputs so unchanged segments are never encoded twice.
+"""
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict
+from typing import Callable, List, Optional, Tuple
+
+from config import Config
+from ffmpeg_renderer import FFmpegRenderer
+from file_cache import FileCache
+from timeline import TimelineEntry
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A subtitle cue: (start, end, text) in seconds
+Cue = Tuple[float, float, str]
+
+
+def cues_in_range(cues: List[Cue], start: float, end: float) -> List[Cue]:
+    """Cues visible between start and end, clipped and relative to start.
+
+    Args:
+        cues: Cues in timeline time
+        start: Range start in seconds
+        end: Range end in seconds
+
+    Returns:
+        Cues as they appear inside the range, with times rounded to milliseconds
+    """
+    return [
+        (round(max(cue_start, start) - start, 3), round(min(cue_end, end) - start, 3), text)
+        for cue_start, cue_end, text in cues
+        if cue_start < end and cue_end > start
+    ]
+
+
+class SegmentStore(FileCache):
+    """Encoded segments keyed by source content, range, geometry, encoder settings and burned cues.
+
+    Two renders that share a segment's inputs share the encoded file, so a
+    re-render after a small script fix only encodes the segments whose cues
+    or clips changed. Segments of one profile can be joined with stream copy.
+    """
+
+    entry_name = "segment"
+
+    def __init__(self, cache_dir: str = None, max_mb: int = None):
+        """Initialize the segment store.
+
+        Args:
+            cache_dir: Directory for stored segments
+            max_mb: Size limit for the store in MB (0 disables eviction)
+        """
+        super().__init__(
+            cache_dir=cache_dir or Config.SEGMENT_STORE_DIR,
+            max_mb=Config.SEGMENT_STORE_MAX_MB if max_mb is None else max_mb
+        )
+
+    def fingerprint(self, entry: TimelineEntry, frame_count: int, renderer: FFmpegRenderer, cues: List[Cue]) -> str:
+        """Fingerprint of everything that determines an encoded segment.
+
+        Args:
+            entry: Source range of the segment
+            frame_count: Number of output frames
+            renderer: Renderer providing geometry and encoding profile
+            cues: Burned subtitle cues relative to the segment start (see cues_in_range)
+
+        Returns:
+            Hex SHA-256 digest
+
+        Raises:
+            OSError: If the source cannot be read
+        """
+        profile = asdict(renderer.profile)
+        # Thread count changes encode speed, not the stream
+        profile.pop("threads")
+        profile.pop("name")
+        data = {
+            "source": self.source_hash(entry.source),
+            "kind": entry.kind,
+            "range": [round(entry.in_point, 6), round(entry.out_point, 6)],
+            "transform": entry.transform,
+            "frames": frame_count,
+            "fps": renderer.fps,
+            "resolution": list(renderer.resolution),
+            "profile": profile,
+            "cues": [list(cue) for cue in cues],
+            "style": Config.SUBTITLE_FFMPEG_STYLE if cues else None
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def segment_path(self, fingerprint: str) -> str:
+        """Path of the stored segment for a fingerprint."""
+        return os.path.join(self.cache_dir, f"{fingerprint[:32]}.mp4")
+
+    def get(self, fingerprint: str, encode: Callable[[str], bool]) -> Optional[str]:
+        """Get a stored segment, encoding it on first use.
+
+        Args:
+            fingerprint: Segment fingerprint
+            encode: Writes the segment to the given path and returns whether it succeeded
+
+        Returns:
+            Path to the stored segment, or None if it could not be encoded
+        """
+        path = self._get_or_create(self.segment_path(fingerprint), encode)
+        if path:
+            self.evict(keep=[path])
+        return path
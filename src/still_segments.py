@@ -0,0 +1,176 @@
+"""
+Still image segment cache.
+Single responsibility: Encode each still image into a short H.264 segment once and reuse it across videos.
+"""
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_progress import FFmpegRunner
+from ffmpeg_renderer import FFmpegRenderer
+from file_cache import FileCache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StillSegmentCache(FileCache):
+    """Cache of still images encoded as fixed-length H.264 segments.
+
+    Entries are keyed by (image content hash, duration, resolution, fps, fades,
+    encoding profile settings).
+    Segments of one cache share the job's encoder settings, so a run of them
+    can be joined with the concat demuxer and stream copy, and with segments
+    the job encodes itself.
+    """
+
+    entry_name = "still segment"
+
+    def __init__(
+        self,
+        resolution: tuple = None,
+        fps: int = None,
+        cache_dir: str = None,
+        max_mb: int = None,
+        runner: FFmpegRunner = None,
+        profile: EncodingProfile = None
+    ):
+        """Initialize the still segment cache.
+
+        Args:
+            resolution: Target (width, height)
+            fps: Target frame rate
+            cache_dir: Directory for cached segments
+            max_mb: Size limit for the cache in MB (0 disables eviction)
+            runner: Runs ffmpeg and reports its progress
+            profile: The job's encoding profile; defaults to Config.ENCODING_PROFILE
+        """
+        super().__init__(
+            cache_dir=cache_dir or Config.STILL_CACHE_DIR,
+            max_mb=Config.STILL_CACHE_MAX_MB if max_mb is None else max_mb
+        )
+        self.resolution = tuple(resolution or Config.DEFAULT_RESOLUTION)
+        self.fps = fps or Config.DEFAULT_FPS
+        self.runner = runner or FFmpegRunner()
+        self.renderer = FFmpegRenderer(
+            fps=self.fps, resolution=self.resolution, profile=(profile or EncodingProfile.from_config()).for_stills(),
+            runner=self.runner
+        )
+        self.profile_key = self.renderer.profile.stream_key
+
+    def frame_count(self, duration: float) -> int:
+        """Number of frames a segment of the given duration holds."""
+        return max(1, round(duration * self.fps))
+
+    def segment_path(self, image_path: str, duration: float, fade_in: float = 0.0, fade_out: float = 0.0) -> str:
+        """Path of the cached segment for an image under this cache's render profile."""
+        width, height = self.resolution
+        name = (
+            f"{self.source_hash(image_path)[:16]}_{self.frame_count(duration)}f_{width}x{height}_{self.fps}fps"
+            f"_fade{int(fade_in * 1000)}-{int(fade_out * 1000)}_{self.renderer.profile.name}-{self.profile_key}.mp4"
+        )
+        return os.path.join(self.cache_dir, name)
+
+    def get(self, image_path: str, duration: float = None, fade_in: float = 0.0, fade_out: float = 0.0) -> Optional[str]:
+        """Get the segment for a still image, encoding it on first use.
+
+        Args:
+            image_path: Path to the image
+            duration: Segment duration in seconds
+            fade_in: Fade-in from black at the start, in seconds
+            fade_out: Fade-out to black at the end, in seconds
+
+        Returns:
+            Path to the cached segment, or None if it could not be produced
+        """
+        target = self._segment(image_path, duration, fade_in, fade_out)
+        if target:
+            self.evict(keep=[target])
+        return target
+
+    def _segment(self, image_path: str, duration: float = None, fade_in: float = 0.0, fade_out: float = 0.0) -> Optional[str]:
+        """Get or encode the segment for a still image, without evicting."""
+        duration = duration or Config.DEFAULT_DURATION
+        try:
+            target = self.segment_path(image_path, duration, fade_in, fade_out)
+        except OSError as e:
+            logger.warning(f"Cannot read image {image_path}: {str(e)}")
+            return None
+
+        return self._get_or_create(target, lambda partial: self._encode(image_path, partial, duration, fade_in, fade_out))
+
+    def segment_paths(self, image_paths: List[str], duration: float = None, transition: float = 0.0) -> List[Tuple[str, Optional[str]]]:
+        """Encode a run of slides, fading the ends of each into its neighbours.
+
+        The first slide fades in, the last fades out and the ones in between do
+        both, like the MoviePy slideshow.
+
+        Args:
+            image_paths: Images in slide order
+            duration: Duration of each slide in seconds
+            transition: Fade duration in seconds (0 for hard cuts)
+
+        Returns:
+            (image path, segment path or None) for every existing image, in order
+        """
+        images = [path for path in image_paths or [] if os.path.exists(path)]
+        segments = [
+            (image_path, self._segment(image_path, duration, *self.slide_fades(index, len(images), transition)))
+            for index, image_path in enumerate(images)
+        ]
+        # Evict once for the whole run, so no slide of it is removed before the render opens it
+        self.evict(keep=[segment for _, segment in segments if segment])
+        return segments
+
+    @staticmethod
+    def slide_fades(index: int, count: int, transition: float) -> Tuple[float, float]:
+        """(fade in, fade out) of a slide: the first fades in, the last fades out, the rest do both."""
+        fade_in = transition if index == 0 or index < count - 1 else 0.0
+        fade_out = transition if index > 0 else 0.0
+        return fade_in, fade_out
+
+    def build_encode_command(
+        self,
+        image_path: str,
+        output_path: str,
+        duration: float,
+        fade_in: float = 0.0,
+        fade_out: float = 0.0
+    ) -> List[str]:
+        """Build the ffmpeg command that turns one image into a segment.
+
+        The image is looped at the input, scaling and fades run in the filter
+        graph and the encoder is tuned for still content.
+        """
+        frames = self.frame_count(duration)
+        filters = [self.renderer._normalize_filter()]
+        if fade_in:
+            filters.append(f"fade=t=in:st=0:d={fade_in:.3f}")
+        if fade_out:
+            filters.append(f"fade=t=out:st={max(0.0, frames / self.fps - fade_out):.3f}:d={fade_out:.3f}")
+
+        return [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-loop', '1', '-framerate', str(self.fps), '-i', image_path,
+            '-vf', ",".join(filters),
+            '-frames:v', str(frames), '-an'
+        ] + self.renderer.encoder_args() + self.renderer.profile.container_args() + [output_path]
+
+    def _encode(self, image_path: str, output_path: str, duration: float, fade_in: float, fade_out: float) -> bool:
+        """Encode a still image into a segment."""
+        command = self.build_encode_command(image_path, output_path, duration, fade_in, fade_out)
+
+        logger.info(f"Encoding still segment {os.path.basename(image_path)} ({duration:.2f}s)")
+        try:
+            result = self.runner.run(command, duration)
+        except FileNotFoundError:
+            logger.error("Still segment encoding failed: ffmpeg executable not found")
+            return False
+
+        if not result.ok:
+            logger.error(f"Still segment encoding failed: {result.stderr.strip()[-2000:]}")
+            return False
+        return True
@@ -0,0 +1,53 @@
+"""
+Subtitle delivery modes.
+Single responsibility: Decide whether an SRT is burned into the picture, muxed as a text track, or both.
+"""
+import os
+from typing import List, Optional
+
+# Burned subtitles need the picture encoded with them; a text track is muxed by stream copy
+BURNED_MODES = ("burned", "both")
+TRACK_MODES = ("soft", "both")
+
+# ISO 639-2 codes for the track language tag, by primary language subtag
+TRACK_LANGUAGES = {
+    "en": "eng", "ru": "rus", "es": "spa", "fr": "fra", "de": "deu", "it": "ita",
+    "pt": "por", "zh": "zho", "ja": "jpn", "ko": "kor", "ar": "ara", "hi": "hin",
+    "pl": "pol", "uk": "ukr", "tr": "tur", "nl": "nld"
+}
+
+# Text track codec by container; MP4 and MOV players read mov_text
+TRACK_CODECS = {".webm": "webvtt", ".mkv": "srt"}
+
+
+def burned_srt(srt_path: Optional[str], mode: str) -> Optional[str]:
+    """The SRT to burn into the picture in this mode, or None."""
+    return srt_path if srt_path and mode in BURNED_MODES else None
+
+
+def track_srt(srt_path: Optional[str], mode: str) -> Optional[str]:
+    """The SRT to mux as a text track in this mode, or None."""
+    return srt_path if srt_path and mode in TRACK_MODES else None
+
+
+def track_language(language: str = None) -> str:
+    """ISO 639-2 tag for a language code such as 'es-ES' ('und' when unknown)."""
+    return TRACK_LANGUAGES.get((language or "").split("-")[0].lower(), "und")
+
+
+def track_args(input_index: int, output_path: str, language: str = None) -> List[str]:
+    """Output options that mux an SRT input as the first subtitle track.
+
+    Args:
+        input_index: ffmpeg input number of the SRT file
+        output_path: Output path; its container decides the track codec
+        language: Language code used to tag the track
+
+    Returns:
+        ffmpeg arguments mapping and encoding the track
+    """
+    codec = TRACK_CODECS.get(os.path.splitext(output_path)[1].lower(), "mov_text")
+    return [
+        '-map', f"{input_index}:s", '-c:s', codec,
+        '-metadata:s:s:0', f"language={track_language(language)}"
+    ]
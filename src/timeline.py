@@ -0,0 +1,151 @@
+"""
+Timeline planning shared by the render backends.
+Single responsibility: Decide which clip plays for how long before any frames are decoded.
+"""
+from dataclasses import asdict, dataclass, field, replace
+from typing import Container, Dict, Iterator, List, Tuple
+
+# Remainders shorter than this are rounding noise, not a clip worth opening
+MIN_SEGMENT_DURATION = 0.001
+
+
+def fill_to_duration(durations: List[float], target: float) -> List[Tuple[int, float]]:
+    """Cycle through clips until the target duration is covered.
+
+    Clips play in order and wrap around when the target is longer than the
+    clip list; the last clip is trimmed to land exactly on the target. Clips
+    that would start after the target are left out entirely.
+
+    Args:
+        durations: Natural duration of each clip in seconds
+        target: Required timeline duration in seconds
+
+    Returns:
+        List of (clip index, play duration) entries in playback order
+    """
+    if target <= 0 or not any(duration > 0 for duration in durations):
+        return []
+
+    timeline = []
+    remaining = float(target)
+    position = 0
+
+    while remaining > MIN_SEGMENT_DURATION:
+        index = position % len(durations)
+        duration = durations[index]
+        if duration > 0:
+            play_duration = min(duration, remaining)
+            timeline.append((index, play_duration))
+            remaining -= play_duration
+        position += 1
+
+    return timeline
+
+
+@dataclass(frozen=True)
+class TimelineEntry:
+    """One range of a source that plays in the output."""
+
+    kind: str  # "image" or "video"
+    source: str
+    in_point: float  # Seconds into the source where playback starts
+    out_point: float  # Seconds into the source where playback stops
+    transform: str = "normalize"  # Bring the picture to the output geometry and frame rate
+
+    @property
+    def duration(self) -> float:
+        """Play duration of the entry in seconds."""
+        return self.out_point - self.in_point
+
+
+@dataclass
+class TimelinePlan:
+    """Edit decision list for a render, computed from probed durations before any decoding.
+
+    Renderers open each source only for the listed ranges, seeking to the
+    in-point on the input side instead of decoding and discarding frames.
+    """
+
+    entries: List[TimelineEntry] = field(default_factory=list)
+
+    @classmethod
+    def fill(cls, sources: List[Tuple[str, str, float]], target: float) -> "TimelinePlan":
+        """Plan sources cycled or cut to cover exactly the target duration.
+
+        Args:
+            sources: (kind, path, natural duration) in playback order
+            target: Required timeline duration in seconds
+
+        Returns:
+            Timeline plan whose duration equals the target
+        """
+        timeline = fill_to_duration([duration for _, _, duration in sources], target)
+        return cls([
+            TimelineEntry(sources[index][0], sources[index][1], 0.0, play_duration)
+            for index, play_duration in timeline
+        ])
+
+    @property
+    def duration(self) -> float:
+        """Total play duration in seconds."""
+        return sum(entry.duration for entry in self.entries)
+
+    @property
+    def sources(self) -> List[str]:
+        """Distinct sources in order of first use."""
+        return list(dict.fromkeys(entry.source for entry in self.entries))
+
+    def split(self, max_seconds: float, keep: Container[TimelineEntry] = ()) -> "TimelinePlan":
+        """Cut entries longer than max_seconds into consecutive ranges of the same source.
+
+        Args:
+            max_seconds: Longest allowed entry in seconds
+            keep: Entries left whole whatever their length
+
+        Returns:
+            New plan with the same output, in shorter entries
+        """
+        entries = []
+        for entry in self.entries:
+            if entry in keep:
+                entries.append(entry)
+                continue
+            in_point = entry.in_point
+            while entry.out_point - in_point > MIN_SEGMENT_DURATION:
+                out_point = min(in_point + max_seconds, entry.out_point)
+                entries.append(replace(entry, in_point=in_point, out_point=out_point))
+                in_point = out_point
+        return TimelinePlan(entries)
+
+    def fit(self, duration: float) -> "TimelinePlan":
+        """Cycle or cut the plan's entries to cover another duration.
+
+        Entries keep their sources and in-points, so the new plan opens with
+        the same cuts as this one.
+
+        Args:
+            duration: Required timeline duration in seconds
+
+        Returns:
+            New plan whose duration equals the given one
+        """
+        timeline = fill_to_duration([entry.duration for entry in self.entries], duration)
+        return TimelinePlan([
+            replace(self.entries[index], out_point=self.entries[index].in_point + play_duration)
+            for index, play_duration in timeline
+        ])
+
+    def to_dict(self) -> Dict[str, list]:
+        """JSON-serializable form of the plan."""
+        return {"entries": [asdict(entry) for entry in self.entries]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, list]) -> "TimelinePlan":
+        """Rebuild a plan written by to_dict."""
+        return cls([TimelineEntry(**entry) for entry in data.get("entries", [])])
+
+    def __iter__(self) -> Iterator[TimelineEntry]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
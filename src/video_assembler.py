@@ -4,18 +4,36 @@ Single responsibility: Assemble images, videos, and audio into final video outpu
 """
 import logging
 import os
+import shutil
+import time
 import srt
 import ffmpeg
-import whisper
 from datetime import timedelta
-from typing import List, Optional, Dict, Union
+from typing import Callable, List, Optional, Dict, Union
 
 from moviepy import (
     VideoFileClip, ImageClip, AudioFileClip, 
     concatenate_videoclips, CompositeVideoClip, TextClip
 )
 
+from asr_models import get_asr_registry
+from clip_cache import ClipCache
 from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_progress import FFmpegRunner, ProgressEvent
+from ffmpeg_renderer import FFmpegRenderer, OutputTarget
+from frame_pipeline import FramePipeline
+from keyframe_index import get_keyframe_index
+from localizer import Localizer, localized_path
+from media_probe import get_media_probe
+from render_manifest import RenderManifest, manifest_path, preview_path
+from scratch_space import ScratchSpace
+from segment_encoder import SegmentEncoder, write_concat_list
+from segment_store import SegmentStore
+from subtitle_tracks import burned_srt
+from still_segments import StillSegmentCache
+from timeline import TimelinePlan
+from voice_generator import load_word_timings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,19 +43,77 @@ logger = logging.getLogger(__name__)
 class VideoAssembler:
     """Handles video assembly using MoviePy."""
     
-    def __init__(self, fps: int = None, resolution: tuple = None):
+    def __init__(
+        self,
+        fps: int = None,
+        resolution: tuple = None,
+        render_backend: str = None,
+        quality: str = None,
+        encoding_profile: str = None,
+        subtitle_mode: str = None,
+        on_progress: Callable[[ProgressEvent], None] = None
+    ):
         """Initialize video assembler with settings.
         
         Args:
             fps: Frames per second for output video
             resolution: Video resolution as (width, height)
+            render_backend: Default render backend ("moviepy" or "ffmpeg")
+            quality: Default quality tier ("final" or "preview")
+            encoding_profile: Encoding profile name; defaults to Config.ENCODING_PROFILE
+            subtitle_mode: "burned", "soft" or "both"; defaults to Config.SUBTITLE_MODE
+            on_progress: Receives progress events of every ffmpeg process the assembler runs
+        
+        Raises:
+            ValueError: If the encoding profile is unknown
         """
         self.fps = fps or Config.DEFAULT_FPS
         self.resolution = resolution or Config.DEFAULT_RESOLUTION
+        self.render_backend = render_backend or Config.RENDER_BACKEND
+        self.quality = quality or Config.RENDER_QUALITY
+        self.subtitle_mode = subtitle_mode or Config.SUBTITLE_MODE
+        if self.subtitle_mode not in Config.SUBTITLE_MODES:
+            logger.warning(f"Unknown subtitle mode '{self.subtitle_mode}', using burned")
+            self.subtitle_mode = "burned"
+        self.profile = EncodingProfile.from_config(encoding_profile)
+        self.runner = FFmpegRunner(on_progress=on_progress)
+        self.ffmpeg_renderer = FFmpegRenderer(
+            fps=self.fps, resolution=self.resolution, profile=self.profile, runner=self.runner
+        )
+        self.preview_renderer = FFmpegRenderer(
+            fps=min(self.fps, Config.PREVIEW_FPS),
+            resolution=self.preview_resolution(self.resolution),
+            profile=EncodingProfile.from_config(Config.PREVIEW_PROFILE),
+            runner=self.runner
+        )
+        self.keyframe_index = get_keyframe_index() if Config.KEYFRAME_INDEX_ENABLED else None
+        self.segment_encoder = SegmentEncoder(
+            renderer=self.ffmpeg_renderer,
+            store=SegmentStore() if Config.SEGMENT_STORE_ENABLED else None,
+            keyframes=self.keyframe_index
+        )
+        self.frame_pipeline = FramePipeline(renderer=self.ffmpeg_renderer)
+        self.localizer = Localizer(renderer=self.ffmpeg_renderer)
+        self.clip_cache = (
+            ClipCache(resolution=self.resolution, fps=self.fps, runner=self.runner, profile=self.profile)
+            if Config.CLIP_CACHE_ENABLED else None
+        )
+        self.still_cache = (
+            StillSegmentCache(resolution=self.resolution, fps=self.fps, runner=self.runner, profile=self.profile)
+            if Config.STILL_CACHE_ENABLED else None
+        )
         
         # Ensure directories exist
         Config.ensure_directories()
     
+    @staticmethod
+    def preview_resolution(resolution: tuple) -> tuple:
+        """Preview geometry: PREVIEW_HEIGHT lines (never upscaled) at the output aspect ratio, even sizes."""
+        width, height = resolution
+        preview_height = min(height, Config.PREVIEW_HEIGHT)
+        preview_width = round(width * preview_height / height / 2) * 2
+        return preview_width, preview_height - preview_height % 2
+    
     def generate_srt_file(self, text: str, duration: float, output_path: str = None):
         """Generate SRT subtitle file.
         
@@ -107,6 +183,101 @@ class VideoAssembler:
             logger.error(f"Failed to generate SRT file: {str(e)}")
             return None
     
+    def generate_srt_from_word_timings(self, audio_path: str, output_path: str = None, text: str = None) -> Optional[str]:
+        """Generate SRT file from the word timings recorded during voice synthesis.
+        
+        Words are grouped into cues that end at sentence boundaries, at pauses
+        in speech, or when a cue gets too long. When the narration text is known, cue content is taken from
+        it so punctuation and spacing survive.
+        
+        Args:
+            audio_path: Path to the narration audio (its .words.json sidecar is read)
+            output_path: Path to save the SRT file
+            text: Narration text used for cue content (optional)
+            
+        Returns:
+            Path to the generated SRT file or None if no word timings are available
+        """
+        words = load_word_timings(audio_path)
+        if not words:
+            return None
+        
+        try:
+            spans = self._locate_words(text, words) if text else [None] * len(words)
+            
+            cues = []
+            first = 0
+            for i, word in enumerate(words):
+                span = spans[i]
+                ends_sentence = span is not None and text[span[1] - 1] in ".!?。！？"
+                next_word = words[i + 1] if i + 1 < len(words) else None
+                
+                pause = next_word is not None and next_word['start'] - word['end'] >= Config.SUBTITLE_CUE_PAUSE
+                if next_word is not None and not ends_sentence and not pause:
+                    candidate = self._cue_text(text, words, spans, first, i + 1)
+                    too_long = (
+                        len(candidate) > Config.SUBTITLE_MAX_CUE_CHARS
+                        or next_word['end'] - words[first]['start'] > Config.SUBTITLE_MAX_CUE_DURATION
+                    )
+                    if not too_long:
+                        continue
+                
+                cues.append((words[first]['start'], word['end'], self._cue_text(text, words, spans, first, i)))
+                first = i + 1
+            
+            subs = [
+                srt.Subtitle(
+                    index=i + 1,
+                    start=timedelta(seconds=start),
+                    end=timedelta(seconds=end),
+                    content=content
+                )
+                for i, (start, end, content) in enumerate(cues)
+            ]
+            
+            if not output_path:
+                output_path = os.path.join(Config.OUTPUT_DIR, "subtitles.srt")
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(srt.compose(subs))
+            
+            logger.info(f"Generated SRT from TTS word timings: {output_path} ({len(subs)} cues)")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Failed to generate SRT from word timings: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _locate_words(text: str, words: List[dict]) -> List[Optional[tuple]]:
+        """Find each spoken word in the narration text, including trailing punctuation.
+        
+        Returns:
+            (start, end) character span per word, or None where the word was not found
+        """
+        spans = []
+        cursor = 0
+        for word in words:
+            start = text.find(word['text'], cursor)
+            # Words the TTS engine rewrote (numbers, abbreviations) are not in the text;
+            # allow skipping a few of them but never jump ahead to a later repetition
+            if start < 0 or len(text[cursor:start].split()) > 3:
+                spans.append(None)
+                continue
+            end = start + len(word['text'])
+            while end < len(text) and not text[end].isspace() and not text[end].isalnum():
+                end += 1
+            spans.append((start, end))
+            cursor = end
+        return spans
+    
+    @staticmethod
+    def _cue_text(text: str, words: List[dict], spans: List[Optional[tuple]], first: int, last: int) -> str:
+        """Build the displayed text for words[first..last]."""
+        if text and spans[first] is not None and spans[last] is not None:
+            return ' '.join(text[spans[first][0]:spans[last][1]].split())
+        return ' '.join(word['text'] for word in words[first:last + 1])
+    
     def generate_srt_with_whisper(self, audio_path: str, output_path: str = None, language: str = None) -> Optional[str]:
         """Generate SRT file with accurate timing using Whisper speech recognition.
         
@@ -121,21 +292,20 @@ class VideoAssembler:
         try:
             logger.info(f"Using Whisper for accurate subtitle timing: {os.path.basename(audio_path)}")
             
-            # Load Whisper model (use small model for speed)
-            model = whisper.load_model("base")
-            
             # Map language codes for Whisper (ru-RU -> ru, en-US -> en)
             whisper_language = None
             if language:
                 whisper_language = language.split('-')[0].lower()  # ru-RU -> ru, en-US -> en
                 logger.info(f"Using language hint for Whisper: {whisper_language}")
             
-            # Transcribe audio with word-level timestamps and language hint
-            transcribe_options = {"word_timestamps": True}
-            if whisper_language:
-                transcribe_options["language"] = whisper_language
-            
-            result = model.transcribe(audio_path, **transcribe_options)
+            # Transcribe audio with word-level timestamps using a resident model
+            # (loaded once per process, shared between jobs)
+            result = get_asr_registry().transcribe(
+                audio_path,
+                size=Config.WHISPER_MODEL_SIZE,
+                language=whisper_language,
+                word_timestamps=True
+            )
             
             # Extract segments with timing
             segments = result['segments']
@@ -187,19 +357,27 @@ class VideoAssembler:
         try:
             logger.info(f"Burning subtitles using FFmpeg: {os.path.basename(srt_path)}")
             
+            options = self.profile.output_options(self.fps)
+            if self.profile.faststart:
+                options["movflags"] = "+faststart"
+            
             # Use FFmpeg to burn subtitles with professional styling
-            (
+            command = (
                 ffmpeg
                 .input(video_path)
                 .output(
                     output_path,
-                    vf=f"subtitles={srt_path}:force_style='FontName=Arial,FontSize=18,PrimaryColour=&H00ffffff,OutlineColour=&H00000000,Outline=1,Shadow=1,Alignment=2'",
-                    vcodec='libx264',
-                    acodec='copy'  # Copy audio without re-encoding
+                    vf=f"subtitles={srt_path}:force_style='{Config.SUBTITLE_FFMPEG_STYLE}'",
+                    acodec='copy',  # Copy audio without re-encoding
+                    **options
                 )
                 .overwrite_output()
-                .run(quiet=True)
+                .compile()
             )
+            result = self.runner.run(command, get_media_probe().duration(video_path))
+            if not result.ok:
+                logger.error(f"FFmpeg subtitle burning failed: {result.stderr.strip()[-2000:]}")
+                return None
             
             logger.info(f"FFmpeg subtitle burning complete: {output_path}")
             return output_path
@@ -207,6 +385,30 @@ class VideoAssembler:
         except Exception as e:
             logger.error(f"FFmpeg subtitle burning failed: {str(e)}")
             return None
+    
+    def deliver_subtitles(self, video_path: str, srt_path: str, output_path: str, language: str = None) -> Optional[str]:
+        """Add subtitles to a rendered video in the assembler's subtitle mode.
+        
+        "soft" muxes the SRT as a text track by stream copy, so no frame is
+        encoded again; "burned" and "both" need one encode of the picture.
+        
+        Args:
+            video_path: Rendered video without subtitles
+            srt_path: Path to SRT subtitle file
+            output_path: Path for the subtitled video
+            language: Language code used to tag a text track
+            
+        Returns:
+            Path to output video or None if failed
+        """
+        if self.subtitle_mode == "soft":
+            return self.ffmpeg_renderer.mux_subtitles(video_path, srt_path, output_path, language)
+        if self.subtitle_mode == "burned":
+            return self.burn_subtitles_with_ffmpeg(video_path, srt_path, output_path)
+        
+        with ScratchSpace("subtitles") as scratch:
+            burned_path = self.burn_subtitles_with_ffmpeg(video_path, srt_path, scratch.path("burned.mp4"))
+            return burned_path and self.ffmpeg_renderer.mux_subtitles(burned_path, srt_path, output_path, language)
 
     def add_subtitles(self, video_clip, text: str, enable_subtitles: bool = True, subtitle_style: str = "professional"):
         """Add stylized subtitles to a video clip with improved error handling.
@@ -285,7 +487,10 @@ class VideoAssembler:
         image_duration: float = None,
         subtitle_text: str = None,
         enable_subtitles: bool = False,
-        subtitle_style: str = "professional"
+        subtitle_style: str = "professional",
+        render_backend: str = None,
+        language: str = None,
+        quality: str = None
     ) -> Optional[str]:
         """Create video from mixed assets.
         
@@ -297,72 +502,130 @@ class VideoAssembler:
             image_duration: Duration for each image in seconds
             subtitle_text: Text to display as subtitles
             enable_subtitles: Whether to enable subtitles
+            render_backend: Render backend for this job ("moviepy", "ffmpeg", "segmented"
+                or "streaming"); defaults to the assembler's backend
+            language: Narration language (e.g. 'en-US') used as a Whisper hint
+            quality: "final", or "preview" for a fast low-resolution render written to
+                <name>_preview.mp4 with a manifest that promote_preview turns into output_path;
+                defaults to the assembler's quality
             
         Returns:
             Path to output video file, or None if failed
         """
+        backend = render_backend or self.render_backend
+        if backend not in Config.RENDER_BACKENDS:
+            logger.warning(f"Unknown render backend '{backend}', using moviepy")
+            backend = "moviepy"
+        
+        quality = quality or self.quality
+        if quality not in Config.RENDER_QUALITIES:
+            logger.warning(f"Unknown render quality '{quality}', using final")
+            quality = "final"
+        if quality == "preview":
+            # Previews are cut from the same plan by FFmpeg, whatever the final backend
+            backend = "ffmpeg"
+        
+        if video_paths and self.clip_cache:
+            # Pre-scaled clips from the cache decode straight to the output geometry
+            video_paths = self.clip_cache.normalize_paths(video_paths)
+        
+        if image_paths and self.still_cache and backend == "segmented":
+            # Images become short H.264 segments, encoded once per image, duration and profile, that
+            # the segmented join copies; any that fail to encode stay images. Single-pass backends
+            # loop the image itself, which saves an encode and its generation loss
+            stills = self.still_cache.segment_paths(image_paths, image_duration)
+            video_paths = [segment for _, segment in stills if segment] + list(video_paths or [])
+            image_paths = [image for image, segment in stills if not segment]
+        
+        if backend in ("ffmpeg", "segmented", "streaming"):
+            return self._create_video_with_ffmpeg(
+                image_paths=image_paths,
+                video_paths=video_paths,
+                audio_path=audio_path,
+                output_path=output_path,
+                image_duration=image_duration,
+                subtitle_text=subtitle_text,
+                enable_subtitles=enable_subtitles,
+                language=language,
+                segmented=backend == "segmented",
+                streaming=backend == "streaming",
+                preview=quality == "preview"
+            )
+        
+        scratch = ScratchSpace("moviepy")
         try:
-            clips = []
+            render_start = time.time()
+            sources = []
+            opened = {}
             image_duration = image_duration or Config.DEFAULT_DURATION
             
-            # Process image files
+            # Durations come from the probe cache; clips are only opened once the plan needs them
             if image_paths:
                 for image_path in image_paths:
                     if os.path.exists(image_path):
                         logger.info(f"Adding image: {os.path.basename(image_path)}")
-                        img_clip = ImageClip(image_path, duration=image_duration)
-                        img_clip = img_clip.resized(self.resolution)
-                        clips.append(img_clip)
+                        sources.append(("image", image_path, float(image_duration)))
                     else:
                         logger.warning(f"Image not found: {image_path}")
             
-            # Process video files
             if video_paths:
+                probes = get_media_probe().probe_many([path for path in video_paths if os.path.exists(path)])
                 for video_path in video_paths:
                     if os.path.exists(video_path):
                         logger.info(f"Adding video: {os.path.basename(video_path)}")
                         try:
-                            video_clip = VideoFileClip(video_path)
-                            video_clip = video_clip.resized(self.resolution)
-                            clips.append(video_clip)
+                            probed = probes.get(video_path)
+                            if probed and probed.duration:
+                                sources.append(("video", video_path, probed.duration))
+                            else:
+                                # No usable header metadata: fall back to opening the clip
+                                opened[video_path] = VideoFileClip(video_path)
+                                sources.append(("video", video_path, opened[video_path].duration))
                         except Exception as e:
                             logger.error(f"Failed to load video {video_path}: {str(e)}")
                     else:
                         logger.warning(f"Video not found: {video_path}")
             
-            if not clips:
+            if not sources:
                 logger.error("No valid clips found to assemble")
                 return None
             
-            # Concatenate all clips
-            logger.info(f"Concatenating {len(clips)} clips")
-            final_video = concatenate_videoclips(clips, method="chain")
+            timeline_duration = sum(duration for _, _, duration in sources)
             
-            # Add audio if provided
+            audio_clip = None
             if audio_path and os.path.exists(audio_path):
-                logger.info(f"Adding audio: {os.path.basename(audio_path)}")
                 try:
                     audio_clip = AudioFileClip(audio_path)
-                    
-                    # Strategy: Always make the video match the audio duration for better experience
-                    logger.info(f"Video duration: {final_video.duration}s, Audio duration: {audio_clip.duration}s")
-                    
-                    if audio_clip.duration > final_video.duration:
-                        logger.info(f"Extending video from {final_video.duration}s to {audio_clip.duration}s")
-                        # Calculate how many loops needed and create looped video
-                        loops_needed = int(audio_clip.duration / final_video.duration) + 1
-                        repeated_clips = [final_video] * loops_needed
-                        extended_video = concatenate_videoclips(repeated_clips, method="chain")
-                        # Trim to exact audio duration
-                        final_video = extended_video.subclipped(0, audio_clip.duration)
-                    elif audio_clip.duration < final_video.duration:
-                        logger.info(f"Trimming video from {final_video.duration}s to {audio_clip.duration}s")
-                        # Trim video to match audio duration (preserves all audio)
-                        final_video = final_video.subclipped(0, audio_clip.duration)
-                    else:
-                        logger.info("Video and audio durations match perfectly")
-                    
-                    # Set audio - now durations should match
+                except Exception as e:
+                    logger.error(f"Failed to add audio: {str(e)}")
+                    # Continue without audio rather than failing
+            
+            # Strategy: Always make the video match the audio duration for better experience
+            duration = timeline_duration
+            if audio_clip:
+                duration = get_media_probe().duration(audio_path) or audio_clip.duration
+            if duration > timeline_duration:
+                logger.info(f"Extending video from {timeline_duration}s to {duration}s")
+            elif duration < timeline_duration:
+                logger.info(f"Trimming video from {timeline_duration}s to {duration}s")
+            
+            # Decide which ranges play before touching any frames
+            plan = TimelinePlan.fill(sources, duration)
+            for kind, path, source_duration in sources:
+                if path in plan.sources and path not in opened:
+                    opened[path] = (
+                        ImageClip(path, duration=source_duration) if kind == "image" else VideoFileClip(path)
+                    )
+            clips = list(opened.values())
+            
+            logger.info(f"Concatenating {len(plan)} timeline entries from {len(plan.sources)} clips")
+            final_video = self._compose_plan(plan, opened)
+            
+            # Add audio if provided
+            if audio_clip:
+                logger.info(f"Adding audio: {os.path.basename(audio_path)}")
+                try:
+                    # Set audio - durations match the plan
                     # Try different audio methods for MoviePy compatibility
                     try:
                         final_video = final_video.with_audio(audio_clip)
@@ -380,81 +643,608 @@ class VideoAssembler:
                     logger.error(f"Failed to add audio: {str(e)}")
                     # Continue without audio rather than failing
             
+            # Generate output path if not provided
+            if output_path is None:
+                output_path = os.path.join(Config.OUTPUT_DIR, "generated_video.mp4")
+            
             # Add subtitles if requested (optional)
+            srt_path = None
             if enable_subtitles and subtitle_text:
                 logger.info("Adding subtitles to video")
                 
-                # Generate SRT file first - try Whisper for accurate timing
-                srt_path = output_path.replace('.mp4', '.srt') if output_path else None
-                
-                # Try Whisper method first (more accurate), fallback to text-based
-                # Pass language information to Whisper for better recognition
-                voice_language = None
-                if audio_path:
-                    # Try to detect language from audio file name or path
-                    # This could be improved by passing language as parameter
-                    pass
-                
-                whisper_srt = self.generate_srt_with_whisper(audio_path, srt_path, language=voice_language) if audio_path else None
-                if not whisper_srt:
-                    logger.info("Whisper method failed, using text-based timing")
-                    self.generate_srt_file(subtitle_text, final_video.duration, srt_path)
-                else:
-                    logger.info("Using Whisper-generated subtitles for accurate timing")
+                # Generate SRT file first - try Whisper for accurate timing; it stays next to the output
+                srt_path = self._prepare_srt(
+                    subtitle_text, audio_path, final_video.duration, os.path.splitext(output_path)[0] + ".srt", language
+                )
                 
                 # Skip MoviePy subtitle burning to avoid double subtitles
                 # We'll use only FFmpeg subtitle burning for better quality
                 logger.info("Skipping MoviePy subtitle burning - will use FFmpeg post-processing")
             
-            # Generate output path if not provided
-            if output_path is None:
-                output_path = os.path.join(Config.OUTPUT_DIR, "generated_video.mp4")
-            
-            # Write final video with proper audio encoding
-            temp_output_path = output_path.replace('.mp4', '_temp.mp4') if enable_subtitles and subtitle_text else output_path
+            # Write final video with proper audio encoding; intermediates stay in the job's scratch space
+            add_subtitles = enable_subtitles and subtitle_text and srt_path
+            temp_output_path = scratch.path("video_temp.mp4") if add_subtitles else output_path
             logger.info(f"Writing final video: {temp_output_path}")
             final_video.write_videofile(
                 temp_output_path,
                 fps=self.fps,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
+                temp_audiofile=scratch.path("temp-audio.m4a"),
+                remove_temp=True,
+                **self.profile.moviepy_params(self.fps)
             )
             
-            # Apply FFmpeg subtitle burning if subtitles are enabled
-            if enable_subtitles and subtitle_text and temp_output_path != output_path:
-                logger.info("Applying FFmpeg subtitle burning...")
-                srt_path = output_path.replace('.mp4', '.srt')
-                if self.burn_subtitles_with_ffmpeg(temp_output_path, srt_path, output_path):
-                    # Clean up temporary file
-                    try:
-                        os.remove(temp_output_path)
-                        logger.info("FFmpeg subtitle burning successful, cleaned up temp file")
-                    except Exception as e:
-                        logger.warning(f"Failed to clean up temp file: {e}")
+            # Apply FFmpeg subtitles (burned and/or a text track) if subtitles are enabled
+            if add_subtitles:
+                logger.info(f"Applying FFmpeg subtitles ({self.subtitle_mode})...")
+                if self.deliver_subtitles(temp_output_path, srt_path, output_path, language):
+                    logger.info("FFmpeg subtitles successful")
                 else:
-                    # FFmpeg failed, rename temp file to final output
+                    # FFmpeg failed, move temp file to final output
                     try:
-                        os.rename(temp_output_path, output_path)
-                        logger.warning("FFmpeg subtitle burning failed, using video without subtitles")
+                        shutil.move(temp_output_path, output_path)
+                        logger.warning("FFmpeg subtitles failed, using video without subtitles")
                     except Exception as e:
-                        logger.error(f"Failed to rename temp file: {e}")
+                        logger.error(f"Failed to move temp file: {e}")
             
             # Clean up clips
             for clip in clips:
                 if hasattr(clip, 'close'):
                     clip.close()
-            if 'audio_clip' in locals():
+            if audio_clip:
                 audio_clip.close()
             final_video.close()
             
+            # The plan can be rendered again by FFmpeg (promote, localize)
+            RenderManifest(
+                plan, output_path, audio_path=audio_path if audio_clip else None, srt_path=srt_path,
+                subtitle_mode=self.subtitle_mode, language=language
+            ).save()
+            
+            logger.info(f"Video assembly complete: {output_path}")
+            logger.info(f"Rendered with moviepy backend in {time.time() - render_start:.2f}s")
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"Video assembly failed: {str(e)}")
+            return None
+        finally:
+            scratch.cleanup()
+    
+    def _compose_plan(self, plan: TimelinePlan, clips: Dict[str, object]):
+        """Build the MoviePy composition for a timeline plan.
+        
+        Each entry takes only its planned range of the source and is resized
+        after cutting, so frames outside the plan are never decoded or scaled.
+        Repeats reuse the already opened clips.
+        
+        Args:
+            plan: Timeline plan in playback order
+            clips: Opened MoviePy clips by source path
+            
+        Returns:
+            Concatenated video clip of the plan's duration
+        """
+        sequence = []
+        for entry in plan:
+            clip = clips[entry.source]
+            # Probed container durations can run a few milliseconds past the decodable stream
+            out_point = min(entry.out_point, clip.duration)
+            if entry.in_point > 0 or out_point < clip.duration:
+                clip = clip.subclipped(entry.in_point, out_point)
+            if tuple(clip.size) != tuple(self.resolution):
+                clip = clip.resized(self.resolution)
+            sequence.append(clip)
+        return concatenate_videoclips(sequence, method="chain")
+    
+    def _prepare_srt(
+        self,
+        subtitle_text: str,
+        audio_path: str,
+        duration: float,
+        srt_path: str,
+        language: str = None
+    ) -> Optional[str]:
+        """Write the SRT for a render.
+        
+        Word timings recorded by the voice generator are exact and free, so they
+        are used first; Whisper and then text-based timing are fallbacks.
+        
+        Args:
+            subtitle_text: Text to display as subtitles
+            audio_path: Narration audio (optional)
+            duration: Video duration used for text-based timing
+            srt_path: Path to save the SRT file
+            language: Narration language used as a Whisper hint
+            
+        Returns:
+            Path to the generated SRT file or None if failed
+        """
+        tts_srt = self.generate_srt_from_word_timings(audio_path, srt_path, text=subtitle_text) if audio_path else None
+        if tts_srt:
+            logger.info("Using TTS word timings for subtitles")
+            return tts_srt
+        
+        # Fall back to Whisper (slower, but works for any audio), then text-based
+        whisper_srt = self.generate_srt_with_whisper(audio_path, srt_path, language=language) if audio_path else None
+        if whisper_srt:
+            logger.info("Using Whisper-generated subtitles for accurate timing")
+            return whisper_srt
+        
+        logger.info("Whisper method failed, using text-based timing")
+        return self.generate_srt_file(subtitle_text, duration, srt_path)
+    
+    def _create_video_with_ffmpeg(
+        self,
+        image_paths: List[str] = None,
+        video_paths: List[str] = None,
+        audio_path: str = None,
+        output_path: str = None,
+        image_duration: float = None,
+        subtitle_text: str = None,
+        enable_subtitles: bool = False,
+        language: str = None,
+        segmented: bool = False,
+        streaming: bool = False,
+        preview: bool = False
+    ) -> Optional[str]:
+        """Create video from mixed assets with FFmpeg.
+        
+        Scaling, trimming, looping, the narration track and burned subtitles all
+        go into one filter graph, so there is no intermediate file to re-encode.
+        In segmented mode the same work is split into segments encoded in
+        parallel and joined with stream copy. In streaming mode clips are
+        decoded one after another into a fixed ring of frame buffers, so
+        memory stays flat however long the timeline is.
+        
+        Args:
+            image_paths: List of image file paths
+            video_paths: List of video file paths
+            audio_path: Path to audio file
+            output_path: Output video path
+            image_duration: Duration for each image in seconds
+            subtitle_text: Text to display as subtitles
+            enable_subtitles: Whether to enable subtitles
+            language: Narration language used as a Whisper hint
+            segmented: Encode segments in parallel instead of in one pass
+            streaming: Decode clips one by one through the bounded frame pipeline
+            preview: Render a low-resolution proxy and save the manifest for promote_preview
+            
+        Returns:
+            Path to output video file (the preview's in preview mode), or None if failed
+        """
+        scratch = ScratchSpace("ffmpeg")
+        try:
+            render_start = time.time()
+            
+            segments = self.ffmpeg_renderer.plan_segments(image_paths, video_paths, image_duration)
+            if not segments:
+                logger.error("No valid clips found to assemble")
+                return None
+            
+            if audio_path and not os.path.exists(audio_path):
+                logger.warning(f"Audio not found: {audio_path}")
+                audio_path = None
+            
+            # Always make the video match the audio duration, like the MoviePy path
+            duration = self.ffmpeg_renderer.get_duration(audio_path) if audio_path else None
+            plan = self.ffmpeg_renderer.plan_timeline(segments, duration)
+            if self.keyframe_index and segmented and not preview:
+                # Cuts on keyframes let the segmented backend copy whole clip ranges; the other
+                # backends encode every frame, so they skip the index and keep the planned cuts
+                plan = self.keyframe_index.snap(plan)
+            duration = plan.duration
+            
+            if output_path is None:
+                output_path = os.path.join(Config.OUTPUT_DIR, "generated_video.mp4")
+            
+            srt_path = None
+            if enable_subtitles and subtitle_text:
+                logger.info("Adding subtitles to video")
+                # The SRT stays next to the output, so promoted and localized renders can use the same cues
+                srt_target = os.path.splitext(output_path)[0] + ".srt"
+                srt_path = self._prepare_srt(subtitle_text, audio_path, duration, srt_target, language)
+            
+            manifest = RenderManifest(
+                plan, output_path, audio_path=audio_path, srt_path=srt_path,
+                subtitle_mode=self.subtitle_mode, language=language
+            )
+            subtitles = {"srt_path": srt_path, "subtitle_mode": self.subtitle_mode, "language": language}
+            if preview:
+                output_path = preview_path(output_path)
+                result = self.preview_renderer.render(plan, output_path, audio_path=audio_path, **subtitles)
+            elif segmented:
+                result = self.segment_encoder.render(
+                    plan, output_path, audio_path=audio_path, work_dir=scratch.path("segments"), **subtitles
+                )
+            elif streaming:
+                result = self.frame_pipeline.render(plan, output_path, audio_path=audio_path, **subtitles)
+            else:
+                result = self.ffmpeg_renderer.render(plan, output_path, audio_path=audio_path, **subtitles)
+            if not result:
+                return None
+            manifest.save()
+            
+            backend = "preview" if preview else "segmented" if segmented else "streaming" if streaming else "ffmpeg"
             logger.info(f"Video assembly complete: {output_path}")
+            logger.info(f"Rendered with {backend} backend in {time.time() - render_start:.2f}s")
             return output_path
             
         except Exception as e:
             logger.error(f"Video assembly failed: {str(e)}")
             return None
+        finally:
+            scratch.cleanup()
+    
+    def promote_preview(self, manifest_file: str, render_backend: str = None) -> Optional[str]:
+        """Render the full-quality version of a preview from its manifest.
+        
+        Clip selection, trims, narration and subtitle cues are read from the
+        manifest, so nothing is synthesized, downloaded or transcribed again.
+        
+        Args:
+            manifest_file: Manifest written next to the preview (<name>.render.json),
+                or the final output path it belongs to
+            render_backend: "ffmpeg", "segmented" or "streaming"; MoviePy cannot render a
+                saved plan, so it maps to "ffmpeg"
+            
+        Returns:
+            Path to the full-quality video, or None if failed
+        """
+        if not manifest_file.endswith(".render.json"):
+            manifest_file = manifest_path(manifest_file)
+        manifest = RenderManifest.load(manifest_file)
+        if not manifest:
+            return None
+        
+        missing = manifest.missing_files()
+        if missing:
+            logger.error(f"Cannot promote preview, inputs are gone: {', '.join(missing)}")
+            return None
+        
+        render_start = time.time()
+        backend = render_backend or self.render_backend
+        if backend not in ("segmented", "streaming"):
+            backend = "ffmpeg"
+        result = self._render_plan(
+            manifest.plan, manifest.output_path, audio_path=manifest.audio_path, srt_path=manifest.srt_path,
+            render_backend=backend, subtitle_mode=manifest.subtitle_mode, language=manifest.language,
+            renderer=self._renderer_for(manifest.resolution, manifest.crf)
+        )
+        
+        if result:
+            logger.info(f"Promoted preview with {backend} backend in {time.time() - render_start:.2f}s: {result}")
+        return result
+    
+    def _renderer_for(self, resolution: tuple = None, crf: int = None) -> FFmpegRenderer:
+        """Full-quality renderer for an output target's geometry and CRF (the assembler's own by default)."""
+        if (resolution is None or tuple(resolution) == tuple(self.resolution)) and crf is None:
+            return self.ffmpeg_renderer
+        return FFmpegRenderer(
+            fps=self.fps, resolution=tuple(resolution or self.resolution),
+            profile=self.profile.with_crf(crf), runner=self.runner
+        )
+    
+    def _render_plan(
+        self,
+        plan: TimelinePlan,
+        output_path: str,
+        audio_path: str = None,
+        srt_path: str = None,
+        render_backend: str = None,
+        subtitle_mode: str = "burned",
+        language: str = None,
+        renderer: FFmpegRenderer = None
+    ) -> Optional[str]:
+        """Render a saved timeline plan with the "ffmpeg", "segmented" or "streaming" backend.
+        
+        MoviePy cannot render a saved plan, so any other backend maps to "ffmpeg".
+        
+        Args:
+            renderer: Geometry and encoder settings (see _renderer_for); defaults to the assembler's
+        
+        Returns:
+            Path to output video file, or None if failed
+        """
+        subtitles = {"srt_path": srt_path, "subtitle_mode": subtitle_mode, "language": language}
+        backend = render_backend or self.render_backend
+        renderer = renderer or self.ffmpeg_renderer
+        own = renderer is self.ffmpeg_renderer
+        if backend == "segmented":
+            encoder = self.segment_encoder if own else SegmentEncoder(
+                renderer=renderer, store=self.segment_encoder.store, keyframes=self.keyframe_index
+            )
+            with ScratchSpace("plan") as scratch:
+                return encoder.render(
+                    plan, output_path, audio_path=audio_path, work_dir=scratch.path("segments"), **subtitles
+                )
+        if backend == "streaming":
+            pipeline = self.frame_pipeline if own else FramePipeline(renderer=renderer)
+            return pipeline.render(plan, output_path, audio_path=audio_path, **subtitles)
+        return renderer.render(plan, output_path, audio_path=audio_path, **subtitles)
+    
+    def localize_video(
+        self,
+        manifest_file: str,
+        audio_path: str,
+        language: str,
+        output_path: str = None,
+        subtitle_text: str = None,
+        enable_subtitles: bool = False,
+        subtitle_mode: str = "soft",
+        render_backend: str = None
+    ) -> Optional[str]:
+        """Create another-language version of a rendered video from its manifest.
+        
+        The picture of the earlier render is reused when it carries no burned
+        subtitles and the new narration is within Config.LOCALIZE_MAX_STRETCH of
+        its length: it is retimed and copied, with the subtitles as a text track,
+        or burned in one overlay pass. Otherwise the manifest's plan is cut again
+        to the new narration length. Assets are never fetched again.
+        
+        Args:
+            manifest_file: Manifest of the original render (<name>.render.json),
+                or the output path it belongs to
+            audio_path: Narration in the new language
+            language: Language code of the narration (e.g. 'es-ES')
+            output_path: Output video path; defaults to <name>_<language>.mp4
+            subtitle_text: Text to display as subtitles
+            enable_subtitles: Whether to add subtitles
+            subtitle_mode: "soft" text track, "burned" into the picture or "both"
+            render_backend: "ffmpeg", "segmented" or "streaming" when the picture has to be cut again
+            
+        Returns:
+            Path to the localized video, or None if failed
+        """
+        if not manifest_file.endswith(".render.json"):
+            manifest_file = manifest_path(manifest_file)
+        manifest = RenderManifest.load(manifest_file)
+        if not manifest:
+            return None
+        
+        duration = get_media_probe().duration(audio_path) if audio_path and os.path.exists(audio_path) else None
+        if not duration:
+            logger.error(f"Cannot localize video, narration is unreadable: {audio_path}")
+            return None
+        
+        output_path = output_path or localized_path(manifest.output_path, language)
+        try:
+            render_start = time.time()
+            
+            srt_path = None
+            if enable_subtitles and subtitle_text:
+                srt_path = self._prepare_srt(
+                    subtitle_text, audio_path, duration, os.path.splitext(output_path)[0] + ".srt", language
+                )
+            burn = bool(burned_srt(srt_path, subtitle_mode))
+            
+            # Burned subtitles of the original language cannot be removed from the picture
+            picture = manifest.output_path
+            reusable = not manifest.burned_subtitles and os.path.exists(picture)
+            scale = self.localizer.stretch(get_media_probe().duration(picture), duration) if reusable else None
+            
+            if scale is not None:
+                if burn:
+                    result = self.localizer.burn(
+                        picture, audio_path, output_path, srt_path, duration, scale=scale,
+                        with_track=subtitle_mode == "both", language=language
+                    )
+                else:
+                    result = self.localizer.remux(
+                        picture, audio_path, output_path, scale=scale, srt_path=srt_path, language=language
+                    )
+                method = "subtitle overlay" if burn else "picture copy"
+            else:
+                missing = [path for path in manifest.plan.sources if not os.path.exists(path)]
+                if missing:
+                    logger.error(f"Cannot localize video, clips are gone: {', '.join(missing)}")
+                    return None
+                logger.info(f"Cutting the picture again for a {duration:.2f}s narration")
+                result = self._render_plan(
+                    manifest.plan.fit(duration), output_path, audio_path=audio_path, srt_path=srt_path,
+                    render_backend=render_backend, subtitle_mode=subtitle_mode, language=language,
+                    renderer=self._renderer_for(manifest.resolution, manifest.crf)
+                )
+                method = "re-cut plan"
+            
+            if result:
+                logger.info(f"Localized video ({language}, {method}) in {time.time() - render_start:.2f}s: {result}")
+            return result or None
+        
+        except Exception as e:
+            logger.error(f"Video localization failed: {str(e)}")
+            return None
+    
+    @staticmethod
+    def variant_path(output_path: str, target: str) -> str:
+        """Output path of one target variant: <name>_<target><ext> next to output_path."""
+        root, ext = os.path.splitext(output_path)
+        return f"{root}_{target}{ext or '.mp4'}"
+    
+    def create_video_variants(
+        self,
+        targets: List[str],
+        image_paths: List[str] = None,
+        video_paths: List[str] = None,
+        audio_path: str = None,
+        output_path: str = None,
+        image_duration: float = None,
+        subtitle_text: str = None,
+        enable_subtitles: bool = False,
+        language: str = None,
+        render_backend: str = None,
+        quality: str = None
+    ) -> Dict[str, str]:
+        """Create several platform variants of one video from a single decode.
+        
+        The timeline, narration and subtitles are prepared once; FFmpeg splits
+        the decoded picture into one scaled and cropped branch per target (see
+        Config.OUTPUT_TARGETS). Clips are read from the raw downloads, since the
+        normalized caches are fixed to this assembler's resolution. The
+        segmented and streaming backends cannot split one decode, so they
+        render each distinct target on its own. Every variant gets a
+        manifest, so it can be promoted or localized like a single render.
+        
+        Args:
+            targets: Target names, e.g. ["youtube_video", "tiktok"]
+            image_paths: List of image file paths
+            video_paths: List of video file paths
+            audio_path: Path to audio file
+            output_path: Base output path; variants are written as <name>_<target>.mp4
+            image_duration: Duration for each image in seconds
+            subtitle_text: Text to display as subtitles
+            enable_subtitles: Whether to enable subtitles
+            language: Narration language used as a Whisper hint
+            render_backend: "ffmpeg" (or "moviepy", which cannot split a decode and maps to it),
+                "segmented" or "streaming"; defaults to the assembler's backend
+            quality: Must be "final": a preview is one low-resolution proxy, not one per target
+        
+        Returns:
+            Output path by target name; empty if the render failed
+        """
+        unknown = [target for target in targets if target not in Config.OUTPUT_TARGETS]
+        if not targets or unknown:
+            logger.error(f"Unknown output targets: {unknown or 'none given'}")
+            return {}
+        if (quality or self.quality) == "preview":
+            logger.error("Output targets are rendered at final quality; render the preview without targets")
+            return {}
+        backend = render_backend or self.render_backend
+        if backend not in ("segmented", "streaming"):
+            if backend != "ffmpeg":
+                logger.info(f"The {backend} backend cannot render output targets, using ffmpeg")
+            backend = "ffmpeg"
+        
+        try:
+            render_start = time.time()
+            
+            segments = self.ffmpeg_renderer.plan_segments(image_paths, video_paths, image_duration)
+            if not segments:
+                logger.error("No valid clips found to assemble")
+                return {}
+            
+            if audio_path and not os.path.exists(audio_path):
+                logger.warning(f"Audio not found: {audio_path}")
+                audio_path = None
+            
+            duration = self.ffmpeg_renderer.get_duration(audio_path) if audio_path else None
+            plan = self.ffmpeg_renderer.plan_timeline(segments, duration)
+            
+            if output_path is None:
+                output_path = os.path.join(Config.OUTPUT_DIR, "generated_video.mp4")
+            outputs = {target: self.variant_path(output_path, target) for target in dict.fromkeys(targets)}
+            
+            srt_path = None
+            if enable_subtitles and subtitle_text:
+                logger.info("Adding subtitles to video variants")
+                # The SRT stays next to the outputs, so every variant's manifest can use the same cues
+                srt_target = os.path.splitext(output_path)[0] + ".srt"
+                srt_path = self._prepare_srt(subtitle_text, audio_path, plan.duration, srt_target, language)
+            
+            subtitles = {"srt_path": srt_path, "subtitle_mode": self.subtitle_mode, "language": language}
+            if backend == "ffmpeg":
+                results = self.ffmpeg_renderer.render_targets(plan, outputs, audio_path=audio_path, **subtitles)
+            else:
+                results = self._render_targets_one_by_one(plan, outputs, backend, audio_path, subtitles)
+            if not results:
+                return {}
+            
+            for name, variant in results.items():
+                target = OutputTarget.from_config(name)
+                RenderManifest(
+                    plan, variant, audio_path=audio_path, resolution=target.resolution, crf=target.crf, **subtitles
+                ).save()
+            logger.info(f"Rendered {len(results)} variants with {backend} backend in {time.time() - render_start:.2f}s")
+            return results
+        
+        except Exception as e:
+            logger.error(f"Video variant creation failed: {str(e)}")
+            return {}
+    
+    def _render_targets_one_by_one(
+        self,
+        plan: TimelinePlan,
+        outputs: Dict[str, str],
+        backend: str,
+        audio_path: str = None,
+        subtitles: Dict[str, str] = None
+    ) -> Dict[str, str]:
+        """Render each distinct target with a backend that cannot split one decode.
+        
+        Targets that would produce identical files are rendered once and copied.
+        
+        Returns:
+            Output path by target name; empty if any render failed
+        """
+        encoded = {}
+        for name, output_path in outputs.items():
+            target = OutputTarget.from_config(name)
+            if target.encode_key in encoded:
+                shutil.copyfile(encoded[target.encode_key], output_path)
+                continue
+            logger.info(f"Rendering {name} target with {backend} backend")
+            renderer = self._renderer_for(target.resolution, target.crf)
+            if not self._render_plan(plan, output_path, audio_path=audio_path, render_backend=backend,
+                                     renderer=renderer, **(subtitles or {})):
+                return {}
+            encoded[target.encode_key] = output_path
+        return dict(outputs)
+    
+    def create_audio_only_video(
+        self,
+        audio_path: str,
+        output_path: str = None,
+        subtitle_text: str = None,
+        enable_subtitles: bool = False,
+        language: str = None
+    ) -> Optional[str]:
+        """Create a video with a plain background for narration without visuals.
+        
+        The background is generated by FFmpeg and encoded with still-image tuning,
+        with subtitles burned or muxed in the same pass; no frame goes through Python.
+        
+        Args:
+            audio_path: Path to audio file
+            output_path: Output video path
+            subtitle_text: Text to display as subtitles
+            enable_subtitles: Whether to enable subtitles
+            language: Narration language used as a Whisper hint
+            
+        Returns:
+            Path to output video file, or None if failed
+        """
+        if output_path is None:
+            output_path = os.path.join(Config.OUTPUT_DIR, "audio_only_video.mp4")
+        
+        scratch = ScratchSpace("audio_only")
+        try:
+            render_start = time.time()
+            duration = get_media_probe().duration(audio_path)
+            if duration is None:
+                # No ffprobe: read the header through MoviePy's reader instead
+                audio_clip = AudioFileClip(audio_path)
+                duration = audio_clip.duration
+                audio_clip.close()
+            
+            srt_path = None
+            if enable_subtitles and subtitle_text:
+                logger.info("Adding subtitles to audio-only video")
+                srt_path = self._prepare_srt(
+                    subtitle_text, audio_path, duration, scratch.path("subtitles.srt"), language
+                )
+            
+            result = self.ffmpeg_renderer.render_color(
+                output_path, duration=duration, audio_path=audio_path, srt_path=srt_path,
+                subtitle_mode=self.subtitle_mode, language=language
+            )
+            if result:
+                logger.info(f"Audio-only video rendered in {time.time() - render_start:.2f}s")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Audio-only video creation failed: {str(e)}")
+            return None
+        finally:
+            scratch.cleanup()
     
     def create_slideshow_video(
         self,
@@ -477,6 +1267,9 @@ class VideoAssembler:
             transition_duration: Duration of fade transitions
             subtitle_text: Text to display as subtitles
             enable_subtitles: Whether to enable subtitles
+            subtitle_style: Style of MoviePy subtitles ('professional', 'modern', 'cinematic');
+                slideshows joined from cached still segments burn subtitles with
+                Config.SUBTITLE_FFMPEG_STYLE instead, so it does not apply to them
             
         Returns:
             Path to output video file, or None if failed
@@ -487,7 +1280,20 @@ class VideoAssembler:
                 return None
             
             image_duration = image_duration or Config.DEFAULT_DURATION
+            if output_path is None:
+                output_path = os.path.join(Config.OUTPUT_DIR, "slideshow_video.mp4")
+            
+            if self.still_cache:
+                result = self._create_slideshow_from_stills(
+                    image_paths, audio_path, output_path, image_duration,
+                    transition_duration, subtitle_text, enable_subtitles
+                )
+                if result:
+                    return result
+                logger.warning("Still segment slideshow failed, rendering with MoviePy")
+            
             clips = []
+            audio_clip = None
             
             for i, image_path in enumerate(image_paths):
                 if not os.path.exists(image_path):
@@ -529,12 +1335,18 @@ class VideoAssembler:
                     # Strategy: Always preserve the full audio
                     logger.info(f"Slideshow duration: {final_video.duration}s, Audio duration: {audio_clip.duration}s")
                     
-                    if audio_clip.duration > final_video.duration:
-                        logger.info("Extending slideshow to match audio duration")
-                        final_video = final_video.loop(duration=audio_clip.duration)
-                    elif audio_clip.duration < final_video.duration:
-                        logger.info("Trimming slideshow to match audio duration")
-                        final_video = final_video.subclipped(0, audio_clip.duration)
+                    if audio_clip.duration != final_video.duration:
+                        if audio_clip.duration > final_video.duration:
+                            logger.info("Extending slideshow to match audio duration")
+                        else:
+                            logger.info("Trimming slideshow to match audio duration")
+                        # Slides carry their own fades, so plan over slide positions rather than files
+                        slides = {str(i): clip for i, clip in enumerate(clips)}
+                        plan = TimelinePlan.fill(
+                            [("image", key, clip.duration) for key, clip in slides.items()],
+                            audio_clip.duration
+                        )
+                        final_video = self._compose_plan(plan, slides)
                     
                     # Set audio with compatibility handling
                     try:
@@ -566,20 +1378,20 @@ class VideoAssembler:
             
             # Write final video
             logger.info(f"Writing slideshow video: {output_path}")
-            final_video.write_videofile(
-                output_path,
-                fps=self.fps,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True
-            )
+            with ScratchSpace("slideshow") as scratch:
+                final_video.write_videofile(
+                    output_path,
+                    fps=self.fps,
+                    temp_audiofile=scratch.path("temp-audio.m4a"),
+                    remove_temp=True,
+                    **self.profile.moviepy_params(self.fps)
+                )
             
             # Clean up
             for clip in clips:
                 if hasattr(clip, 'close'):
                     clip.close()
-            if 'audio_clip' in locals():
+            if audio_clip:
                 audio_clip.close()
             final_video.close()
             
@@ -590,6 +1402,77 @@ class VideoAssembler:
             logger.error(f"Slideshow creation failed: {str(e)}")
             return None
     
+    def _create_slideshow_from_stills(
+        self,
+        image_paths: List[str],
+        audio_path: str,
+        output_path: str,
+        image_duration: float,
+        transition_duration: float,
+        subtitle_text: str = None,
+        enable_subtitles: bool = False
+    ) -> Optional[str]:
+        """Join cached still segments with stream copy, muxing the narration once.
+        
+        Slides that were used before are not encoded again; only burned
+        subtitles need a final encode over the joined picture (see deliver_subtitles).
+        Subtitles use the FFmpeg burn style, so subtitle_style is not applied here.
+        
+        Returns:
+            Path to output video file, or None if any slide could not be encoded
+        """
+        stills = self.still_cache.segment_paths(image_paths, image_duration, transition_duration)
+        if not stills or not all(segment for _, segment in stills):
+            return None
+        
+        audio_path = audio_path if audio_path and os.path.exists(audio_path) else None
+        audio_duration = get_media_probe().duration(audio_path) if audio_path else None
+        if audio_path and audio_duration is None:
+            # Without a known narration length the slides cannot be cycled to fit it
+            return None
+        
+        # Plan over slide positions, since a recurring image can carry different fades
+        slide_frames = self.still_cache.frame_count(image_duration)
+        slide_duration = slide_frames / self.fps
+        plan = TimelinePlan.fill(
+            [("image", str(index), slide_duration) for index in range(len(stills))],
+            audio_duration or slide_duration * len(stills)
+        )
+        
+        segments = []
+        for entry in plan:
+            index = int(entry.source)
+            image_path, segment = stills[index]
+            if self.still_cache.frame_count(entry.duration) != slide_frames:
+                # A slide cut short by the narration is its own (cached) segment, so the join stays exact
+                fades = self.still_cache.slide_fades(index, len(stills), transition_duration)
+                segment = self.still_cache.get(image_path, entry.duration, *fades)
+                if not segment:
+                    return None
+            segments.append(segment)
+        
+        with ScratchSpace("slideshow") as scratch:
+            list_path = scratch.path("slides.txt")
+            write_concat_list(list_path, segments)
+            
+            add_subtitles = enable_subtitles and subtitle_text
+            joined_path = scratch.path("slides.mp4") if add_subtitles else output_path
+            logger.info(f"Joining {len(segments)} still segments with stream copy: {joined_path}")
+            if not self.segment_encoder.join(list_path, joined_path, plan.duration, audio_path=audio_path):
+                return None
+            
+            if add_subtitles:
+                # The SRT is also kept next to the video for external use
+                srt_path = self._prepare_srt(
+                    subtitle_text, audio_path, plan.duration, output_path.replace('.mp4', '.srt')
+                )
+                if not srt_path or not self.deliver_subtitles(joined_path, srt_path, output_path):
+                    logger.warning("FFmpeg subtitles failed, using slideshow without subtitles")
+                    shutil.move(joined_path, output_path)
+        
+        logger.info(f"Slideshow video complete: {output_path}")
+        return output_path
+    
     def get_video_info(self, video_path: str) -> Dict:
         """Get information about a video file.
         
@@ -599,19 +1482,17 @@ class VideoAssembler:
         Returns:
             Dictionary with video information
         """
-        try:
-            clip = VideoFileClip(video_path)
-            info = {
-                "duration": clip.duration,
-                "fps": clip.fps,
-                "size": clip.size,
-                "filename": os.path.basename(video_path)
-            }
-            clip.close()
-            return info
-        except Exception as e:
-            logger.error(f"Failed to get video info: {str(e)}")
+        probed = get_media_probe().probe(video_path)
+        if not probed:
+            logger.error(f"Failed to get video info: {video_path}")
             return {}
+        
+        return {
+            "duration": probed.duration,
+            "fps": probed.fps,
+            "size": list(probed.size) if probed.size else None,
+            "filename": os.path.basename(video_path)
+        }
 
 
 def create_video_from_files(
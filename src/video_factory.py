@@ -13,6 +13,8 @@ from dataclasses import asdict
 from content_generator import OllamaContentGenerator, VideoContent
 from pipeline_runner import PipelineRunner
 from youtube_uploader import YouTubeUploader
+from asr_models import get_asr_registry
+from search_cache import get_search_cache
 from config import Config
 
 # Configure logging
@@ -506,6 +508,18 @@ class VideoFactory:
         if self.stats['videos_generated'] > 0:
             avg_time = self.stats['total_processing_time'] / self.stats['videos_generated']
             logger.info(f"  Average Time per Video: {avg_time:.1f}s")
+        
+        asr_stats = get_asr_registry().get_stats()
+        logger.info(f"  Whisper Model Loads: {asr_stats['loads']} (reused {asr_stats['hits']} times)")
+        logger.info(f"  Resident Whisper Models: {', '.join(asr_stats['resident_models']) or 'none'}")
+        
+        # Opening the cache would create its database even when caching is off
+        if Config.SEARCH_CACHE_ENABLED:
+            search_stats = get_search_cache().get_stats()
+            logger.info(
+                f"  Stock Searches Cached: {search_stats['hits'] + search_stats['stale_hits']} "
+                f"(API calls {search_stats['misses'] + search_stats['refreshes']}, hit rate {search_stats['hit_rate']:.0%})"
+            )
     
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize filename for safe file system usage."""
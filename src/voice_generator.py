@@ -3,9 +3,10 @@ Voice generation module using edge-tts for AI voice synthesis.
 Single responsibility: Generate natural-sounding AI voice from text.
 """
 import asyncio
+import json
 import logging
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 
 import edge_tts
 
@@ -15,6 +16,36 @@ from config import Config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# edge-tts reports offsets and durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
+
+
+def word_timings_path(audio_path: str) -> str:
+    """Get the sidecar path that holds word timings for an audio file."""
+    return os.path.splitext(audio_path)[0] + ".words.json"
+
+
+def load_word_timings(audio_path: str) -> Optional[List[Dict]]:
+    """Load word timings captured while the audio was synthesized.
+    
+    Args:
+        audio_path: Path to the narration audio
+        
+    Returns:
+        List of {"text", "start", "end"} entries in seconds, or None if unavailable
+    """
+    sidecar = word_timings_path(audio_path)
+    if not os.path.exists(sidecar):
+        return None
+    
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            words = json.load(f).get("words", [])
+        return words or None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable word timings {sidecar}: {str(e)}")
+        return None
+
 
 class VoiceGenerator:
     """Handles AI voice generation using Microsoft Edge TTS."""
@@ -61,24 +92,52 @@ class VoiceGenerator:
             logger.info(f"Synthesizing text with voice: {self.voice}")
             logger.info(f"Text preview: {text[:50]}...")
             
-            # Create edge-tts communicate object
-            communicate = edge_tts.Communicate(
-                text=text,
-                voice=self.voice,
-                rate=self.speed,
-                pitch=self.pitch
-            )
+            communicate = self._create_communicate(text)
+            
+            # Stream audio to disk and keep the word boundaries edge-tts sends alongside it
+            words = []
+            with open(output_file, 'wb') as audio_file:
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        audio_file.write(chunk["data"])
+                    elif chunk["type"] == "WordBoundary":
+                        start = chunk["offset"] / TICKS_PER_SECOND
+                        words.append({
+                            "text": chunk["text"],
+                            "start": round(start, 3),
+                            "end": round(start + chunk["duration"] / TICKS_PER_SECOND, 3)
+                        })
             
-            # Save audio file
-            await communicate.save(output_file)
+            self._save_word_timings(output_file, text, words)
             
-            logger.info(f"Voice synthesis complete: {output_file}")
+            logger.info(f"Voice synthesis complete: {output_file} ({len(words)} word timings)")
             return output_file
             
         except Exception as e:
             logger.error(f"Voice synthesis failed: {str(e)}")
             raise RuntimeError(f"Failed to synthesize voice: {str(e)}")
     
+    def _create_communicate(self, text: str) -> edge_tts.Communicate:
+        """Create an edge-tts session that reports word boundaries."""
+        options = dict(text=text, voice=self.voice, rate=self.speed, pitch=self.pitch)
+        try:
+            return edge_tts.Communicate(boundary="WordBoundary", **options)
+        except TypeError:
+            # edge-tts < 7 has no boundary option and always sends word boundaries
+            return edge_tts.Communicate(**options)
+    
+    def _save_word_timings(self, audio_path: str, text: str, words: List[Dict]):
+        """Write word timings next to the audio, or drop a stale sidecar if there are none."""
+        sidecar = word_timings_path(audio_path)
+        if not words:
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+            logger.warning("No word boundaries received; subtitles will fall back to Whisper")
+            return
+        
+        with open(sidecar, 'w', encoding='utf-8') as f:
+            json.dump({"voice": self.voice, "text": text, "words": words}, f, ensure_ascii=False, indent=2)
+    
     def generate_voice_sync(self, text: str, output_file: str = None) -> str:
         """Synchronous wrapper for voice generation.
         
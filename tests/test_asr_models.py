@@ -0,0 +1,126 @@
+"""
+Test suite for the resident Whisper model pool.
+Tests model reuse, language keys, eviction and concurrent loading.
+"""
+import pytest
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asr_models import ASRModelRegistry
+
+
+def make_model(name):
+    """Create a fake Whisper model."""
+    model = Mock(name=name)
+    model.transcribe.return_value = {"segments": []}
+    return model
+
+
+class TestASRModelRegistry:
+    """Test cases for the resident model pool."""
+
+    @patch('whisper.load_model')
+    def test_model_loaded_once_and_reused(self, mock_load_model):
+        """Test that repeated transcriptions share one loaded model."""
+        mock_load_model.side_effect = make_model
+        registry = ASRModelRegistry(idle_timeout=0, memory_budget_mb=0)
+
+        for _ in range(3):
+            registry.transcribe("audio.mp3", size="base", language="ru", word_timestamps=True)
+
+        mock_load_model.assert_called_once_with("base")
+        stats = registry.get_stats()
+        assert stats["loads"] == 1
+        assert stats["hits"] == 2
+        model = registry.get_model("base", "ru")
+        model.transcribe.assert_called_with("audio.mp3", word_timestamps=True, language="ru")
+
+    @patch('whisper.load_model')
+    def test_english_uses_english_only_weights(self, mock_load_model):
+        """Test that English gets '.en' weights and other languages share multilingual ones."""
+        mock_load_model.side_effect = make_model
+        registry = ASRModelRegistry(idle_timeout=0, memory_budget_mb=0)
+
+        registry.get_model("base", "en")
+        registry.get_model("base", "ru")
+        registry.get_model("base", "de")
+
+        assert [c.args[0] for c in mock_load_model.call_args_list] == ["base.en", "base"]
+        assert registry.model_key("large", "en") == ("large", None)
+
+    @patch('whisper.load_model')
+    def test_idle_models_are_evicted(self, mock_load_model):
+        """Test that models unused past the idle timeout are dropped."""
+        mock_load_model.side_effect = make_model
+        registry = ASRModelRegistry(idle_timeout=60, memory_budget_mb=0)
+        registry.get_model("base", "ru")
+
+        assert registry.evict_idle() == 0
+
+        with patch('asr_models.time.monotonic', return_value=time.monotonic() + 120):
+            assert registry.evict_idle() == 1
+
+        assert registry.get_stats()["resident_models"] == []
+        assert registry.stats["idle_evictions"] == 1
+        assert registry._loading_locks == {}
+
+    @patch('whisper.load_model')
+    def test_memory_budget_evicts_least_recently_used(self, mock_load_model):
+        """Test that loading past the budget evicts the oldest idle model."""
+        mock_load_model.side_effect = make_model
+        # Mock models fall back to size estimates: base=290 MB, small=970 MB
+        registry = ASRModelRegistry(idle_timeout=0, memory_budget_mb=1300)
+
+        registry.get_model("base", "ru")
+        registry.get_model("base", "en")
+        registry.get_model("base", "ru")  # refresh: base.en is now least recent
+        registry.get_model("small", "ru")
+
+        assert registry.get_stats()["resident_models"] == ["base", "small"]
+        assert registry.stats["budget_evictions"] == 1
+
+    @patch('whisper.load_model')
+    def test_concurrent_requests_load_once(self, mock_load_model):
+        """Test that parallel jobs asking for the same model trigger a single load."""
+        def slow_load(name):
+            time.sleep(0.1)
+            return make_model(name)
+
+        mock_load_model.side_effect = slow_load
+        registry = ASRModelRegistry(idle_timeout=0, memory_budget_mb=0)
+
+        threads = [
+            threading.Thread(target=registry.transcribe, args=("audio.mp3",), kwargs={"size": "base", "language": "ru"})
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert mock_load_model.call_count == 1
+        assert registry.stats["hits"] == 3
+        assert registry._loading_locks == {}
+
+    @patch('whisper.load_model')
+    def test_load_failure_is_counted_and_raised(self, mock_load_model):
+        """Test that a failed load surfaces to the caller and is not cached."""
+        mock_load_model.side_effect = RuntimeError("no weights")
+        registry = ASRModelRegistry(idle_timeout=0, memory_budget_mb=0)
+
+        with pytest.raises(RuntimeError):
+            registry.get_model("base", "ru")
+
+        assert registry.stats["load_failures"] == 1
+        assert registry.get_stats()["resident_models"] == []
+        assert registry._loading_locks == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,173 @@
+"""
+Test suite for the content-addressed asset store.
+Tests hits without downloads, deduplication, LRU eviction and sharing a store between processes.
+"""
+import pytest
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asset_fetcher import AssetFetcher
+from asset_store import AssetStore
+from download_manager import DownloadManager
+from media_probe import MediaInfo
+
+
+def writer(data: bytes, calls: list = None):
+    """Download stand-in writing fixed bytes."""
+    def download(path):
+        if calls is not None:
+            calls.append(path)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+    return download
+
+
+def fetch_in_process(store_dir, counter_path, results):
+    """Fetch one key from a separate process, recording every download."""
+    def download(path):
+        with open(counter_path, 'a') as f:
+            f.write("download\n")
+        time.sleep(0.3)
+        with open(path, 'wb') as f:
+            f.write(b"shared clip")
+        return True
+
+    with patch('asset_store.get_media_probe', return_value=Mock(probe=Mock(return_value=None))):
+        results.put(AssetStore(store_dir=store_dir).fetch("pexels:video:1:10", download, ".mp4"))
+
+
+@pytest.fixture(autouse=True)
+def probe():
+    """Probe service answering without ffprobe."""
+    service = Mock()
+    service.probe.side_effect = lambda path: MediaInfo(path, duration=4.0, width=1920, height=1080, fps=25.0)
+    with patch('asset_store.get_media_probe', return_value=service):
+        yield service
+
+
+class TestAssetStore:
+    """Test cases for storing and finding assets."""
+
+    def test_hit_skips_download_and_keeps_metadata(self, tmp_path):
+        """Test that a stored key is served from disk with its probe metadata."""
+        store = AssetStore(store_dir=str(tmp_path), max_mb=0)
+        calls = []
+
+        first = store.fetch("pexels:video:1:10", writer(b"clip", calls), ".mp4")
+        second = store.fetch("pexels:video:1:10", writer(b"clip", calls), ".mp4")
+
+        assert first == second and len(calls) == 1
+        assert os.path.basename(first) == f"{store.lookup('pexels:video:1:10').sha256}.mp4"
+        assert store.lookup("pexels:video:1:10").media["width"] == 1920
+        assert store.get_stats()["hits"] == 1
+        # Per-key locks last only while a fetch holds them
+        assert len(store._key_locks) == 0
+
+    def test_same_content_is_stored_once(self, tmp_path):
+        """Test that two keys with identical bytes share one file."""
+        store = AssetStore(store_dir=str(tmp_path), max_mb=0)
+
+        first = store.fetch("pexels:video:1:10", writer(b"clip"), ".mp4")
+        second = store.fetch("pexels:video:2:20", writer(b"clip"), ".mp4")
+
+        assert first == second
+        assert store.size_bytes() == 4
+
+    def test_missing_file_is_downloaded_again(self, tmp_path):
+        """Test that a file deleted behind the index's back is a miss."""
+        store = AssetStore(store_dir=str(tmp_path), max_mb=0)
+        calls = []
+        os.remove(store.fetch("pexels:image:1:large", writer(b"image", calls), ".jpeg"))
+
+        assert os.path.exists(store.fetch("pexels:image:1:large", writer(b"image", calls), ".jpeg"))
+        assert len(calls) == 2
+
+    def test_lru_eviction_respects_budget_and_idle_time(self, tmp_path):
+        """Test that least recently used idle files go first and recently used ones stay."""
+        store = AssetStore(store_dir=str(tmp_path), max_mb=1, min_idle=0)
+        megabyte = b"x" * (600 * 1024)
+        old = store.fetch("a", writer(megabyte + b"a"), ".mp4")
+        recent = store.fetch("b", writer(megabyte + b"b"), ".mp4")
+
+        assert not os.path.exists(old) and os.path.exists(recent)
+        assert store.get("a") is None and store.get_stats()["evictions"] == 1
+
+        busy = AssetStore(store_dir=str(tmp_path / "busy"), max_mb=1, min_idle=3600)
+        kept = busy.fetch("a", writer(megabyte + b"a"), ".mp4")
+        busy.fetch("b", writer(megabyte + b"b"), ".mp4")
+        assert os.path.exists(kept)
+
+    def test_evict_removes_stale_download_leftovers(self, tmp_path):
+        """Test that partial, sidecar and lock files of abandoned keys go, and busy or recent ones stay."""
+        store = AssetStore(store_dir=str(tmp_path), max_mb=0, min_idle=60)
+        an_hour_ago = time.time() - 3600
+
+        def leftovers(key, age):
+            name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+            paths = [
+                tmp_path / f"{name}.partial.mp4.part",
+                tmp_path / f"{name}.partial.mp4.part.json",
+                tmp_path / "locks" / f"{name}.lock",
+            ]
+            for path in paths:
+                path.write_bytes(b"x")
+                os.utime(path, (age, age))
+            return paths
+
+        abandoned = leftovers("abandoned", an_hour_ago)
+        recent = leftovers("recent", time.time())
+        with store._key_lock("busy"):
+            busy = leftovers("busy", an_hour_ago)
+            store.evict()
+
+        assert not any(path.exists() for path in abandoned)
+        assert all(path.exists() for path in recent + busy)
+
+    def test_processes_share_one_download(self, tmp_path):
+        """Test that two processes asking for the same key download it once."""
+        context = multiprocessing.get_context('fork')
+        counter = tmp_path / "downloads.txt"
+        results = context.Queue()
+        processes = [
+            context.Process(target=fetch_in_process, args=(str(tmp_path / "store"), str(counter), results))
+            for _ in range(2)
+        ]
+        for process in processes:
+            process.start()
+        paths = [results.get(timeout=30) for _ in processes]
+        for process in processes:
+            process.join(timeout=30)
+
+        assert paths[0] == paths[1] and os.path.exists(paths[0])
+        assert counter.read_text().count("download") == 1
+
+
+class TestAssetFetcherStore:
+    """Test cases for fetching Pexels assets through the store."""
+
+    def test_repeat_query_skips_network(self, tmp_path):
+        """Test that a clip returned again by a later query is not downloaded again."""
+        downloads = DownloadManager(workers=2)
+        downloads.download = Mock(side_effect=lambda url, path: writer(url.encode())(path) and path)
+        fetcher = AssetFetcher(api_key="key", downloads=downloads, store=AssetStore(store_dir=str(tmp_path)))
+        videos = [{"id": 7, "video_files": [{"id": 70, "quality": "hd", "link": "https://vid/7.mp4"}]}]
+
+        with patch.object(fetcher, 'search_videos', return_value=videos):
+            first = fetcher.download_assets_for_query("ocean", max_images=0, max_videos=1)
+            second = fetcher.download_assets_for_query("sea", max_images=0, max_videos=1)
+
+        assert first == second and first["videos"][0].endswith(".mp4")
+        assert downloads.download.call_count == 1
+        assert fetcher.store.lookup("pexels:video:7:70") is not None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
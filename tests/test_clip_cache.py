@@ -0,0 +1,139 @@
+"""
+Test suite for the normalized clip cache.
+Tests cache keys, reuse, LRU eviction and fallback to the source clip.
+"""
+import pytest
+import os
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_progress import FFmpegResult, FFmpegRunner
+from clip_cache import MEZZANINE_PROFILE, ClipCache
+from encoding_profiles import EncodingProfile
+
+
+def fake_transcode(command, duration=None):
+    """Pretend to run ffmpeg by writing the output file."""
+    with open(command[-1], 'wb') as f:
+        f.write(b"x" * 1024)
+    return FFmpegResult(returncode=0)
+
+
+class TestClipCache:
+    """Test cases for the mezzanine clip cache."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+        self.cache = ClipCache(resolution=(1280, 720), fps=30, cache_dir=self.cache_dir, max_mb=0)
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_source(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_key_depends_on_content_and_profile(self):
+        """Test that identical footage shares an entry and profiles do not."""
+        first = self.make_source("video_1.mp4", b"same footage")
+        second = self.make_source("video_2.mp4", b"same footage")
+        other = self.make_source("video_3.mp4", b"other footage")
+        vertical = ClipCache(resolution=(720, 1280), fps=30, cache_dir=self.cache_dir)
+
+        assert self.cache.cache_path(first) == self.cache.cache_path(second)
+        assert self.cache.cache_path(first) != self.cache.cache_path(other)
+        assert self.cache.cache_path(first) != vertical.cache_path(first)
+        assert "_1280x720_30fps_yuv420p_" in os.path.basename(self.cache.cache_path(first))
+
+    def test_key_depends_on_encoder_settings(self):
+        """Test that clips encoded for another profile are not reused, since they could not be copied."""
+        source = self.make_source("video_1.mp4", b"footage")
+        fast = ClipCache(resolution=(1280, 720), fps=30, cache_dir=self.cache_dir,
+                         profile=EncodingProfile.from_config("fast"))
+        av1 = ClipCache(resolution=(1280, 720), fps=30, cache_dir=self.cache_dir,
+                        profile=EncodingProfile.from_config("av1"))
+
+        assert self.cache.cache_path(source) != fast.cache_path(source)
+        assert av1.renderer.profile.codec == MEZZANINE_PROFILE.codec
+        assert av1.renderer.profile.crf == MEZZANINE_PROFILE.crf
+
+    @patch.object(FFmpegRunner, 'run', side_effect=fake_transcode)
+    def test_transcodes_once_then_hits(self, mock_run):
+        """Test that a clip is normalized on first use only."""
+        source = self.make_source("video_1.mp4", b"footage")
+
+        first = self.cache.get(source)
+        second = self.cache.get(source)
+
+        assert first == second == self.cache.cache_path(source)
+        assert mock_run.call_count == 1
+        command = mock_run.call_args[0][0]
+        assert command[command.index('-g') + 1] == '30'
+        assert 'crop=1280:720' in command[command.index('-vf') + 1]
+        assert self.cache.stats["hits"] == 1
+        assert self.cache.stats["misses"] == 1
+
+    @patch.object(FFmpegRunner, 'run', return_value=FFmpegResult(returncode=1, stderr="boom"))
+    def test_failed_transcode_keeps_source(self, mock_run):
+        """Test that rendering falls back to the original clip."""
+        source = self.make_source("video_1.mp4", b"footage")
+
+        assert self.cache.get(source) is None
+        assert self.cache.normalize_paths([source, "missing.mp4"]) == [source, "missing.mp4"]
+        assert os.listdir(self.cache_dir) == []
+
+    @patch.object(FFmpegRunner, 'run', side_effect=fake_transcode)
+    def test_lru_eviction_by_size(self, mock_run):
+        """Test that the least recently used clips are removed first."""
+        cache = ClipCache(resolution=(1280, 720), fps=30, cache_dir=self.cache_dir, max_mb=1)
+        paths = [cache.get(self.make_source(f"v{i}.mp4", bytes([i]))) for i in range(3)]
+        for age, path in enumerate(reversed(paths)):
+            os.utime(path, (1000 - age, 1000 - age))
+        os.utime(paths[0], (2000, 2000))  # Most recently used
+
+        with patch.object(cache, 'max_mb', 0.002):  # Room for two 1 KB clips
+            assert cache.evict() == 1
+
+        assert os.path.exists(paths[0])
+        assert not os.path.exists(paths[1])
+        assert os.path.exists(paths[2])
+
+    @patch.object(FFmpegRunner, 'run', side_effect=fake_transcode)
+    def test_current_batch_is_never_evicted(self, mock_run):
+        """Test that eviction spares the clips a render is about to open, even over budget."""
+        cache = ClipCache(resolution=(1280, 720), fps=30, cache_dir=self.cache_dir, max_mb=0.001, min_idle=0)
+        sources = [self.make_source(f"v{i}.mp4", bytes([i])) for i in range(3)]
+
+        assert os.path.exists(cache.get(sources[0]))  # Alone bigger than the budget
+        paths = cache.normalize_paths(sources[1:])
+
+        assert all(os.path.exists(path) for path in paths)
+        assert paths == [cache.cache_path(source) for source in sources[1:]]
+
+        with patch.object(cache, 'min_idle', 3600):
+            assert cache.evict() == 0  # Just used
+
+    def test_partial_files_are_private_to_each_writer(self):
+        """Test that two workers normalizing the same clip write to different partial files."""
+        target = os.path.join(self.cache_dir, "clip.mp4")
+
+        first = ClipCache._partial_path(target)
+        second = ClipCache._partial_path(target)
+
+        assert first != second
+        assert first.endswith(".partial.mp4") and str(os.getpid()) in os.path.basename(first)
+        assert os.path.dirname(first) == self.cache_dir
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
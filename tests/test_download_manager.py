@@ -0,0 +1,241 @@
+"""
+Test suite for the concurrent download engine.
+Tests parallel transfers, the per-host limit, connection reuse, resumed transfers and integrity checks against a local HTTP server.
+"""
+import pytest
+import base64
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asset_fetcher import AssetFetcher
+from download_manager import DownloadJob, DownloadManager
+
+
+BODY = bytes(range(256)) * 400
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves /<n> as n bytes after a short delay, counting concurrency and connections.
+
+    /flaky drops the connection halfway through its first response, /busy answers
+    503 once, /md5 and /badmd5 announce a right and a wrong Content-MD5. All of
+    them serve BODY and honour Range requests.
+    """
+
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    connections = set()
+    requests = []
+    if_ranges = []
+
+    def do_GET(self):
+        with Handler.lock:
+            Handler.active += 1
+            Handler.peak = max(Handler.peak, Handler.active)
+            Handler.connections.add(self.client_address)
+            Handler.requests.append((self.path, self.headers.get("Range")))
+            Handler.if_ranges.append(self.headers.get("If-Range"))
+            attempt = sum(1 for path, _ in Handler.requests if path == self.path)
+        try:
+            time.sleep(0.05)
+            if self.path == "/missing" or (self.path == "/busy" and attempt == 1):
+                self.send_response(404 if self.path == "/missing" else 503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if self.path.strip("/").isdigit():
+                self.send_body(b"x" * int(self.path.strip("/")))
+                return
+            digest = hashlib.md5(BODY if self.path != "/badmd5" else b"other").digest()
+            self.send_body(BODY, truncate=self.path == "/flaky" and attempt == 1,
+                           md5=base64.b64encode(digest).decode() if "md5" in self.path else None)
+        finally:
+            with Handler.lock:
+                Handler.active -= 1
+
+    def send_body(self, body, truncate=False, md5=None):
+        start = int(self.headers["Range"].split("=")[1].rstrip("-")) if self.headers.get("Range") else 0
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.send_header("ETag", '"v1"')
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        if md5:
+            self.send_header("Content-MD5", md5)
+        self.end_headers()
+        if truncate:
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server, reset per test."""
+    Handler.active = Handler.peak = 0
+    Handler.connections = set()
+    Handler.requests = []
+    Handler.if_ranges = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestDownloadManager:
+    """Test cases for batch downloads."""
+
+    def test_batch_keeps_order_and_respects_host_limit(self, server, tmp_path):
+        """Test that a batch runs in parallel, at most per_host at a time, and returns paths in job order."""
+        manager = DownloadManager(workers=8, per_host=3, chunk_bytes=4096)
+        jobs = [DownloadJob(f"{server}/{size}", str(tmp_path / f"file_{size}")) for size in range(1000, 1012)]
+
+        paths = manager.download_many(jobs)
+
+        assert paths == [job.path for job in jobs]
+        assert [os.path.getsize(path) for path in paths] == list(range(1000, 1012))
+        assert 1 < Handler.peak <= 3
+        assert manager.stats["downloads"] == 12 and manager.stats["bytes"] == sum(range(1000, 1012))
+
+    def test_connections_are_reused(self, server, tmp_path):
+        """Test that sequential downloads share one keep-alive connection."""
+        manager = DownloadManager(workers=1, per_host=1)
+
+        for index in range(4):
+            assert manager.download(f"{server}/10", str(tmp_path / f"file_{index}"))
+
+        assert len(Handler.connections) == 1
+
+    def test_failure_leaves_no_file(self, server, tmp_path):
+        """Test that a failed transfer returns None and removes the partial file."""
+        manager = DownloadManager(workers=2, per_host=2)
+        jobs = [DownloadJob(f"{server}/missing", str(tmp_path / "gone")), DownloadJob(f"{server}/5", str(tmp_path / "ok"))]
+
+        assert manager.download_many(jobs) == [None, jobs[1].path]
+        assert not os.path.exists(jobs[0].path) and not os.path.exists(jobs[0].path + ".part")
+        assert manager.stats["failures"] == 1 and manager.stats["retries"] == 0
+
+
+class TestResumableDownloads:
+    """Test cases for retries, Range resumes and integrity checks."""
+
+    def test_dropped_connection_is_resumed_with_range(self, server, tmp_path):
+        """Test that a transfer cut off halfway continues from the partial file."""
+        manager = DownloadManager(retries=2, backoff=0, chunk_bytes=4096)
+        path = str(tmp_path / "clip.mp4")
+
+        assert manager.download(f"{server}/flaky", path) == path
+
+        with open(path, 'rb') as f:
+            assert f.read() == BODY
+        (_, first_range), (_, resume_range) = Handler.requests
+        assert first_range is None
+        assert 0 < int(resume_range[len("bytes="):-1]) <= len(BODY) // 2
+        assert manager.stats["resumed"] == 1 and not os.path.exists(path + ".part")
+        assert not os.path.exists(path + ".part.json")
+
+    def test_partial_file_is_resumed_by_another_manager(self, server, tmp_path):
+        """Test that a later process resumes a .part with the validator saved next to it."""
+        path = str(tmp_path / "clip.mp4")
+        assert DownloadManager(retries=0, chunk_bytes=4096).download(f"{server}/flaky", path) is None
+        assert os.path.exists(path + ".part") and os.path.exists(path + ".part.json")
+
+        manager = DownloadManager(retries=0, chunk_bytes=4096)
+        assert manager.download(f"{server}/flaky", path) == path
+
+        with open(path, 'rb') as f:
+            assert f.read() == BODY
+        assert Handler.requests[1][1] is not None and Handler.if_ranges[1] == '"v1"'
+        assert manager.stats["resumed"] == 1 and not os.path.exists(path + ".part.json")
+
+    def test_partial_file_without_validator_starts_over(self, server, tmp_path):
+        """Test that a .part of unknown origin is downloaded again instead of extended."""
+        path = str(tmp_path / "clip.mp4")
+        with open(path + ".part", 'wb') as f:
+            f.write(b"stale bytes")
+
+        assert DownloadManager(retries=0).download(f"{server}/md5", path) == path
+
+        with open(path, 'rb') as f:
+            assert f.read() == BODY
+        assert Handler.requests == [("/md5", None)]
+
+    def test_server_errors_are_retried(self, server, tmp_path):
+        """Test that a 503 is retried and succeeds."""
+        manager = DownloadManager(retries=2, backoff=0)
+
+        assert manager.download(f"{server}/busy", str(tmp_path / "clip.mp4"))
+        assert manager.stats["retries"] == 1
+
+    def test_checksums_are_verified(self, server, tmp_path):
+        """Test that Content-MD5 and a caller's SHA-256 are checked before the rename."""
+        manager = DownloadManager(retries=1, backoff=0)
+        good = str(tmp_path / "good.mp4")
+        bad = str(tmp_path / "bad.mp4")
+
+        assert manager.download(f"{server}/md5", good, sha256=hashlib.sha256(BODY).hexdigest()) == good
+        assert manager.download(f"{server}/badmd5", bad) is None
+        assert manager.download(f"{server}/md5", bad, sha256="0" * 64) is None
+
+        assert not os.path.exists(bad) and not os.path.exists(bad + ".part")
+        assert manager.stats["corrupt"] == 4
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test full-jitter exponential delays and Retry-After."""
+        manager = DownloadManager(backoff=1.0, backoff_max=5.0)
+
+        with patch('download_manager.random.uniform', side_effect=lambda low, high: high):
+            assert [manager._backoff(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 5.0]
+        assert manager._backoff(0, retry_after=3) == 3
+        assert 0 <= manager._backoff(2) <= 4.0
+
+
+class TestAssetFetcherDownloads:
+    """Test cases for fetching a query's assets as one batch."""
+
+    def test_query_results_keep_shape(self, server, tmp_path):
+        """Test that images and videos are fetched in one parallel batch and split back by kind."""
+        downloads = DownloadManager(workers=4, per_host=2)
+        with patch('asset_fetcher.Config.ASSET_STORE_ENABLED', False):
+            fetcher = AssetFetcher(api_key="key", downloads=downloads)
+        images = [{"id": 1, "src": {"large": f"{server}/1.jpeg"}}, {"id": 2, "src": {"large": f"{server}/2.jpeg"}}]
+        videos = [
+            {"id": 3, "video_files": [{"quality": "hd", "link": f"{server}/missing"}]},
+            {"id": 4, "video_files": [{"quality": "hd", "link": f"{server}/4.mp4"}]},
+            {"id": 5},
+        ]
+
+        with patch.object(fetcher, 'search_images', return_value=images), \
+                patch.object(fetcher, 'search_videos', return_value=videos), \
+                patch.object(fetcher, '_optimize_image') as mock_optimize, \
+                patch('asset_fetcher.Config.IMAGES_DIR', str(tmp_path)), \
+                patch('asset_fetcher.Config.CLIPS_DIR', str(tmp_path)):
+            results = fetcher.download_assets_for_query("nature", max_images=2, max_videos=3)
+
+        assert [os.path.basename(path) for path in results["images"]] == ["image_1.jpeg", "image_2.jpeg"]
+        assert [os.path.basename(path) for path in results["videos"]] == ["video_4.mp4"]
+        assert downloads.stats["downloads"] == 3 and downloads.stats["failures"] == 1
+        # One pool for the whole query, bounded by the manager's per-host limit
+        assert 1 < Handler.peak <= 2
+        assert sorted(call.args[0] for call in mock_optimize.call_args_list) == sorted(results["images"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,96 @@
+"""
+Test suite for encoding profiles.
+Tests the encoder options each profile produces for ffmpeg and MoviePy.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import Config
+from encoding_profiles import EncodingProfile
+from ffmpeg_renderer import FFmpegRenderer
+from timeline import TimelineEntry, TimelinePlan
+
+
+class TestEncodingProfile:
+    """Test cases for profile lookup and encoder options."""
+
+    def test_every_configured_profile_loads(self):
+        """Test that all profiles in Config are valid."""
+        for name in Config.ENCODING_PROFILES:
+            assert EncodingProfile.from_config(name).name == name
+
+    def test_unknown_profile_rejected(self):
+        """Test that unknown profile names raise ValueError."""
+        with pytest.raises(ValueError):
+            EncodingProfile.from_config("lossless-please")
+
+    def test_video_args_cover_preset_crf_and_gop(self):
+        """Test that GOP length is expressed in frames of the output rate."""
+        profile = EncodingProfile("test", preset="veryfast", crf=23, gop_seconds=2)
+
+        args = profile.video_args(fps=24)
+
+        assert args[args.index('-c:v') + 1] == 'libx264'
+        assert args[args.index('-preset') + 1] == 'veryfast'
+        assert args[args.index('-crf') + 1] == '23'
+        assert args[args.index('-g') + 1] == '48'
+        assert '-threads' not in args
+
+    def test_thread_override(self):
+        """Test that ENCODE_THREADS and per-call threads override the profile."""
+        with patch.object(Config, 'ENCODE_THREADS', 6):
+            profile = EncodingProfile.from_config("fast")
+
+        assert profile.threads == 6
+        args = profile.video_args(threads=2)
+        assert args[args.index('-threads') + 1] == '2'
+
+    def test_hevc_is_tagged_for_mp4(self):
+        """Test that HEVC output carries the hvc1 tag."""
+        args = EncodingProfile("hevc", codec="libx265").video_args()
+
+        assert args[args.index('-tag:v') + 1] == 'hvc1'
+
+    def test_still_tuning_only_for_x264(self):
+        """Test that -tune stillimage is not passed to encoders without it."""
+        assert EncodingProfile("x264").for_stills().tune == "stillimage"
+        assert EncodingProfile("av1", codec="libsvtav1").for_stills().tune is None
+
+    def test_moviepy_params(self):
+        """Test the write_videofile keyword arguments."""
+        profile = EncodingProfile("test", preset="slow", crf=25, threads=4, audio_bitrate="96k")
+
+        params = profile.moviepy_params(24)
+
+        assert params["codec"] == "libx264"
+        assert params["preset"] == "slow"
+        assert params["threads"] == 4
+        assert params["audio_bitrate"] == "96k"
+        assert params["ffmpeg_params"] == ['-crf', '25', '-movflags', '+faststart']
+
+
+class TestRendererProfiles:
+    """Test cases for profiles applied by the FFmpeg renderer."""
+
+    def test_build_command_uses_profile(self, tmp_path):
+        """Test that the final encode carries the profile, audio bitrate and faststart."""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        plan = TimelinePlan([TimelineEntry("video", str(clip), 0.0, 5.0)])
+        renderer = FFmpegRenderer(fps=24, resolution=(1280, 720), profile=EncodingProfile.from_config("small"))
+
+        command = renderer.build_command(plan, "out.mp4", audio_path="voice.mp3")
+
+        assert command[command.index('-preset') + 1] == 'slow'
+        assert command[command.index('-b:a') + 1] == '96k'
+        assert command[command.index('-movflags') + 1] == '+faststart'
+        assert command[command.index('-g') + 1] == '96'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
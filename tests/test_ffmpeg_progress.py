@@ -0,0 +1,96 @@
+"""
+Test suite for the ffmpeg progress runner.
+Tests progress parsing, event publishing and the stall timeout against a stand-in ffmpeg script.
+"""
+import pytest
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_progress import FFmpegRunner, ProgressEvent
+
+FAKE_FFMPEG = """#!{python}
+import sys, time
+assert sys.argv[1:4] == ['-progress', 'pipe:1', '-nostats'], sys.argv
+for frame in (24, 48):
+    print(f"frame={{frame}}\\nfps=48.0\\nout_time_us={{frame * 1000000 // 24}}\\nspeed=2.0x\\nprogress=continue", flush=True)
+    time.sleep(0.05)
+time.sleep({hang})
+print("frame=48\\nfps=48.0\\nout_time_us=2000000\\nspeed=2.0x\\nprogress=end", flush=True)
+sys.stderr.write("done\\n")
+"""
+
+
+def fake_ffmpeg(tmp_path, hang=0.0):
+    """Write an executable that prints ffmpeg -progress blocks."""
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable, hang=hang))
+    script.chmod(0o755)
+    return str(script)
+
+
+class TestProgressEvent:
+    """Test cases for parsing progress blocks."""
+
+    def test_block_becomes_event_with_eta(self):
+        """Test frame, fps, speed, position and ETA of one block."""
+        values = {"frame": "120", "fps": "60.0", "out_time_us": "5000000", "speed": "2.5x"}
+
+        event = ProgressEvent.from_progress("out.mp4", values, duration=10.0)
+
+        assert (event.frame, event.fps, event.speed, event.out_time) == (120, 60.0, 2.5, 5.0)
+        assert event.eta == pytest.approx(2.0)
+        assert event.percent == pytest.approx(50.0)
+
+    def test_unknown_values_leave_eta_open(self):
+        """Test N/A speed, the out_time fallback and a missing duration."""
+        event = ProgressEvent.from_progress("out.mp4", {"out_time": "00:01:02.500000", "speed": "N/A"})
+
+        assert event.out_time == pytest.approx(62.5)
+        assert event.speed is None and event.eta is None and event.percent is None
+
+
+class TestFFmpegRunner:
+    """Test cases for running ffmpeg with progress reports."""
+
+    def test_events_are_published(self, tmp_path):
+        """Test that every block reaches the listener and the run succeeds."""
+        events = []
+        runner = FFmpegRunner(on_progress=events.append, stall_timeout=10, log_interval=0)
+
+        result = runner.run([fake_ffmpeg(tmp_path), "out.mp4"], duration=2.0)
+
+        assert result.ok and result.stderr == "done\n"
+        assert [event.frame for event in events] == [24, 48, 48]
+        assert events[0].eta == pytest.approx(0.5)
+        assert events[-1].done and events[-1].percent == 100.0
+
+    def test_stalled_process_is_killed(self, tmp_path):
+        """Test that a process that stops advancing is killed and reported as failed."""
+        runner = FFmpegRunner(stall_timeout=0.3, log_interval=0)
+        start = time.monotonic()
+
+        with patch('ffmpeg_progress.POLL_SECONDS', 0.05):
+            result = runner.run([fake_ffmpeg(tmp_path, hang=30), "out.mp4"])
+
+        assert result.stalled and not result.ok
+        assert time.monotonic() - start < 10
+
+    def test_failing_listener_does_not_break_render(self, tmp_path):
+        """Test that listener errors are contained."""
+        def listener(event):
+            raise RuntimeError("dashboard down")
+
+        result = FFmpegRunner(on_progress=listener, stall_timeout=10, log_interval=0).run(
+            [fake_ffmpeg(tmp_path), "out.mp4"]
+        )
+
+        assert result.ok
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,239 @@
+"""
+Test suite for the single-pass FFmpeg render backend.
+Tests filter graph construction without running ffmpeg.
+"""
+import pytest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_renderer import FFmpegRenderer, OutputTarget, escape_filter_value
+from video_assembler import VideoAssembler
+
+
+class TestFFmpegRenderer:
+    """Test cases for filter graph construction."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.renderer = FFmpegRenderer(fps=24, resolution=(1920, 1080))
+
+        self.image_path = os.path.join(self.temp_dir, "image.jpg")
+        self.video_path = os.path.join(self.temp_dir, "clip.mp4")
+        for path in (self.image_path, self.video_path):
+            with open(path, 'w') as f:
+                f.write("fake media")
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_escape_filter_value(self):
+        """Test escaping of paths for both ffmpeg parsing levels."""
+        assert escape_filter_value("/tmp/plain.srt") == "/tmp/plain.srt"
+        assert escape_filter_value("C:/subs.srt") == "C\\\\:/subs.srt"
+        assert escape_filter_value("a,b") == "a\\,b"
+
+    def test_plan_segments_order_and_missing_files(self):
+        """Test that images come first and missing files are skipped."""
+        with patch.object(self.renderer, 'get_duration', return_value=7.5):
+            segments = self.renderer.plan_segments(
+                image_paths=[self.image_path, "/missing.jpg"],
+                video_paths=[self.video_path, "/missing.mp4"],
+                image_duration=3.0
+            )
+
+        assert segments == [
+            ("image", self.image_path, 3.0),
+            ("video", self.video_path, 7.5)
+        ]
+
+    def test_plan_segments_skips_unprobeable_video(self):
+        """Test that videos without a readable duration are dropped."""
+        with patch.object(self.renderer, 'get_duration', return_value=None):
+            segments = self.renderer.plan_segments(video_paths=[self.video_path])
+
+        assert segments == []
+
+    def test_build_command_single_graph(self):
+        """Test that scaling, concat, trim and subtitles share one graph."""
+        segments = [("image", self.image_path, 3.0), ("video", self.video_path, 7.5)]
+        srt_path = os.path.join(self.temp_dir, "subs.srt")
+
+        command = self.renderer.build_command(
+            self.renderer.plan_timeline(segments, 9.0), "out.mp4",
+            audio_path="narration.mp3", srt_path=srt_path
+        )
+
+        assert command.count('-filter_complex') == 1
+        assert command.count('-c:v') == 1
+        graph = command[command.index('-filter_complex') + 1]
+        assert "concat=n=2:v=1:a=0" in graph
+        assert "trim=duration=9.000" in graph
+        assert "subtitles=filename=" in graph
+        assert "scale=1920:1080" in graph
+
+        # Narration is the input after the segments
+        assert command[command.index('-map', command.index('[vout]')) + 1] == "2:a"
+        assert command[-1] == "out.mp4"
+
+    def test_build_command_image_loop_input(self):
+        """Test that still images are looped for their segment duration."""
+        plan = self.renderer.plan_timeline([("image", self.image_path, 4.0)])
+        command = self.renderer.build_command(plan, "out.mp4")
+
+        first_input = command.index('-i')
+        assert command[first_input - 6:first_input] == ['-loop', '1', '-framerate', '24', '-t', '4.000']
+        assert '-map' in command and '[vout]' in command
+
+    def test_build_color_command_still_background(self):
+        """Test that audio-only backgrounds come from lavfi with subtitles in the same pass."""
+        command = self.renderer.build_color_command(
+            "out.mp4", duration=180.0, audio_path="voice.mp3", srt_path="subs.srt"
+        )
+
+        assert command[command.index('-f') + 1] == 'lavfi'
+        # One frame short of 180 s: tpad clones the last kept frame into the final slot
+        assert command[command.index('-i') + 1].startswith("color=c=0x141414:s=1920x1080:r=24:d=179.937500")
+        video_filter = command[command.index('-vf') + 1]
+        assert "subtitles=filename=" in video_filter
+        assert video_filter.endswith("mpdecimate=max=24:hi=1:lo=1:frac=0,tpad=stop_mode=clone:stop=1")
+        assert command[command.index('-tune') + 1] == 'stillimage'
+        assert command[command.index('-fps_mode') + 1] == 'vfr'
+        assert command[command.index('-bf') + 1] == '0'
+        assert '-r' not in command
+        assert command[command.index('-t') + 1] == '180.000'
+
+    def test_build_color_command_unknown_duration_follows_audio(self):
+        """Test that the render stops with the narration when its length is unknown."""
+        command = self.renderer.build_color_command("out.mp4", audio_path="voice.mp3")
+
+        assert '-shortest' in command
+        assert ':d=' not in command[command.index('-i') + 1]
+
+    @pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="needs ffmpeg and ffprobe")
+    def test_decimated_background_lasts_as_long_as_narration(self):
+        """Test that the video track of a decimated render ends with the audio, not at the last cue change."""
+        audio_path = os.path.join(self.temp_dir, "voice.m4a")
+        subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=f=440:d=7.5', '-c:a', 'aac', audio_path],
+            check=True
+        )
+        srt_path = os.path.join(self.temp_dir, "subs.srt")
+        with open(srt_path, 'w', encoding='utf-8') as f:
+            f.write("1\n00:00:00,500 --> 00:00:02,000\nHello there.\n\n")
+        output_path = os.path.join(self.temp_dir, "background.mp4")
+        renderer = FFmpegRenderer(fps=24, resolution=(320, 180))
+
+        assert renderer.render_color(output_path, duration=7.5, audio_path=audio_path, srt_path=srt_path)
+
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=duration,nb_frames',
+             '-of', 'json', output_path],
+            capture_output=True, text=True, check=True
+        )
+        stream = json.loads(result.stdout)["streams"][0]
+        assert abs(float(stream["duration"]) - 7.5) < 1 / 24
+        assert int(stream["nb_frames"]) < 7.5 * 24 / 2  # Still decimated
+
+    def test_build_targets_command_splits_one_decode(self):
+        """Test that each input is opened once and split into one branch per target."""
+        plan = self.renderer.plan_timeline([("video", self.video_path, 7.5)])
+        outputs = [
+            (OutputTarget("youtube_video", (1920, 1080), crf=21), "wide.mp4"),
+            (OutputTarget("tiktok", (1080, 1920), crf=23), "tall.mp4")
+        ]
+
+        command = self.renderer.build_targets_command(plan, outputs, audio_path="narration.mp3", srt_path="subs.srt")
+
+        assert command.count('-i') == 2
+        graph = command[command.index('-filter_complex') + 1]
+        assert "[0:v]split=2[s0_0][s0_1]" in graph
+        assert "scale=1920:1080" in graph and "scale=1080:1920" in graph
+        assert graph.count("subtitles=filename=") == 2
+        assert command[command.index('[vout0]') + 2] == "1:a"
+        assert command[command.index('-crf') + 1] == '21'
+        assert command[-1] == "tall.mp4"
+
+    def test_render_targets_shares_identical_encodes(self):
+        """Test that targets with the same geometry and quality are encoded once and copied."""
+        plan = self.renderer.plan_timeline([("video", self.video_path, 7.5)])
+        outputs = {
+            name: os.path.join(self.temp_dir, f"{name}.mp4")
+            for name in ("youtube_video", "tiktok", "instagram_reel")
+        }
+
+        def fake_run(command, duration=None):
+            for path in outputs.values():
+                if path in command:
+                    with open(path, 'w') as f:
+                        f.write("encoded")
+            return True
+
+        with patch.object(FFmpegRenderer, '_run', side_effect=fake_run) as mock_run:
+            result = self.renderer.render_targets(plan, outputs)
+
+        assert result == outputs
+        command = mock_run.call_args[0][0]
+        assert outputs["instagram_reel"] not in command
+        assert "split=2" in command[command.index('-filter_complex') + 1]
+        assert os.path.exists(outputs["instagram_reel"])
+
+    def test_unknown_target_rejected(self):
+        """Test that unknown target names raise ValueError."""
+        with pytest.raises(ValueError):
+            OutputTarget.from_config("vhs")
+
+
+class TestRenderBackendSelection:
+    """Test per-job render backend selection."""
+
+    def test_ffmpeg_backend_dispatch(self):
+        """Test that the ffmpeg backend bypasses MoviePy."""
+        assembler = VideoAssembler(render_backend="moviepy")
+
+        with patch.object(assembler, '_create_video_with_ffmpeg', return_value="out.mp4") as mock_render:
+            result = assembler.create_video_from_assets(
+                video_paths=["clip.mp4"],
+                output_path="out.mp4",
+                render_backend="ffmpeg"
+            )
+
+        assert result == "out.mp4"
+        mock_render.assert_called_once()
+
+    def test_unknown_backend_falls_back_to_moviepy(self):
+        """Test that an unknown backend does not reach the ffmpeg path."""
+        assembler = VideoAssembler()
+
+        with patch.object(assembler, '_create_video_with_ffmpeg') as mock_render:
+            result = assembler.create_video_from_assets(video_paths=[], render_backend="unknown")
+
+        assert result is None
+        mock_render.assert_not_called()
+
+    @patch.object(FFmpegRenderer, 'render_color', return_value="out.mp4")
+    def test_audio_only_video_rendered_by_ffmpeg(self, mock_render):
+        """Test that audio-only videos skip MoviePy and use the probed narration length."""
+        assembler = VideoAssembler()
+
+        with patch('video_assembler.get_media_probe') as mock_probe:
+            mock_probe.return_value.duration.return_value = 12.5
+            result = assembler.create_audio_only_video("voice.mp3", "out.mp4")
+
+        assert result == "out.mp4"
+        mock_render.assert_called_once_with(
+            "out.mp4", duration=12.5, audio_path="voice.mp3", srt_path=None, subtitle_mode="burned", language=None
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,95 @@
+"""
+Test suite for the shared file cache.
+Tests atomic entry creation and the cache types built on it.
+"""
+import pytest
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clip_cache import ClipCache
+from file_cache import FileCache
+from segment_store import SegmentStore
+from still_segments import StillSegmentCache
+
+
+def write_entry(path):
+    with open(path, 'wb') as f:
+        f.write(b"segment")
+    return True
+
+
+class TestFileCache:
+    """Test cases for producing and evicting cache entries."""
+
+    def test_entry_is_renamed_into_place(self, tmp_path):
+        """Test that a produced entry appears under its name and no partial file is left."""
+        cache = FileCache(cache_dir=str(tmp_path), max_mb=0)
+        target = str(tmp_path / "entry.mp4")
+
+        assert cache._get_or_create(target, write_entry) == target
+        assert os.listdir(tmp_path) == ["entry.mp4"]
+        assert cache.stats["misses"] == 1
+
+    def test_failed_write_leaves_nothing(self, tmp_path):
+        """Test that a failed or crashing writer never leaves a partial file."""
+        cache = FileCache(cache_dir=str(tmp_path), max_mb=0)
+        target = str(tmp_path / "entry.mp4")
+
+        def fails(path):
+            write_entry(path)
+            return False
+
+        def crashes(path):
+            write_entry(path)
+            raise RuntimeError("encoder crashed")
+
+        assert cache._get_or_create(target, fails) is None
+        with pytest.raises(RuntimeError):
+            cache._get_or_create(target, crashes)
+        assert os.listdir(tmp_path) == []
+        assert cache.stats["failures"] == 1
+
+    def test_entry_locks_are_dropped_after_use(self, tmp_path):
+        """Test that per-entry locks do not accumulate over hits, misses and crashes."""
+        cache = FileCache(cache_dir=str(tmp_path), max_mb=0)
+
+        def crashes(path):
+            raise RuntimeError("encoder crashed")
+
+        for index in range(5):
+            target = str(tmp_path / f"entry{index}.mp4")
+            cache._get_or_create(target, write_entry)
+            cache._get_or_create(target, write_entry)
+        with pytest.raises(RuntimeError):
+            cache._get_or_create(str(tmp_path / "broken.mp4"), crashes)
+
+        assert len(cache._key_locks) == 0
+
+    def test_evict_removes_stale_partials(self, tmp_path):
+        """Test that partial files of killed writers are swept once idle, and live ones stay."""
+        cache = FileCache(cache_dir=str(tmp_path), max_mb=0, min_idle=60)
+        stale = tmp_path / "entry.123-deadbeef.partial.mp4"
+        live = tmp_path / "entry.456-cafebabe.partial.mp4"
+        stale.write_bytes(b"half")
+        live.write_bytes(b"half")
+        an_hour_ago = time.time() - 3600
+        os.utime(stale, (an_hour_ago, an_hour_ago))
+
+        cache.evict()
+
+        assert sorted(os.listdir(tmp_path)) == [live.name]
+
+    def test_caches_share_the_base(self):
+        """Test that every media cache gets its directory, LRU and atomic writes from FileCache."""
+        for cache_type in (ClipCache, SegmentStore, StillSegmentCache):
+            assert issubclass(cache_type, FileCache)
+        assert not issubclass(SegmentStore, ClipCache)
+        assert not issubclass(StillSegmentCache, ClipCache)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
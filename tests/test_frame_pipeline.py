@@ -0,0 +1,144 @@
+"""
+Test suite for the streaming frame pipeline.
+Tests frame accounting, the bounded buffer ring and the reader limit without running ffmpeg.
+"""
+import pytest
+import os
+import shutil
+import sys
+import time
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_progress import FFmpegResult, FFmpegRunner
+from ffmpeg_renderer import FFmpegRenderer
+from frame_pipeline import FramePipeline, FrameReader, frame_counts
+from timeline import TimelineEntry, TimelinePlan
+
+
+class FakeReader:
+    """Decoder stand-in that counts how many are open at once."""
+
+    open_now = 0
+    peak = 0
+    fail_after = None
+
+    def __init__(self, command, frame_count):
+        self.frame_count = frame_count
+        self.frames_read = 0
+        self.process = Mock()
+        FakeReader.open_now += 1
+        FakeReader.peak = max(FakeReader.peak, FakeReader.open_now)
+
+    def read_into(self, buffer):
+        if FakeReader.fail_after is not None and self.frames_read >= FakeReader.fail_after:
+            return False
+        self.frames_read += 1
+        buffer.fill(self.frames_read % 256)
+        return True
+
+    def close(self):
+        FakeReader.open_now -= 1
+        return "corrupt input"
+
+
+class Sink:
+    """Encoder stdin stand-in that records which buffers it was handed."""
+
+    def __init__(self):
+        self.frames = 0
+        self.buffers = set()
+
+    def write(self, view):
+        self.frames += 1
+        self.buffers.add(id(view.obj))
+
+
+class TestFramePipeline:
+    """Test cases for the streaming render."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        FakeReader.open_now = FakeReader.peak = 0
+        FakeReader.fail_after = None
+        self.renderer = FFmpegRenderer(fps=24, resolution=(64, 36))
+        self.pipeline = FramePipeline(self.renderer, ring_size=3, max_readers=2)
+        self.plan = TimelinePlan([
+            TimelineEntry("video", f"clip_{index}.mp4", 0.0, 1.3) for index in range(6)
+        ] + [TimelineEntry("image", "slide.png", 0.0, 0.75)])
+
+    def render(self, sink):
+        def fake_run(command, duration=None, feed=None, on_exit=None):
+            feed(sink)
+            on_exit()
+            return FFmpegResult(returncode=0)
+
+        with patch('frame_pipeline.FrameReader', FakeReader), \
+                patch.object(self.renderer.runner, 'run', side_effect=fake_run):
+            return self.pipeline.render(self.plan, "out.mp4", audio_path="voice.mp3")
+
+    def test_frame_counts_cover_duration_exactly(self):
+        """Test that per-entry frame counts add up to the timeline length."""
+        counts = frame_counts(self.plan, 24)
+
+        assert sum(counts) == round(self.plan.duration * 24)
+        assert counts[:2] == [31, 31]
+
+    def test_memory_is_bounded_by_ring_and_readers(self):
+        """Test that every frame is delivered through the same few buffers with at most two decoders open."""
+        sink = Sink()
+
+        assert self.render(sink) == "out.mp4"
+
+        assert sink.frames == round(self.plan.duration * 24)
+        assert len(sink.buffers) <= 3
+        assert FakeReader.peak == 2
+        assert FakeReader.open_now == 0
+
+    def test_short_decode_fails_render(self):
+        """Test that a decoder ending early fails the render and closes every reader."""
+        FakeReader.fail_after = 10
+
+        assert self.render(Sink()) is None
+        assert FakeReader.open_now == 0
+
+    @pytest.mark.skipif(not shutil.which('ffmpeg'), reason="needs ffmpeg")
+    def test_silent_decoder_is_reported_as_stall(self, tmp_path):
+        """Test that a decoder that never writes stalls the render promptly and is killed."""
+        opened = []
+
+        def silent_reader(command, frame_count):
+            reader = FrameReader([sys.executable, '-c', 'import time; time.sleep(60)'], frame_count)
+            opened.append(reader)
+            return reader
+
+        self.renderer.runner = FFmpegRunner(stall_timeout=1, log_interval=0)
+        start = time.monotonic()
+        with patch('frame_pipeline.FrameReader', side_effect=silent_reader), \
+                patch('frame_pipeline.logger') as mock_logger:
+            result = self.pipeline.render(self.plan, str(tmp_path / "out.mp4"))
+
+        assert result is None
+        assert time.monotonic() - start < 10
+        assert "stalled" in mock_logger.error.call_args[0][0]
+        assert opened and all(reader.process.poll() is not None for reader in opened)
+
+    def test_commands_use_raw_frames(self):
+        """Test the decoder and encoder sides of the pipe."""
+        reader = self.pipeline.build_reader_command(self.plan.entries[0], 31)
+        encoder = self.pipeline.build_encoder_command(
+            "out.mp4", 7.5, audio_path="voice.mp3", srt_path="subs.srt", subtitle_mode="soft"
+        )
+
+        assert reader[-5:] == ['-f', 'rawvideo', '-pix_fmt', 'yuv420p', 'pipe:1']
+        assert reader[reader.index('-frames:v') + 1] == '31'
+        assert encoder[encoder.index('-s') + 1] == '64x36'
+        assert encoder[encoder.index('-i') + 1] == 'pipe:0'
+        assert '-vf' not in encoder and '2:s' in encoder
+        assert self.pipeline.frame_bytes == 64 * 36 * 3 // 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,56 @@
+"""
+Test suite for per-key locks.
+Tests that one key is serialized and that idle keys are dropped.
+"""
+import pytest
+import os
+import sys
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from keyed_locks import KeyedLocks
+
+
+class TestKeyedLocks:
+    """Test cases for holding and dropping per-key locks."""
+
+    def test_same_key_is_serialized(self):
+        """Test that two threads never hold the same key at once, and the lock is dropped afterwards."""
+        locks = KeyedLocks()
+        inside = []
+        overlaps = []
+
+        def work():
+            with locks.hold("clip"):
+                inside.append(1)
+                if len(inside) > 1:
+                    overlaps.append(1)
+                time.sleep(0.01)
+                inside.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == []
+        assert len(locks) == 0
+
+    def test_lock_is_dropped_when_the_block_raises(self):
+        """Test that an exception inside the block still releases and drops the key."""
+        locks = KeyedLocks()
+        with pytest.raises(RuntimeError):
+            with locks.hold("clip"):
+                raise RuntimeError("encoder crashed")
+
+        with locks.hold("clip"):
+            assert len(locks) == 1
+        assert len(locks) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
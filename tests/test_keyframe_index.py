@@ -0,0 +1,154 @@
+"""
+Test suite for the keyframe index and stream-copied clip ranges.
+Tests keyframe parsing, the cache, cut snapping and copy jobs without running ffmpeg.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_renderer import FFmpegRenderer
+from keyframe_index import ClipKeyframes, KeyframeIndex
+from media_probe import MediaInfo
+from segment_encoder import SegmentEncoder
+from timeline import TimelineEntry, TimelinePlan
+
+PACKETS = "0.040000,K__\n0.080000,___\n1.040000,K__\nN/A,___\n2.040000,K_\n"
+
+
+def probe_service(infos):
+    """Probe service answering from a dict of MediaInfo by path."""
+    probe = Mock()
+    probe.probe_many.side_effect = lambda paths: {path: infos[path] for path in paths if path in infos}
+    return probe
+
+
+class TestKeyframeIndex:
+    """Test cases for indexing clips."""
+
+    def make_file(self, tmp_path, name):
+        path = tmp_path / name
+        path.write_bytes(b"video")
+        return str(path)
+
+    def test_keyframes_read_from_packet_flags(self):
+        """Test that keyframes are parsed relative to the first one."""
+        with patch('keyframe_index.subprocess.run', return_value=Mock(returncode=0, stdout=PACKETS, stderr="")):
+            assert KeyframeIndex._run_keyframes("clip.mp4") == [0.0, 1.0, 2.0]
+
+    def test_index_is_cached_per_threshold(self, tmp_path):
+        """Test that a clip is scanned once, and again only when the scene threshold changes."""
+        path = self.make_file(tmp_path, "clip.mp4")
+        cache = str(tmp_path / "probe.sqlite")
+        scanned = ClipKeyframes(path, [0.0, 1.0], [0.96])
+
+        with patch.object(KeyframeIndex, '_scan', return_value=scanned) as mock_scan:
+            first = KeyframeIndex(cache_path=cache, scene_threshold=0.3).index(path)
+            second = KeyframeIndex(cache_path=cache, scene_threshold=0.3).index(path)
+            KeyframeIndex(cache_path=cache, scene_threshold=0.5).index(path)
+
+        assert first == second == scanned
+        assert mock_scan.call_count == 2
+
+    def test_snap_prefers_scene_changes(self):
+        """Test that a keyframe starting a new shot wins over a closer one."""
+        clip = ClipKeyframes("clip.mp4", [0.0, 1.0, 2.0, 3.0], scenes=[3.02])
+
+        assert clip.snap(2.2, tolerance=0.5) == 2.0
+        assert clip.snap(2.6, tolerance=0.5) == 3.0
+        assert clip.snap(2.6, tolerance=0.1) == 2.6
+        assert clip.snap(2.2, tolerance=1.0) == 3.0
+
+    def test_plan_cuts_move_to_keyframes(self):
+        """Test that snapped cuts land on keyframes and keep the plan's duration."""
+        index = KeyframeIndex(cache_path=":memory:", scene_threshold=0)
+        plan = TimelinePlan([
+            TimelineEntry("video", "a.mp4", 0.0, 4.3),
+            TimelineEntry("video", "b.mp4", 0.2, 3.4),
+        ])
+        clips = {"a.mp4": ClipKeyframes("a.mp4", [0.0, 2.0, 4.0]), "b.mp4": ClipKeyframes("b.mp4", [0.0, 2.0, 4.0])}
+        infos = {name: MediaInfo(name, duration=10.0) for name in clips}
+
+        with patch.object(index, 'index_many', return_value=clips), \
+                patch('keyframe_index.get_media_probe', return_value=probe_service(infos)):
+            snapped = index.snap(plan, tolerance=0.5)
+
+        assert snapped.entries[0].out_point == 4.0
+        assert snapped.entries[1].in_point == 0.0
+        assert snapped.duration == pytest.approx(plan.duration)
+
+
+class TestStreamCopiedSegments:
+    """Test cases for copying keyframe-aligned ranges in the segmented backend."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        self.index = Mock()
+        self.encoder = SegmentEncoder(self.renderer, keyframes=self.index)
+        self.plan = TimelinePlan([
+            TimelineEntry("video", "mezzanine.mp4", 2.0, 14.0),
+            TimelineEntry("video", "download.mp4", 0.0, 3.0),
+        ])
+        self.index.index_many.return_value = {
+            path: ClipKeyframes(path, [0.0, 2.0, 14.0]) for path in ("mezzanine.mp4", "download.mp4")
+        }
+        stream = {"video_codec": "h264", "video_profile": "High", "video_level": 31,
+                  "video_extradata": "SHA256:output", "pix_fmt": "yuv420p"}
+        self.infos = {
+            "mezzanine.mp4": MediaInfo("mezzanine.mp4", duration=20.0, width=1280, height=720, fps=24.0, **stream),
+            "download.mp4": MediaInfo("download.mp4", duration=3.0, width=1920, height=1080, fps=30.0, **stream),
+        }
+        self.encoder._reference = MediaInfo("reference.mp4", width=1280, height=720, fps=24.0, **stream)
+        self.encoder._reference_done = True
+
+    def test_only_matching_aligned_ranges_are_copied(self):
+        """Test that a long copyable range stays one job and other clips are encoded."""
+        with patch('segment_encoder.get_media_probe', return_value=probe_service(self.infos)):
+            copyable = self.encoder.copyable_entries(self.plan)
+        jobs = self.encoder.plan_jobs(self.plan, max_seconds=5, copyable=copyable)
+
+        assert copyable == {self.plan.entries[0]}
+        assert jobs[0].copy and jobs[0].frame_count == 288
+        assert not any(job.copy for job in jobs[1:])
+
+    def test_other_encoder_settings_are_encoded(self):
+        """Test that a source with other parameter sets than the output is never copied."""
+        self.infos["mezzanine.mp4"].video_extradata = "SHA256:crf18"
+        with patch('segment_encoder.get_media_probe', return_value=probe_service(self.infos)):
+            assert self.encoder.copyable_entries(self.plan) == set()
+
+        self.infos["mezzanine.mp4"].video_extradata = "SHA256:output"
+        self.encoder._reference = None
+        with patch('segment_encoder.get_media_probe', return_value=probe_service(self.infos)):
+            assert self.encoder.copyable_entries(self.plan) == set()
+
+    def test_copy_command_does_not_encode(self):
+        """Test the stream copy of a range."""
+        with patch('segment_encoder.get_media_probe', return_value=probe_service(self.infos)):
+            job = self.encoder.plan_jobs(self.plan, copyable=self.encoder.copyable_entries(self.plan))[0]
+
+        command = self.encoder.build_copy_command(job, "seg.mp4")
+
+        assert command[command.index('-ss') + 1] == '2.000000'
+        assert command[command.index('-c:v') + 1] == 'copy'
+        assert command[command.index('-frames:v') + 1] == '288'
+        assert '-vf' not in command
+
+    @patch.object(SegmentEncoder, '_run', return_value=True)
+    def test_burned_subtitles_force_an_encode(self, mock_run):
+        """Test that a copyable range with a burned cue on it is encoded."""
+        job = self.encoder.plan_jobs(self.plan, copyable={self.plan.entries[0]})[0]
+
+        self.encoder._encode_job(job, "seg.mp4", srt_path="subs.srt", cues=[(1.0, 2.0, "Hello")])
+        assert '-vf' in mock_run.call_args[0][0]
+
+        self.encoder._encode_job(job, "seg.mp4", srt_path="subs.srt", cues=[(13.0, 14.0, "Later")])
+        assert mock_run.call_args[0][0][mock_run.call_args[0][0].index('-c:v') + 1] == 'copy'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+Test suite for localized versions of rendered videos.
+Tests narration swaps by stream copy and the fallback to cutting the plan again.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_renderer import FFmpegRenderer
+from localizer import Localizer, localized_path
+from render_manifest import RenderManifest
+from subtitle_tracks import track_language
+from timeline import TimelineEntry, TimelinePlan
+from video_assembler import VideoAssembler
+
+
+class TestLocalizer:
+    """Test cases for the narration swap commands."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.localizer = Localizer(renderer=FFmpegRenderer(fps=24, resolution=(1280, 720)), max_stretch=0.08)
+
+    def test_paths_and_track_language(self):
+        """Test the localized file name and the MP4 language tag."""
+        assert localized_path("output/demo.mp4", "es-ES") == "output/demo_es-ES.mp4"
+        assert track_language("es-ES") == "spa"
+        assert track_language("xx-XX") == "und"
+
+    def test_stretch_only_when_lengths_are_close(self):
+        """Test that the picture changes speed by at most max_stretch."""
+        assert self.localizer.stretch(60.0, 63.0) == pytest.approx(1.05)
+        assert self.localizer.stretch(60.0, 57.0) == pytest.approx(0.95)
+        assert self.localizer.stretch(60.0, 70.0) is None
+        assert self.localizer.stretch(None, 60.0) is None
+
+    def test_remux_copies_picture(self):
+        """Test that the picture is retimed and copied, and subtitles become a soft track."""
+        command = self.localizer.build_remux_command(
+            "demo.mp4", "voice_es.mp3", "demo_es-ES.mp4", scale=1.05, srt_path="demo_es-ES.srt", language="es-ES"
+        )
+
+        assert command[command.index('-itsscale') + 1] == '1.050000'
+        assert command.index('-itsscale') < command.index('demo.mp4')
+        assert command[command.index('-c:v') + 1] == 'copy'
+        assert command[command.index('-c:s') + 1] == 'mov_text'
+        assert 'language=spa' in command
+        assert '-vf' not in command and '-crf' not in command
+
+    def test_overlay_burns_onto_rendered_picture(self):
+        """Test that burned subtitles take one pass over the rendered picture only."""
+        command = self.localizer.build_overlay_command(
+            "demo.mp4", "voice_es.mp3", "demo_es-ES.mp4", "demo_es-ES.srt", duration=63.0, scale=1.05
+        )
+
+        assert command.count('-i') == 2
+        video_filter = command[command.index('-vf') + 1]
+        assert video_filter.startswith("setpts=PTS*1.050000,subtitles=")
+        assert command[command.index('-c:v') + 1] == 'libx264'
+        assert command[command.index('-t') + 1] == '63.000'
+
+
+class TestLocalizeVideo:
+    """Test cases for choosing between the picture copy and a new cut."""
+
+    def make_manifest(self, tmp_path, srt_path=None):
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        picture = tmp_path / "demo.mp4"
+        picture.write_bytes(b"rendered")
+        plan = TimelinePlan([TimelineEntry("video", str(clip), 0.0, 60.0)])
+        return RenderManifest(plan, str(picture), srt_path=srt_path).save()
+
+    def probe_durations(self, narration_duration):
+        probe = Mock()
+        probe.duration.side_effect = lambda path: narration_duration if path.endswith(".mp3") else 60.0
+        return probe
+
+    def test_close_narration_reuses_picture(self, tmp_path):
+        """Test that a narration of similar length is remuxed onto the rendered picture."""
+        manifest_file = self.make_manifest(tmp_path)
+        audio = tmp_path / "voice_es.mp3"
+        audio.write_bytes(b"audio")
+        assembler = VideoAssembler(fps=24, resolution=(1280, 720))
+
+        with patch('video_assembler.get_media_probe', return_value=self.probe_durations(62.0)), \
+                patch.object(assembler.localizer, 'remux', return_value="demo_es-ES.mp4") as mock_remux, \
+                patch.object(assembler, '_render_plan') as mock_render:
+            result = assembler.localize_video(manifest_file, str(audio), "es-ES")
+
+        assert result == "demo_es-ES.mp4"
+        mock_render.assert_not_called()
+        assert mock_remux.call_args[1]["scale"] == pytest.approx(62.0 / 60.0)
+        assert mock_remux.call_args[0][2] == str(tmp_path / "demo_es-ES.mp4")
+
+    def test_burned_original_is_cut_again(self, tmp_path):
+        """Test that a picture with burned subtitles is re-rendered from the plan at the new length."""
+        srt = tmp_path / "demo.srt"
+        srt.write_text("")
+        manifest_file = self.make_manifest(tmp_path, srt_path=str(srt))
+        audio = tmp_path / "voice_es.mp3"
+        audio.write_bytes(b"audio")
+        assembler = VideoAssembler(fps=24, resolution=(1280, 720))
+
+        with patch('video_assembler.get_media_probe', return_value=self.probe_durations(61.0)), \
+                patch.object(assembler.localizer, 'remux') as mock_remux, \
+                patch.object(assembler, '_render_plan', return_value="demo_es-ES.mp4") as mock_render:
+            result = assembler.localize_video(manifest_file, str(audio), "es-ES")
+
+        assert result == "demo_es-ES.mp4"
+        mock_remux.assert_not_called()
+        plan = mock_render.call_args[0][0]
+        assert plan.duration == pytest.approx(61.0)
+        assert mock_render.call_args[1]["audio_path"] == str(audio)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
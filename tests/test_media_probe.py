@@ -0,0 +1,136 @@
+"""
+Test suite for the ffprobe media probe service.
+Tests JSON parsing, the persistent cache and batch probing.
+"""
+import pytest
+import os
+import sys
+import json
+import subprocess
+import time
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from media_probe import MediaProbe, MediaInfo, parse_rate
+
+FFPROBE_OUTPUT = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080,
+         "avg_frame_rate": "30000/1001", "r_frame_rate": "30000/1001",
+         "profile": "High", "level": 40, "extradata_hash": "SHA256:abc"},
+        {"codec_type": "audio", "codec_name": "aac", "channels": 2, "sample_rate": "48000"}
+    ],
+    "format": {"duration": "12.500000"}
+}
+
+
+def ffprobe_result(command, **kwargs):
+    """Pretend to run ffprobe."""
+    return Mock(returncode=0, stdout=json.dumps(FFPROBE_OUTPUT), stderr="")
+
+
+class TestMediaProbe:
+    """Test cases for probing and caching media metadata."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.probe = MediaProbe(cache_path=":memory:", workers=4)
+
+    def make_file(self, tmp_path, name, content=b"media"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    def test_parses_ffprobe_json(self):
+        """Test that header fields are read from streams and format."""
+        info = MediaInfo.from_ffprobe("clip.mp4", FFPROBE_OUTPUT)
+
+        assert info.duration == 12.5
+        assert info.size == (1920, 1080)
+        assert info.fps == pytest.approx(29.97, abs=0.01)
+        assert info.has_video and info.has_audio
+        assert (info.video_profile, info.video_level, info.video_extradata) == ("High", 40, "SHA256:abc")
+        assert info.audio_channels == 2
+        assert info.sample_rate == 48000
+
+    def test_parse_rate_rejects_garbage(self):
+        """Test frame rate parsing edge cases."""
+        assert parse_rate("25/1") == 25.0
+        assert parse_rate("0/0") is None
+        assert parse_rate(None) is None
+
+    @patch('media_probe.subprocess.run', side_effect=ffprobe_result)
+    def test_cache_hit_skips_ffprobe(self, mock_run, tmp_path):
+        """Test that an unchanged file is probed once."""
+        path = self.make_file(tmp_path, "clip.mp4")
+
+        assert self.probe.duration(path) == 12.5
+        assert self.probe.duration(path) == 12.5
+
+        assert mock_run.call_count == 1
+        assert mock_run.call_args[0][0][:4] == ['ffprobe', '-v', 'error', '-print_format']
+        assert self.probe.get_stats() == {"hits": 1, "misses": 1, "failures": 0}
+
+    @patch('media_probe.subprocess.run', side_effect=ffprobe_result)
+    def test_changed_file_is_probed_again(self, mock_run, tmp_path):
+        """Test that a new size or mtime invalidates the cache entry."""
+        path = self.make_file(tmp_path, "clip.mp4")
+        self.probe.probe(path)
+
+        with open(path, 'ab') as f:
+            f.write(b"more")
+        self.probe.probe(path)
+
+        assert mock_run.call_count == 2
+
+    @patch('media_probe.subprocess.run', side_effect=ffprobe_result)
+    def test_cache_persists_across_instances(self, mock_run, tmp_path):
+        """Test that the SQLite store survives a restart."""
+        path = self.make_file(tmp_path, "clip.mp4")
+        cache_path = str(tmp_path / "probe.sqlite")
+
+        MediaProbe(cache_path=cache_path).probe(path)
+        info = MediaProbe(cache_path=cache_path).probe(path)
+
+        assert info.duration == 12.5
+        assert mock_run.call_count == 1
+
+    def test_batch_runs_in_parallel(self, tmp_path):
+        """Test that a batch of misses is probed concurrently."""
+        paths = [self.make_file(tmp_path, f"clip_{i}.mp4") for i in range(4)]
+
+        def slow_ffprobe(command, **kwargs):
+            time.sleep(0.2)
+            return ffprobe_result(command)
+
+        with patch('media_probe.subprocess.run', side_effect=slow_ffprobe):
+            start = time.time()
+            results = self.probe.probe_many(paths + ["missing.mp4"])
+            elapsed = time.time() - start
+
+        assert sorted(results) == sorted(paths)
+        assert elapsed < 0.6
+
+    @patch('media_probe.subprocess.run', side_effect=FileNotFoundError)
+    def test_missing_ffprobe_returns_none(self, mock_run, tmp_path):
+        """Test that callers can fall back when ffprobe is unavailable."""
+        path = self.make_file(tmp_path, "clip.mp4")
+
+        assert self.probe.probe(path) is None
+        assert self.probe.get_stats()["failures"] == 1
+
+    def test_hung_ffprobe_times_out(self, tmp_path):
+        """Test that a file ffprobe hangs on is reported as unprobeable instead of blocking."""
+        path = self.make_file(tmp_path, "stuck.mp4")
+
+        with patch('media_probe.subprocess.run', side_effect=subprocess.TimeoutExpired("ffprobe", 30)) as mock_run:
+            assert self.probe.probe(path) is None
+
+        assert mock_run.call_args.kwargs["timeout"] > 0
+        assert self.probe.get_stats()["failures"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
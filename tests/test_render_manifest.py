@@ -0,0 +1,182 @@
+"""
+Test suite for preview renders and their manifests.
+Tests manifest round trips and promotion of a preview to the final render.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import Config
+from render_manifest import RenderManifest, manifest_path, preview_path
+from timeline import TimelineEntry, TimelinePlan
+from video_assembler import VideoAssembler
+
+
+class TestRenderManifest:
+    """Test cases for saving and loading render manifests."""
+
+    def make_manifest(self, tmp_path):
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        audio = tmp_path / "voice.mp3"
+        audio.write_bytes(b"audio")
+        plan = TimelinePlan([
+            TimelineEntry("video", str(clip), 0.0, 4.0),
+            TimelineEntry("video", str(clip), 0.0, 1.5)
+        ])
+        return RenderManifest(plan, str(tmp_path / "demo.mp4"), audio_path=str(audio))
+
+    def test_paths_derive_from_final_output(self):
+        """Test the preview and manifest names next to the final output."""
+        assert preview_path("output/demo.mp4") == "output/demo_preview.mp4"
+        assert manifest_path("output/demo.mp4") == "output/demo.render.json"
+
+    def test_round_trip_keeps_plan(self, tmp_path):
+        """Test that a loaded manifest plans exactly the same cuts."""
+        manifest = self.make_manifest(tmp_path)
+
+        loaded = RenderManifest.load(manifest.save())
+
+        assert loaded.plan.entries == manifest.plan.entries
+        assert loaded.plan.duration == pytest.approx(5.5)
+        assert loaded.audio_path == manifest.audio_path
+        assert loaded.srt_path is None
+        assert loaded.missing_files() == []
+
+    def test_missing_inputs_are_reported(self, tmp_path):
+        """Test that evicted clips are detected before promoting."""
+        manifest = self.make_manifest(tmp_path)
+        os.remove(manifest.plan.sources[0])
+
+        assert manifest.missing_files() == manifest.plan.sources
+
+    def test_round_trip_keeps_target_settings(self, tmp_path):
+        """Test that a variant's geometry and CRF survive a round trip."""
+        manifest = self.make_manifest(tmp_path)
+        manifest.resolution = (1080, 1920)
+        manifest.crf = 26
+
+        loaded = RenderManifest.load(manifest.save())
+
+        assert loaded.resolution == (1080, 1920)
+        assert loaded.crf == 26
+
+    def test_unreadable_manifest(self, tmp_path):
+        """Test that a corrupt manifest loads as None."""
+        path = tmp_path / "broken.render.json"
+        path.write_text("{not json")
+
+        assert RenderManifest.load(str(path)) is None
+
+
+class TestPreviewRender:
+    """Test cases for the preview quality tier."""
+
+    def test_preview_resolution_keeps_aspect_ratio(self):
+        """Test that previews are 360 lines at the output's aspect ratio."""
+        assert VideoAssembler.preview_resolution((1920, 1080)) == (640, 360)
+        assert VideoAssembler.preview_resolution((1080, 1920)) == (202, 360)
+        assert VideoAssembler.preview_resolution((320, 240)) == (320, 240)
+
+    def test_preview_renderer_uses_fast_settings(self):
+        """Test that the preview encode is low resolution, low frame rate and ultrafast."""
+        args = VideoAssembler().preview_renderer.encoder_args()
+
+        assert args[args.index('-preset') + 1] == 'ultrafast'
+        assert args[args.index('-r') + 1] == '12'
+
+    def test_promote_renders_saved_plan_at_full_quality(self, tmp_path):
+        """Test that promotion renders the manifest's plan with the full-quality renderer."""
+        manifest = TestRenderManifest().make_manifest(tmp_path)
+        manifest_file = manifest.save()
+        assembler = VideoAssembler()
+
+        with patch.object(assembler.ffmpeg_renderer, 'render', return_value=manifest.output_path) as mock_render:
+            result = assembler.promote_preview(manifest_file)
+
+        assert result == manifest.output_path
+        plan = mock_render.call_args[0][0]
+        assert plan.entries == manifest.plan.entries
+        assert mock_render.call_args[1]["audio_path"] == manifest.audio_path
+
+    def test_promote_variant_uses_its_target_settings(self, tmp_path):
+        """Test that a variant is promoted at its own geometry and CRF."""
+        manifest = TestRenderManifest().make_manifest(tmp_path)
+        manifest.resolution = (1080, 1920)
+        manifest.crf = 26
+        assembler = VideoAssembler(resolution=(1920, 1080))
+
+        with patch('video_assembler.FFmpegRenderer.render', autospec=True,
+                   return_value=manifest.output_path) as mock_render:
+            assembler.promote_preview(manifest.save())
+
+        renderer = mock_render.call_args[0][0]
+        assert renderer.resolution == (1080, 1920)
+        assert renderer.profile.crf == 26
+
+
+class TestVideoVariants:
+    """Test cases for rendering several output targets."""
+
+    def test_each_variant_gets_a_manifest(self, tmp_path):
+        """Test that every variant can be promoted or localized later."""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        output = str(tmp_path / "demo.mp4")
+        assembler = VideoAssembler()
+        plan = TimelinePlan([TimelineEntry("video", str(clip), 0.0, 4.0)])
+        outputs = {
+            "youtube_video": VideoAssembler.variant_path(output, "youtube_video"),
+            "tiktok": VideoAssembler.variant_path(output, "tiktok")
+        }
+
+        with patch.object(assembler.ffmpeg_renderer, 'plan_segments', return_value=[object()]), \
+                patch.object(assembler.ffmpeg_renderer, 'plan_timeline', return_value=plan), \
+                patch.object(assembler.ffmpeg_renderer, 'render_targets', return_value=outputs):
+            results = assembler.create_video_variants(
+                ["youtube_video", "tiktok"], video_paths=[str(clip)], output_path=output, render_backend="ffmpeg"
+            )
+
+        assert results == outputs
+        tiktok = RenderManifest.load(manifest_path(outputs["tiktok"]))
+        assert tiktok.output_path == os.path.abspath(outputs["tiktok"])
+        assert tiktok.resolution == tuple(Config.OUTPUT_TARGETS["tiktok"]["resolution"])
+        assert tiktok.plan.entries[0].out_point == 4.0
+
+    def test_segmented_backend_renders_each_target(self, tmp_path):
+        """Test that the segmented backend is honored, once per distinct target."""
+        clip = tmp_path / "clip.mp4"
+        clip.write_bytes(b"video")
+        output = str(tmp_path / "demo.mp4")
+        assembler = VideoAssembler()
+        plan = TimelinePlan([TimelineEntry("video", str(clip), 0.0, 4.0)])
+
+        with patch.object(assembler.ffmpeg_renderer, 'plan_segments', return_value=[object()]), \
+                patch.object(assembler.ffmpeg_renderer, 'plan_timeline', return_value=plan), \
+                patch('video_assembler.SegmentEncoder.render', autospec=True,
+                      side_effect=lambda encoder, plan, path, **kwargs: path) as mock_render:
+            results = assembler.create_video_variants(
+                ["youtube_video", "tiktok"], video_paths=[str(clip)], output_path=output, render_backend="segmented"
+            )
+
+        assert set(results) == {"youtube_video", "tiktok"}
+        resolutions = {encoder.renderer.resolution for encoder, *_ in (call[0] for call in mock_render.call_args_list)}
+        assert tuple(Config.OUTPUT_TARGETS["tiktok"]["resolution"]) in resolutions
+
+    def test_preview_quality_is_rejected(self, tmp_path):
+        """Test that targets are never rendered as previews."""
+        with patch.object(VideoAssembler, '_render_plan') as mock_render:
+            results = VideoAssembler().create_video_variants(
+                ["tiktok"], video_paths=[str(tmp_path / "clip.mp4")], quality="preview"
+            )
+
+        assert results == {}
+        mock_render.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+"""
+Test suite for stock video rendition selection.
+Tests coverage of the output size, frame-rate checks, size estimates and fallbacks on Pexels-shaped data.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asset_fetcher import AssetFetcher
+from download_manager import DownloadManager
+from rendition_selector import Rendition, RenditionSelector
+
+
+def rendition(width, height, fps, quality="hd", size=None, file_type="video/mp4"):
+    """One Pexels video_files entry."""
+    data = {"id": width * 1000 + int(fps or 0), "quality": quality, "file_type": file_type,
+            "width": width, "height": height, "fps": fps, "link": f"https://videos/{width}x{height}_{fps}.mp4"}
+    if size is not None:
+        data["size"] = size
+    return data
+
+
+FILES = [
+    rendition(3840, 2160, 59.94, "uhd"),
+    rendition(960, 540, 25, "sd"),
+    rendition(1920, 1080, 59.94),
+    rendition(1920, 1080, 25),
+    rendition(1280, 720, 25),
+]
+
+
+class TestRenditionSelector:
+    """Test cases for choosing a video file."""
+
+    def test_cheapest_file_covering_the_output_wins(self):
+        """Test that 1080p25 beats both the 4K/60 and the 1080p60 file for a 1080p24 render."""
+        selector = RenditionSelector(resolutions=[(1920, 1080)], fps=24)
+
+        assert selector.select(FILES, duration=12)["link"].endswith("1920x1080_25.mp4")
+
+    def test_small_renders_take_small_files(self):
+        """Test that a 720p render downloads the 720p file, and a preview the SD one."""
+        assert RenditionSelector([(1280, 720)], 24).select(FILES)["width"] == 1280
+        assert RenditionSelector([(640, 360)], 12).select(FILES)["width"] == 960
+
+    def test_frame_rate_must_reach_the_render_rate(self):
+        """Test that a 25 fps file is rejected for a 30 fps render, but 29.97 counts as 30."""
+        files = [rendition(1920, 1080, 25), rendition(1920, 1080, 29.97), rendition(1920, 1080, 60)]
+
+        assert RenditionSelector([(1920, 1080)], 30).select(files)["fps"] == 29.97
+
+    def test_vertical_targets_need_coverage_after_crop(self):
+        """Test that a 1080x1920 crop from landscape footage asks for a tall enough file."""
+        selector = RenditionSelector(resolutions=[(1920, 1080), (1080, 1920)], fps=24)
+
+        assert selector.upscale(Rendition.from_pexels(FILES[3])) == pytest.approx(1920 / 1080)
+        assert selector.select(FILES)["width"] == 3840
+
+    def test_reported_size_beats_the_estimate(self):
+        """Test that the API's byte count is used when present."""
+        files = [rendition(1920, 1080, 25, size=9_000_000), rendition(2560, 1440, 25, size=4_000_000)]
+
+        assert RenditionSelector([(1920, 1080)], 24).select(files)["width"] == 2560
+
+    def test_best_available_when_nothing_meets_quality(self):
+        """Test the fallback to the least upscaled file, and to quality labels without sizes."""
+        assert RenditionSelector([(1920, 1080)], 24).select(FILES[1:2] + FILES[4:])["width"] == 1280
+        assert RenditionSelector().select([{"quality": "uhd", "link": "a"}, {"quality": "sd", "link": "b"}])["link"] == "b"
+        assert RenditionSelector().select([]) is None
+
+    def test_low_frame_rate_fallback_takes_the_smallest_covering_file(self):
+        """Test that when every file is below the render rate, extra pixels are not downloaded."""
+        files = [rendition(3840, 2160, 25), rendition(1920, 1080, 25), rendition(1280, 720, 25)]
+
+        assert RenditionSelector([(1920, 1080)], 30).select(files)["width"] == 1920
+
+
+class TestAssetFetcherRenditions:
+    """Test cases for the fetcher's use of the selector."""
+
+    def test_job_targets_reach_the_selector(self):
+        """Test that the render's sizes and rate decide which file is downloaded."""
+        downloads = DownloadManager(workers=2)
+        downloads.download = Mock(side_effect=lambda url, path: path)
+        store = Mock()
+        store.fetch.side_effect = lambda key, download, suffix: key
+        fetcher = AssetFetcher(api_key="key", downloads=downloads, store=store, search_cache=Mock())
+        fetcher.search_videos = Mock(return_value=[{"id": 5, "duration": 10, "video_files": FILES}])
+
+        results = fetcher.download_assets_for_query(
+            "ocean", max_images=0, max_videos=1, resolutions=[(1280, 720)], fps=24
+        )
+
+        assert results["videos"] == ["pexels:video:5:1280025"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""
+Test suite for per-job scratch directories.
+Tests isolation, cleanup on every exit path and scratch root selection.
+"""
+import pytest
+import os
+import sys
+import subprocess
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from config import Config
+from scratch_space import ScratchSpace, choose_scratch_root, cleanup_stale_scratch, SCRATCH_PREFIX
+
+
+class TestScratchSpace:
+    """Test cases for job scratch spaces."""
+
+    def test_jobs_get_separate_directories(self, tmp_path):
+        """Test that concurrent jobs never share temporary file names."""
+        first = ScratchSpace("render", root=str(tmp_path))
+        second = ScratchSpace("render", root=str(tmp_path))
+
+        assert first.path("temp-audio.m4a") != second.path("temp-audio.m4a")
+        assert os.path.dirname(first.path("x")) == first.path_root
+
+        first.cleanup()
+        second.cleanup()
+        assert os.listdir(tmp_path) == []
+
+    def test_cleanup_on_exception(self, tmp_path):
+        """Test that a failing job leaves nothing behind."""
+        with pytest.raises(RuntimeError):
+            with ScratchSpace("render", root=str(tmp_path)) as scratch:
+                open(scratch.path("video_temp.mp4"), 'w').close()
+                raise RuntimeError("encode failed")
+
+        assert os.listdir(tmp_path) == []
+
+    def test_cleanup_on_cancellation(self, tmp_path):
+        """Test that Ctrl+C during a job still removes its directory."""
+        with pytest.raises(KeyboardInterrupt):
+            with ScratchSpace("render", root=str(tmp_path)) as scratch:
+                open(scratch.path("subtitles.srt"), 'w').close()
+                raise KeyboardInterrupt
+
+        assert os.listdir(tmp_path) == []
+
+    def test_path_after_cleanup_fails(self, tmp_path):
+        """Test that a cleaned-up space is not reused by accident."""
+        scratch = ScratchSpace("render", root=str(tmp_path))
+        scratch.cleanup()
+        scratch.cleanup()
+
+        with pytest.raises(RuntimeError):
+            scratch.path("late.mp4")
+
+    @patch.object(Config, 'SCRATCH_ROOT', '')
+    def test_prefers_tmpfs_with_room(self):
+        """Test that /dev/shm is used only when it has enough free space."""
+        with patch('scratch_space.os.path.isdir', return_value=True), \
+                patch('scratch_space.os.access', return_value=True):
+            with patch('scratch_space._free_mb', return_value=4096):
+                assert choose_scratch_root(min_free_mb=1024) == "/dev/shm"
+            with patch('scratch_space._free_mb', return_value=100):
+                assert choose_scratch_root(min_free_mb=1024) != "/dev/shm"
+
+    def test_configured_root_wins(self, tmp_path):
+        """Test that SCRATCH_ROOT overrides tmpfs detection."""
+        root = str(tmp_path / "scratch")
+        with patch.object(Config, 'SCRATCH_ROOT', root):
+            assert choose_scratch_root() == root
+        assert os.path.isdir(root)
+
+    def test_stale_directories_of_dead_processes_are_removed(self, tmp_path):
+        """Test that leftovers of killed runs are swept, live ones are kept."""
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        stale = tmp_path / f"{SCRATCH_PREFIX}{process.pid}-render-abc"
+        stale.mkdir()
+        live = ScratchSpace("render", root=str(tmp_path))
+
+        assert cleanup_stale_scratch(str(tmp_path)) == 1
+        assert not stale.exists()
+        assert os.path.isdir(live.path_root)
+        live.cleanup()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
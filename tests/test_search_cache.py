@@ -0,0 +1,151 @@
+"""
+Test suite for the stock media search cache.
+Tests fresh and stale answers, background refreshes, error fallbacks, persistence and the fetcher integration.
+"""
+import pytest
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from asset_fetcher import AssetFetcher
+from search_cache import SearchCache
+
+KEY = SearchCache.make_key("https://api.pexels.com/videos/search", "ocean", 5, "landscape")
+
+
+class Clock:
+    """Controllable stand-in for time.time."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = Clock()
+    with patch('search_cache.time.time', clock):
+        yield clock
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll until a background refresh has landed."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestSearchCache:
+    """Test cases for answering searches."""
+
+    def test_fresh_answer_skips_fetch(self, clock):
+        """Test that a repeat search within the TTL never reaches the API."""
+        cache = SearchCache(cache_path=":memory:", ttl=60, stale_ttl=600)
+        fetch = Mock(return_value=[{"id": 1}])
+
+        assert cache.get(KEY, fetch) == [{"id": 1}]
+        clock.now += 59
+        assert cache.get(KEY, fetch) == [{"id": 1}]
+
+        assert fetch.call_count == 1
+        assert cache.get_stats()["hits"] == 1 and cache.get_stats()["hit_rate"] == 0.5
+
+    def test_stale_answer_is_served_while_refreshing(self, clock):
+        """Test stale-while-revalidate: the old answer comes back at once and one refresh replaces it."""
+        cache = SearchCache(cache_path=":memory:", ttl=60, stale_ttl=600)
+        cache.get(KEY, Mock(return_value=[{"id": 1}]))
+        clock.now += 120
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(5)
+            return [{"id": 2}]
+
+        refresh = Mock(side_effect=slow_fetch)
+        assert cache.get(KEY, refresh) == [{"id": 1}]
+        assert cache.get(KEY, refresh) == [{"id": 1}]
+        release.set()
+
+        assert wait_for(lambda: cache.get_stats()["refreshes"] == 1)
+        assert refresh.call_count == 1
+        assert cache.get(KEY, refresh) == [{"id": 2}]
+
+    def test_expired_answer_is_fallback_on_error(self, clock):
+        """Test that an expired answer is refetched, and kept when the API fails."""
+        cache = SearchCache(cache_path=":memory:", ttl=60, stale_ttl=60)
+        cache.get(KEY, Mock(return_value=[{"id": 1}]))
+        clock.now += 500
+
+        assert cache.get(KEY, Mock(return_value=None)) == [{"id": 1}]
+        assert cache.get("other", Mock(return_value=None)) is None
+        assert cache.get_stats()["errors"] == 2
+
+    def test_answers_persist_across_instances(self, tmp_path, clock):
+        """Test that a later run reads the stored answer."""
+        path = str(tmp_path / "search.sqlite")
+        SearchCache(cache_path=path, ttl=60).get(KEY, Mock(return_value=[{"id": 1}]))
+        fetch = Mock()
+
+        assert SearchCache(cache_path=path, ttl=60).get(KEY, fetch) == [{"id": 1}]
+        fetch.assert_not_called()
+
+    def test_concurrent_misses_fetch_once(self, clock):
+        """Test that simultaneous searches for the same key share one request."""
+        cache = SearchCache(cache_path=":memory:", ttl=60)
+
+        def slow_fetch():
+            time.sleep(0.1)
+            return [{"id": 1}]
+
+        fetch = Mock(side_effect=slow_fetch)
+        threads = [threading.Thread(target=cache.get, args=(KEY, fetch)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert fetch.call_count == 1
+        assert len(cache._key_locks) == 0
+
+    def test_key_ignores_case_and_spacing(self):
+        """Test query normalization and the parts of the key."""
+        endpoint = "https://api.pexels.com/v1/search"
+
+        assert SearchCache.make_key(endpoint, "Ocean  Waves", 5, "landscape") == \
+            SearchCache.make_key(endpoint, " ocean waves", 5, "landscape", 1)
+        assert SearchCache.make_key(endpoint, "ocean", 5, "landscape", 2) != \
+            SearchCache.make_key(endpoint, "ocean", 5, "landscape", 1)
+
+
+class TestAssetFetcherSearchCache:
+    """Test cases for searching Pexels through the cache."""
+
+    def test_repeat_search_uses_one_request(self):
+        """Test that the same preset query searched twice costs one API call."""
+        response = Mock()
+        response.json.return_value = {"videos": [{"id": 7}]}
+        downloads = Mock(session=Mock(), timeout=5, workers=2)
+        downloads.session.get.return_value = response
+        fetcher = AssetFetcher(
+            api_key="key", downloads=downloads, store=Mock(),
+            search_cache=SearchCache(cache_path=":memory:")
+        )
+
+        assert fetcher.search_videos("ocean sea") == [{"id": 7}]
+        assert fetcher.search_videos("Ocean Sea") == [{"id": 7}]
+        assert fetcher.search_images("ocean sea") == []
+
+        assert downloads.session.get.call_count == 2
+        assert downloads.session.get.call_args_list[0][1]["params"]["page"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,222 @@
+"""
+Test suite for the segmented render backend.
+Tests job planning on frame boundaries and the segment and concat commands.
+"""
+import pytest
+import os
+import shutil
+import subprocess
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from clip_cache import ClipCache
+from encoding_profiles import EncodingProfile
+from ffmpeg_renderer import FFmpegRenderer
+from keyframe_index import KeyframeIndex
+from media_probe import MediaProbe
+from segment_encoder import SegmentEncoder
+from still_segments import StillSegmentCache
+from timeline import TimelineEntry, TimelinePlan
+from video_assembler import VideoAssembler
+
+
+class TestSegmentEncoder:
+    """Test cases for splitting and joining segmented renders."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        self.encoder = SegmentEncoder(renderer=self.renderer, workers=3)
+
+    def test_jobs_cover_timeline_without_drift(self):
+        """Test that frame counts add up to the exact timeline length."""
+        plan = self.renderer.plan_timeline([("video", "a.mp4", 3.33), ("image", "b.png", 2.0)], 6.5)
+
+        jobs = self.encoder.plan_jobs(plan)
+
+        assert [job.entry.source for job in jobs] == ["a.mp4", "b.png", "a.mp4"]
+        assert sum(job.frame_count for job in jobs) == round(6.5 * 24)
+        for previous, job in zip(jobs, jobs[1:]):
+            assert job.start_frame == previous.start_frame + previous.frame_count
+
+    def test_long_clips_are_split_with_seeks(self):
+        """Test that clips longer than the limit become several seeking jobs."""
+        jobs = self.encoder.plan_jobs(self.renderer.plan_timeline([("video", "long.mp4", 25.0)]), max_seconds=10)
+
+        assert [job.entry.in_point for job in jobs] == [0.0, 10.0, 20.0]
+        assert [job.frame_count for job in jobs] == [240, 240, 120]
+
+        command = self.encoder.build_segment_command(jobs[1], "seg.mp4")
+        assert command[command.index('-ss') + 1] == '10.000'
+        assert command[command.index('-frames:v') + 1] == '240'
+
+    def test_segments_share_encoder_settings(self):
+        """Test that every segment uses the renderer's encoder arguments."""
+        jobs = self.encoder.plan_jobs(self.renderer.plan_timeline([("video", "a.mp4", 2.0), ("image", "b.png", 2.0)]))
+
+        for job in jobs:
+            command = self.encoder.build_segment_command(job, "seg.mp4")
+            start = command.index('-c:v')
+            assert command[start:start + len(self.renderer.encoder_args())] == self.renderer.encoder_args()
+            assert '-an' in command
+
+    def test_subtitles_use_timeline_time(self):
+        """Test that burned subtitles are shifted to the segment's timeline position."""
+        job = self.encoder.plan_jobs(self.renderer.plan_timeline([("video", "a.mp4", 2.0), ("video", "b.mp4", 2.0)]))[1]
+
+        command = self.encoder.build_segment_command(job, "seg.mp4", srt_path="subs.srt")
+
+        video_filter = command[command.index('-vf') + 1]
+        assert "setpts=PTS-STARTPTS+48/(24*TB)" in video_filter
+        assert "subtitles=filename=" in video_filter
+
+    def test_concat_copies_video_and_muxes_audio_once(self):
+        """Test the join command."""
+        command = self.encoder.build_concat_command("list.txt", "out.mp4", 6.5, audio_path="voice.mp3")
+
+        assert command[command.index('-f') + 1] == 'concat'
+        assert command[command.index('-c:v') + 1] == 'copy'
+        assert command.count('-i') == 2
+        assert command[command.index('-t') + 1] == '6.500'
+
+    @patch.object(SegmentEncoder, '_run', return_value=False)
+    def test_failed_segment_fails_render(self, mock_run, tmp_path):
+        """Test that a failed encode aborts the join and cleans up."""
+        plan = TimelinePlan([TimelineEntry("video", "a.mp4", 0.0, 2.0)])
+
+        result = self.encoder.render(plan, str(tmp_path / "out.mp4"))
+
+        assert result is None
+        assert os.listdir(tmp_path) == []
+
+    def test_caller_work_dir_keeps_its_files(self, tmp_path):
+        """Test that a caller's work_dir loses only the segments and list this render wrote."""
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        (work_dir / "notes.txt").write_text("keep me")
+        plan = TimelinePlan([TimelineEntry("video", "a.mp4", 0.0, 2.0)])
+
+        def fake_ffmpeg(command, duration=None):
+            with open(command[-1], 'wb') as f:
+                f.write(b"h264")
+            return True
+
+        with patch.object(SegmentEncoder, '_run', side_effect=fake_ffmpeg):
+            assert self.encoder.render(plan, str(tmp_path / "out.mp4"), work_dir=str(work_dir))
+
+        assert os.listdir(work_dir) == ["notes.txt"]
+
+
+@pytest.mark.skipif(not (shutil.which('ffmpeg') and shutil.which('ffprobe')), reason="needs ffmpeg and ffprobe")
+class TestStreamCopyJoin:
+    """Test cases for joining copied clip ranges with encoded segments."""
+
+    def make_clip(self, path, crf):
+        """Encode a 2s test pattern with 1s GOPs at the renderer's geometry."""
+        subprocess.run([
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', 'testsrc=s=320x240:r=24:d=2',
+            '-c:v', 'libx264', '-preset', 'veryfast', '-crf', str(crf), '-pix_fmt', 'yuv420p',
+            '-g', '24', '-keyint_min', '24', '-sc_threshold', '0', path
+        ], check=True)
+        return path
+
+    def test_copied_and_encoded_segments_decode_cleanly(self, tmp_path):
+        """Test that only clips encoded like the output are copied, and the join decodes without errors."""
+        profile = EncodingProfile("test", preset="veryfast", crf=23, gop_seconds=1)
+        renderer = FFmpegRenderer(fps=24, resolution=(320, 240), profile=profile)
+        matching = self.make_clip(str(tmp_path / "matching.mp4"), 23)
+        mezzanine = self.make_clip(str(tmp_path / "mezzanine.mp4"), 18)
+        plan = TimelinePlan([
+            TimelineEntry("video", matching, 0.0, 2.0),
+            TimelineEntry("video", mezzanine, 0.0, 2.0),
+            TimelineEntry("video", matching, 1.0, 2.0),
+        ])
+        encoder = SegmentEncoder(renderer, workers=2, keyframes=KeyframeIndex(cache_path=":memory:"))
+        output = str(tmp_path / "out.mp4")
+
+        with patch('segment_encoder.get_media_probe', return_value=MediaProbe(cache_path=":memory:")), \
+                patch('keyframe_index.get_media_probe', return_value=MediaProbe(cache_path=":memory:")):
+            copyable = encoder.copyable_entries(plan)
+            result = encoder.render(plan, output, work_dir=str(tmp_path / "work"))
+
+        assert copyable == {plan.entries[0], plan.entries[2]}
+        assert result == output
+        check = subprocess.run(['ffmpeg', '-v', 'error', '-i', output, '-f', 'null', '-'],
+                               capture_output=True, text=True)
+        assert check.returncode == 0 and check.stderr.strip() == ""
+        # ffmpeg itself copes with parameter sets changing mid-stream; players reading only the avcC do not
+        headers = subprocess.run(['ffmpeg', '-v', 'verbose', '-i', output, '-c', 'copy', '-bsf:v', 'trace_headers',
+                                  '-f', 'null', '-'], capture_output=True, text=True)
+        pic_init_qps = {line.split()[-1] for line in headers.stderr.splitlines() if 'pic_init_qp_minus26' in line}
+        assert len(pic_init_qps) == 1
+
+    def test_cached_clips_are_copied_with_default_profile(self, tmp_path):
+        """Test that mezzanines from the real clip cache are copyable into an output of the shipped profile."""
+        source = str(tmp_path / "download.mp4")
+        subprocess.run([
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'lavfi', '-i', 'testsrc=s=640x480:r=30:d=3', '-c:v', 'libx264', '-crf', '30', source
+        ], check=True)
+        probe = MediaProbe(cache_path=":memory:")
+        renderer = FFmpegRenderer(fps=24, resolution=(320, 240))
+        encoder = SegmentEncoder(renderer, keyframes=KeyframeIndex(cache_path=":memory:", scene_threshold=0))
+
+        with patch('clip_cache.get_media_probe', return_value=probe), \
+                patch('segment_encoder.get_media_probe', return_value=probe), \
+                patch('keyframe_index.get_media_probe', return_value=probe):
+            mezzanine = ClipCache(resolution=(320, 240), fps=24, cache_dir=str(tmp_path / "cache")).get(source)
+            plan = TimelinePlan([TimelineEntry("video", mezzanine, 1.0, 2.0), TimelineEntry("video", source, 0.0, 1.0)])
+            copyable = encoder.copyable_entries(plan)
+
+        assert copyable == {plan.entries[0]}
+
+class TestSegmentedBackendDispatch:
+    """Test cases for selecting the segmented backend."""
+
+    @patch.object(KeyframeIndex, 'snap', autospec=True, side_effect=lambda index, plan: plan)
+    @patch.object(StillSegmentCache, 'segment_paths', side_effect=lambda paths, duration: [(path, None) for path in paths])
+    @patch.object(SegmentEncoder, 'render', return_value="out.mp4")
+    @patch.object(FFmpegRenderer, 'render')
+    def test_segmented_backend_uses_segment_encoder(self, mock_single, mock_segmented, mock_stills, mock_snap, tmp_path):
+        """Test that render_backend='segmented' goes through the segment encoder."""
+        image_path = tmp_path / "image.png"
+        image_path.write_bytes(b"png")
+
+        output_path = str(tmp_path / "out.mp4")
+
+        assembler = VideoAssembler(fps=24, resolution=(1280, 720))
+        result = assembler.create_video_from_assets(
+            image_paths=[str(image_path)],
+            output_path=output_path,
+            render_backend="segmented"
+        )
+
+        assert result == output_path
+        mock_segmented.assert_called_once()
+        mock_single.assert_not_called()
+        mock_stills.assert_called_once()
+        mock_snap.assert_called_once()
+
+    @patch.object(KeyframeIndex, 'snap')
+    @patch.object(StillSegmentCache, 'segment_paths')
+    @patch.object(FFmpegRenderer, 'render', return_value="out.mp4")
+    def test_single_pass_backend_loops_images_directly(self, mock_single, mock_stills, mock_snap, tmp_path):
+        """Test that only the segmented backend pre-encodes stills and snaps cuts, which cost the others work."""
+        image_path = tmp_path / "image.png"
+        image_path.write_bytes(b"png")
+
+        assembler = VideoAssembler(fps=24, resolution=(1280, 720))
+        assembler.create_video_from_assets(
+            image_paths=[str(image_path)], output_path=str(tmp_path / "out.mp4"), render_backend="ffmpeg"
+        )
+
+        mock_stills.assert_not_called()
+        mock_snap.assert_not_called()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
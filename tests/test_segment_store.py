@@ -0,0 +1,103 @@
+"""
+Test suite for the segment store.
+Tests segment fingerprints and reuse of unchanged segments across renders.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_renderer import FFmpegRenderer
+from segment_encoder import SegmentEncoder
+from segment_store import SegmentStore, cues_in_range
+from timeline import TimelineEntry, TimelinePlan
+
+
+def fake_ffmpeg(command, duration=None):
+    """Pretend to run ffmpeg by writing the output file."""
+    with open(command[-1], 'wb') as f:
+        f.write(b"h264")
+    return True
+
+
+class TestSegmentStore:
+    """Test cases for fingerprinting and reusing encoded segments."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+
+    def make_clip(self, tmp_path, name="clip.mp4", content=b"video"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    def write_srt(self, tmp_path, second_cue):
+        path = tmp_path / "subs.srt"
+        path.write_text(
+            "1\n00:00:00,500 --> 00:00:02,000\nHello there.\n\n"
+            f"2\n00:00:05,000 --> 00:00:07,000\n{second_cue}\n\n",
+            encoding='utf-8'
+        )
+        return str(path)
+
+    def test_cues_in_range_are_clipped_and_relative(self):
+        """Test that only visible cues count, in segment time."""
+        cues = [(0.5, 2.0, "a"), (1.5, 4.5, "b"), (6.0, 7.0, "c")]
+
+        assert cues_in_range(cues, 2.0, 4.0) == [(0.0, 2.0, "b")]
+        assert cues_in_range(cues, 0.0, 2.0) == [(0.5, 2.0, "a"), (1.5, 2.0, "b")]
+
+    def test_fingerprint_covers_inputs(self, tmp_path):
+        """Test that source content, range, cues and profile change the fingerprint."""
+        store = SegmentStore(cache_dir=str(tmp_path / "store"), max_mb=0)
+        clip = self.make_clip(tmp_path)
+        entry = TimelineEntry("video", clip, 0.0, 2.0)
+
+        base = store.fingerprint(entry, 48, self.renderer, [])
+        assert store.fingerprint(entry, 48, self.renderer, []) == base
+        assert store.fingerprint(TimelineEntry("video", clip, 1.0, 3.0), 48, self.renderer, []) != base
+        assert store.fingerprint(entry, 48, self.renderer, [(0.0, 1.0, "Hi")]) != base
+        assert store.fingerprint(entry, 48, FFmpegRenderer(fps=30, resolution=(1280, 720)), []) != base
+
+        copy = self.make_clip(tmp_path, "copy.mp4")
+        assert store.fingerprint(TimelineEntry("video", copy, 0.0, 2.0), 48, self.renderer, []) == base
+
+    def test_rerender_encodes_only_changed_segments(self, tmp_path):
+        """Test that a subtitle fix re-encodes only the segment showing that cue."""
+        store = SegmentStore(cache_dir=str(tmp_path / "store"), max_mb=0)
+        encoder = SegmentEncoder(renderer=self.renderer, workers=2, store=store)
+        plan = TimelinePlan([
+            TimelineEntry("video", self.make_clip(tmp_path, "a.mp4", b"a"), 0.0, 4.0),
+            TimelineEntry("video", self.make_clip(tmp_path, "b.mp4", b"b"), 0.0, 4.0)
+        ])
+
+        with patch.object(SegmentEncoder, '_run', side_effect=fake_ffmpeg) as mock_run:
+            encoder.render(plan, str(tmp_path / "first.mp4"), srt_path=self.write_srt(tmp_path, "Teh end."))
+            assert mock_run.call_count == 3  # two segments and the concat
+
+            mock_run.reset_mock()
+            encoder.render(plan, str(tmp_path / "second.mp4"), srt_path=self.write_srt(tmp_path, "The end."))
+
+        # Only the second segment shows the fixed cue
+        assert mock_run.call_count == 2
+        assert store.get_stats()["hits"] == 1
+        assert mock_run.call_args_list[0][0][0][-1].endswith(".partial.mp4")
+
+    def test_failed_encode_is_not_stored(self, tmp_path):
+        """Test that a failed segment leaves nothing in the store."""
+        store = SegmentStore(cache_dir=str(tmp_path / "store"), max_mb=0)
+        encoder = SegmentEncoder(renderer=self.renderer, store=store)
+        plan = TimelinePlan([TimelineEntry("video", self.make_clip(tmp_path), 0.0, 2.0)])
+
+        with patch.object(SegmentEncoder, '_run', return_value=False):
+            assert encoder.render(plan, str(tmp_path / "out.mp4")) is None
+
+        assert os.listdir(tmp_path / "store") == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
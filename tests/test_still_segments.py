@@ -0,0 +1,106 @@
+"""
+Test suite for the still image segment cache.
+Tests cache keys, fade placement and reuse of encoded segments.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from encoding_profiles import EncodingProfile
+from ffmpeg_progress import FFmpegResult, FFmpegRunner
+from still_segments import StillSegmentCache
+
+
+def fake_encode(command, duration=None):
+    """Pretend to run ffmpeg by writing the output file."""
+    with open(command[-1], 'wb') as f:
+        f.write(b"h264")
+    return FFmpegResult(returncode=0)
+
+
+class TestStillSegmentCache:
+    """Test cases for pre-encoded still image segments."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.cache_kwargs = {"resolution": (1280, 720), "fps": 24, "max_mb": 0}
+
+    def make_image(self, tmp_path, name, content=b"png"):
+        path = tmp_path / name
+        path.write_bytes(content)
+        return str(path)
+
+    def test_key_covers_duration_profile_and_fades(self, tmp_path):
+        """Test that every input of the encode is part of the cache key."""
+        cache = StillSegmentCache(cache_dir=str(tmp_path / "stills"), **self.cache_kwargs)
+        image = self.make_image(tmp_path, "slide.png")
+
+        base = cache.segment_path(image, 5.0)
+        assert cache.segment_path(image, 5.0) == base
+        assert cache.segment_path(image, 4.0) != base
+        assert cache.segment_path(image, 5.0, fade_in=0.5) != base
+        assert StillSegmentCache(resolution=(1080, 1920), fps=24, cache_dir=str(tmp_path / "stills")).segment_path(image, 5.0) != base
+
+    def test_same_image_content_shares_segment(self, tmp_path):
+        """Test that templates saved under different names are encoded once."""
+        cache = StillSegmentCache(cache_dir=str(tmp_path / "stills"), **self.cache_kwargs)
+        first = self.make_image(tmp_path, "intro.png", b"template")
+        second = self.make_image(tmp_path, "intro_copy.png", b"template")
+
+        with patch.object(FFmpegRunner, 'run', side_effect=fake_encode) as mock_run:
+            assert cache.get(first, 3.0) == cache.get(second, 3.0)
+
+        assert mock_run.call_count == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_encode_command_loops_image_with_still_tuning(self, tmp_path):
+        """Test the per-image encode: looped input, exact frames, fades in the filter."""
+        cache = StillSegmentCache(cache_dir=str(tmp_path / "stills"), **self.cache_kwargs)
+
+        command = cache.build_encode_command("slide.png", "out.mp4", 2.0, fade_in=0.5, fade_out=0.5)
+
+        assert command[command.index('-loop') + 1] == '1'
+        assert command[command.index('-frames:v') + 1] == '48'
+        assert command[command.index('-tune') + 1] == 'stillimage'
+        video_filter = command[command.index('-vf') + 1]
+        assert "fade=t=in:st=0:d=0.500" in video_filter
+        assert "fade=t=out:st=1.500:d=0.500" in video_filter
+
+    def test_job_profile_is_used_and_keyed(self, tmp_path):
+        """Test that stills are encoded with the job's profile, and other settings get other entries."""
+        image = self.make_image(tmp_path, "slide.png")
+        profile = EncodingProfile.from_config("fast")
+        fast = StillSegmentCache(cache_dir=str(tmp_path / "stills"), profile=profile, **self.cache_kwargs)
+        tighter = StillSegmentCache(cache_dir=str(tmp_path / "stills"), profile=profile.with_crf(18), **self.cache_kwargs)
+
+        command = fast.build_encode_command(image, "out.mp4", 2.0)
+
+        assert command[command.index('-preset') + 1] == 'veryfast'
+        assert command[command.index('-crf') + 1] == '23'
+        assert fast.segment_path(image, 2.0) != tighter.segment_path(image, 2.0)
+
+    def test_slide_fades_match_slideshow(self):
+        """Test that the first slide fades in, the last fades out and the rest do both."""
+        fades = [StillSegmentCache.slide_fades(index, 3, 0.5) for index in range(3)]
+
+        assert fades == [(0.5, 0.0), (0.5, 0.5), (0.0, 0.5)]
+        assert StillSegmentCache.slide_fades(0, 1, 0.5) == (0.5, 0.0)
+
+    def test_failed_encode_is_not_cached(self, tmp_path):
+        """Test that a failed encode reports None and leaves no partial file."""
+        cache = StillSegmentCache(cache_dir=str(tmp_path / "stills"), **self.cache_kwargs)
+        image = self.make_image(tmp_path, "broken.png")
+
+        with patch.object(FFmpegRunner, 'run', return_value=FFmpegResult(returncode=1, stderr="invalid data")):
+            assert cache.get(image, 2.0) is None
+
+        assert os.listdir(tmp_path / "stills") == []
+        assert cache.get_stats()["failures"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from video_assembler import VideoAssembler
 from config import Config
+from asr_models import get_asr_registry
 
 
 class TestSubtitleTiming:
@@ -25,6 +26,9 @@ class TestSubtitleTiming:
         self.temp_dir = tempfile.mkdtemp()
         self.video_assembler = VideoAssembler()
         
+        # Models stay resident between calls; start every test with an empty pool
+        get_asr_registry().clear()
+        
         # Mock config paths
         self.original_output_dir = Config.OUTPUT_DIR
         Config.OUTPUT_DIR = self.temp_dir
@@ -349,6 +353,9 @@ class TestSubtitleIntegration:
         self.temp_dir = tempfile.mkdtemp()
         self.video_assembler = VideoAssembler()
         
+        # Models stay resident between calls; start every test with an empty pool
+        get_asr_registry().clear()
+        
         # Mock config paths
         self.original_output_dir = Config.OUTPUT_DIR
         Config.OUTPUT_DIR = self.temp_dir
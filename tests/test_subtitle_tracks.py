@@ -0,0 +1,126 @@
+"""
+Test suite for subtitle delivery modes.
+Tests burned, soft and dual subtitles across the render backends without running ffmpeg.
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ffmpeg_renderer import FFmpegRenderer
+from render_manifest import RenderManifest
+from segment_encoder import SegmentEncoder
+from subtitle_tracks import burned_srt, track_args, track_srt
+from timeline import TimelineEntry, TimelinePlan
+from video_assembler import VideoAssembler
+
+
+class TestSubtitleModes:
+    """Test cases for choosing what to burn and what to mux."""
+
+    def test_mode_helpers(self):
+        """Test which SRT each mode burns and muxes."""
+        assert burned_srt("a.srt", "burned") == "a.srt" and track_srt("a.srt", "burned") is None
+        assert burned_srt("a.srt", "soft") is None and track_srt("a.srt", "soft") == "a.srt"
+        assert burned_srt("a.srt", "both") == "a.srt" and track_srt("a.srt", "both") == "a.srt"
+        assert burned_srt(None, "both") is None and track_srt(None, "both") is None
+
+    def test_track_codec_follows_container(self):
+        """Test the text track codec for MP4, WebM and Matroska outputs."""
+        assert track_args(2, "out.mp4", "es-ES") == [
+            '-map', '2:s', '-c:s', 'mov_text', '-metadata:s:s:0', 'language=spa'
+        ]
+        assert track_args(1, "out.webm")[3] == 'webvtt'
+        assert track_args(1, "out.mkv")[3] == 'srt'
+
+
+class TestSoftTrackCommands:
+    """Test cases for muxing the text track inside the render pass."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        self.plan = self.renderer.plan_timeline([("video", "a.mp4", 2.0), ("image", "b.png", 2.0)])
+
+    def test_soft_mode_skips_the_burn(self):
+        """Test that a soft track is mapped after the audio and nothing is burned."""
+        command = self.renderer.build_command(
+            self.plan, "out.mp4", audio_path="voice.mp3", srt_path="subs.srt", subtitle_mode="soft", language="es-ES"
+        )
+
+        graph = command[command.index('-filter_complex') + 1]
+        assert "subtitles=" not in graph
+        assert command[command.index('subs.srt') - 1] == '-i'
+        assert f"{len(self.plan.entries) + 1}:s" in command
+        assert command[command.index('-c:s') + 1] == 'mov_text'
+        assert 'language=spa' in command
+
+    def test_both_mode_burns_and_muxes(self):
+        """Test that dual delivery burns the picture and adds the track."""
+        command = self.renderer.build_command(
+            self.plan, "out.mp4", audio_path="voice.mp3", srt_path="subs.srt", subtitle_mode="both"
+        )
+
+        assert "subtitles=" in command[command.index('-filter_complex') + 1]
+        assert '-c:s' in command
+
+    def test_segmented_join_adds_track(self):
+        """Test that segments stay clean and the join muxes the track."""
+        encoder = SegmentEncoder(self.renderer)
+        command = encoder.build_concat_command(
+            "list.txt", "out.mp4", 4.0, audio_path="voice.mp3", srt_path="subs.srt", language="en"
+        )
+
+        assert command[command.index('-c:v') + 1] == 'copy'
+        assert command.count('-i') == 3
+        assert '2:s' in command and 'language=eng' in command
+
+    def test_mux_command_copies_streams(self):
+        """Test that adding a track to a rendered video encodes nothing."""
+        command = self.renderer.build_mux_command("demo.mp4", "demo.srt", "demo.mkv", "fr")
+
+        assert command[command.index('-c:v') + 1] == 'copy'
+        assert command[command.index('-c:a') + 1] == 'copy'
+        assert command[command.index('-c:s') + 1] == 'srt'
+        assert '-vf' not in command and '-crf' not in command
+
+
+class TestSubtitleDelivery:
+    """Test cases for subtitle delivery in the assembler and the manifest."""
+
+    def test_soft_mode_muxes_without_burning(self):
+        """Test that soft delivery of a rendered video is a stream copy."""
+        assembler = VideoAssembler(fps=24, resolution=(1280, 720), subtitle_mode="soft")
+
+        with patch.object(assembler.ffmpeg_renderer, 'mux_subtitles', return_value="out.mp4") as mock_mux, \
+                patch.object(assembler, 'burn_subtitles_with_ffmpeg') as mock_burn:
+            result = assembler.deliver_subtitles("video.mp4", "subs.srt", "out.mp4", "en")
+
+        assert result == "out.mp4"
+        mock_burn.assert_not_called()
+        mock_mux.assert_called_once_with("video.mp4", "subs.srt", "out.mp4", "en")
+
+    def test_unknown_mode_falls_back_to_burned(self):
+        """Test that an unknown subtitle mode keeps the burned default."""
+        assert VideoAssembler(fps=24, resolution=(1280, 720), subtitle_mode="karaoke").subtitle_mode == "burned"
+
+    def test_manifest_records_mode(self, tmp_path):
+        """Test that the manifest knows whether the picture carries burned subtitles."""
+        plan = TimelinePlan([TimelineEntry("video", str(tmp_path / "clip.mp4"), 0.0, 4.0)])
+        srt = str(tmp_path / "demo.srt")
+
+        manifest_file = RenderManifest(
+            plan, str(tmp_path / "demo.mp4"), srt_path=srt, subtitle_mode="soft", language="de"
+        ).save()
+        loaded = RenderManifest.load(manifest_file)
+
+        assert loaded.subtitle_mode == "soft" and loaded.language == "de"
+        assert not loaded.burned_subtitles
+        assert RenderManifest(plan, "demo.mp4", srt_path=srt).burned_subtitles
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,121 @@
+"""
+Test suite for timeline planning.
+Tests looping and trimming of clip sequences to the narration length.
+"""
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from timeline import fill_to_duration, TimelineEntry, TimelinePlan
+from ffmpeg_renderer import FFmpegRenderer
+
+
+class TestFillToDuration:
+    """Test cases for cycling clips to a target duration."""
+
+    def test_exact_match_keeps_every_clip(self):
+        """Test that a matching duration plays each clip once."""
+        assert fill_to_duration([3.0, 2.0], 5.0) == [(0, 3.0), (1, 2.0)]
+
+    def test_longer_target_cycles_and_trims_last(self):
+        """Test that clips wrap around and the last one is cut."""
+        timeline = fill_to_duration([3.0, 2.0], 12.0)
+
+        assert [index for index, _ in timeline] == [0, 1, 0, 1, 0]
+        assert timeline[-1] == (0, 2.0)
+        assert sum(duration for _, duration in timeline) == pytest.approx(12.0)
+
+    def test_shorter_target_drops_unused_clips(self):
+        """Test that clips starting after the target are never scheduled."""
+        assert fill_to_duration([3.0, 2.0, 4.0], 4.0) == [(0, 3.0), (1, 1.0)]
+
+    def test_zero_length_clips_are_skipped(self):
+        """Test that clips without duration do not stall the loop."""
+        assert fill_to_duration([0.0, 2.0], 3.0) == [(1, 2.0), (1, 1.0)]
+
+    def test_empty_inputs(self):
+        """Test degenerate inputs."""
+        assert fill_to_duration([], 10.0) == []
+        assert fill_to_duration([2.0], 0.0) == []
+        assert fill_to_duration([0.0], 5.0) == []
+
+    def test_cost_scales_with_output_duration(self):
+        """Test that the entry count depends on output length, not loop count times clips."""
+        timeline = fill_to_duration([1.0] * 10, 2.5)
+
+        assert len(timeline) == 3
+
+
+class TestTimelinePlan:
+    """Test cases for the edit decision list."""
+
+    def test_fill_plans_ranges_without_decoding(self):
+        """Test that the plan lists source ranges that add up to the target."""
+        plan = TimelinePlan.fill([("video", "a.mp4", 3.0), ("image", "b.png", 2.0)], 6.5)
+
+        assert [(entry.source, entry.in_point, entry.out_point) for entry in plan] == [
+            ("a.mp4", 0.0, 3.0), ("b.png", 0.0, 2.0), ("a.mp4", 0.0, 1.5)
+        ]
+        assert plan.duration == pytest.approx(6.5)
+        assert plan.sources == ["a.mp4", "b.png"]
+
+    def test_split_advances_in_points(self):
+        """Test that long entries become consecutive ranges of the same source."""
+        plan = TimelinePlan([TimelineEntry("video", "long.mp4", 2.0, 27.0)]).split(10)
+
+        assert [(entry.in_point, entry.out_point) for entry in plan] == [(2.0, 12.0), (12.0, 22.0), (22.0, 27.0)]
+
+    def test_fit_keeps_opening_cuts(self):
+        """Test that refitting to a longer duration cycles the planned ranges."""
+        plan = TimelinePlan([TimelineEntry("video", "a.mp4", 1.0, 4.0), TimelineEntry("image", "b.png", 0.0, 2.0)])
+
+        fitted = plan.fit(6.5)
+
+        assert [(entry.source, entry.in_point, entry.out_point) for entry in fitted] == [
+            ("a.mp4", 1.0, 4.0), ("b.png", 0.0, 2.0), ("a.mp4", 1.0, 2.5)
+        ]
+        assert plan.fit(2.0).duration == pytest.approx(2.0)
+
+    def test_renderer_seeks_on_input_side(self):
+        """Test that an entry starting inside a clip is opened with -ss before -i."""
+        renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        plan = TimelinePlan([TimelineEntry("video", "a.mp4", 4.0, 6.5), TimelineEntry("video", "b.mp4", 0.0, 1.0)])
+
+        command = renderer.build_command(plan, "out.mp4")
+
+        first_input = command.index('-i')
+        assert command[first_input - 4:first_input + 2] == ['-ss', '4.000', '-t', '2.500', '-i', 'a.mp4']
+        assert command.count('-ss') == 1
+
+
+class TestRendererLooping:
+    """Test cases for looping in the FFmpeg render graph."""
+
+    def test_single_clip_uses_input_loop(self):
+        """Test that one repeated clip becomes a single stream_loop input."""
+        renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        plan = renderer.plan_timeline([("video", "clip.mp4", 3.0)], 10.0)
+
+        command = renderer.build_command(plan, "out.mp4")
+
+        assert command.count('-i') == 1
+        assert command[command.index('-stream_loop') + 1] == '-1'
+        assert command[command.index('-i') - 2:command.index('-i')] == ['-t', '10.000']
+
+    def test_multiple_clips_use_input_side_durations(self):
+        """Test that each repeated clip is opened only for its play duration."""
+        renderer = FFmpegRenderer(fps=24, resolution=(1280, 720))
+        plan = renderer.plan_timeline([("video", "a.mp4", 3.0), ("video", "b.mp4", 2.0)], 7.0)
+
+        command = renderer.build_command(plan, "out.mp4")
+
+        assert '-stream_loop' not in command
+        durations = [command[i + 1] for i, arg in enumerate(command) if arg == '-t'][:-1]
+        assert durations == ['3.000', '2.000', '2.000']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,146 @@
+"""
+Test suite for TTS word timings.
+Tests capturing edge-tts word boundaries and building subtitles from them.
+"""
+import pytest
+import asyncio
+import os
+import sys
+import json
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from voice_generator import VoiceGenerator, load_word_timings, word_timings_path
+from video_assembler import VideoAssembler
+from config import Config
+
+
+class FakeCommunicate:
+    """Stand-in for edge_tts.Communicate that streams canned chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def write_sidecar(audio_path, words):
+    """Write a word timing sidecar for an audio file."""
+    with open(word_timings_path(audio_path), 'w', encoding='utf-8') as f:
+        json.dump({"words": [{"text": t, "start": s, "end": e} for t, s, e in words]}, f)
+
+
+class TestWordTimingCapture:
+    """Test cases for recording word boundaries during synthesis."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_synthesis_writes_audio_and_sidecar(self):
+        """Test that audio chunks and word boundaries are both persisted."""
+        chunks = [
+            {"type": "audio", "data": b"abc"},
+            {"type": "WordBoundary", "offset": 1_000_000, "duration": 4_000_000, "text": "Hello"},
+            {"type": "audio", "data": b"def"},
+            {"type": "WordBoundary", "offset": 6_000_000, "duration": 5_000_000, "text": "world"},
+        ]
+        output = os.path.join(self.temp_dir, "voice.mp3")
+
+        with patch('voice_generator.edge_tts.Communicate', return_value=FakeCommunicate(chunks)):
+            result = asyncio.run(VoiceGenerator().synthesize_text("Hello world.", output))
+
+        assert result == output
+        with open(output, 'rb') as f:
+            assert f.read() == b"abcdef"
+        assert load_word_timings(output) == [
+            {"text": "Hello", "start": 0.1, "end": 0.5},
+            {"text": "world", "start": 0.6, "end": 1.1},
+        ]
+
+    def test_missing_boundaries_remove_stale_sidecar(self):
+        """Test that audio without boundaries does not keep old timings around."""
+        output = os.path.join(self.temp_dir, "voice.mp3")
+        write_sidecar(output, [("old", 0.0, 1.0)])
+
+        with patch('voice_generator.edge_tts.Communicate', return_value=FakeCommunicate([{"type": "audio", "data": b"x"}])):
+            asyncio.run(VoiceGenerator().synthesize_text("Hello.", output))
+
+        assert load_word_timings(output) is None
+
+
+class TestSubtitlesFromWordTimings:
+    """Test cases for building SRT cues from word timings."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.video_assembler = VideoAssembler()
+        self.audio_path = os.path.join(self.temp_dir, "voice.mp3")
+        self.srt_path = os.path.join(self.temp_dir, "voice.srt")
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def read_srt(self):
+        with open(self.srt_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_cues_follow_sentences_and_keep_punctuation(self):
+        """Test that cues split at sentence ends and reuse the original text."""
+        write_sidecar(self.audio_path, [
+            ("Hello", 0.0, 0.4), ("world", 0.45, 0.9),
+            ("In", 1.0, 1.1), ("twenty", 1.1, 1.3), ("twenty", 1.3, 1.5), ("four", 1.5, 1.7),
+            ("we", 1.7, 1.8), ("shipped", 1.8, 2.2),
+        ])
+
+        result = self.video_assembler.generate_srt_from_word_timings(
+            self.audio_path, self.srt_path, text="Hello, world! In 2024 we shipped."
+        )
+
+        assert result == self.srt_path
+        content = self.read_srt()
+        assert "00:00:00,000 --> 00:00:00,900\nHello, world!" in content
+        assert "00:00:01,000 --> 00:00:02,200\nIn 2024 we shipped." in content
+
+    def test_long_runs_are_split(self):
+        """Test that cues respect the character limit."""
+        words = [(f"word{i}", i * 0.3, i * 0.3 + 0.25) for i in range(20)]
+        write_sidecar(self.audio_path, words)
+
+        self.video_assembler.generate_srt_from_word_timings(self.audio_path, self.srt_path)
+
+        lines = [line for line in self.read_srt().splitlines() if line.startswith("word")]
+        assert len(lines) > 1
+        assert all(len(line) <= Config.SUBTITLE_MAX_CUE_CHARS for line in lines)
+        assert " ".join(lines) == " ".join(word for word, _, _ in words)
+
+    def test_no_sidecar_returns_none(self):
+        """Test that missing timings signal the caller to fall back."""
+        assert self.video_assembler.generate_srt_from_word_timings(self.audio_path, self.srt_path) is None
+
+    @patch('whisper.load_model')
+    def test_prepare_srt_skips_whisper_when_timings_exist(self, mock_load_model):
+        """Test that Whisper is only used as a fallback."""
+        write_sidecar(self.audio_path, [("Hi", 0.0, 0.3), ("there", 0.3, 0.7)])
+
+        result = self.video_assembler._prepare_srt("Hi there.", self.audio_path, 1.0, self.srt_path)
+
+        assert result == self.srt_path
+        mock_load_model.assert_not_called()
+        assert "Hi there." in self.read_srt()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])